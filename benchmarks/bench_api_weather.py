@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+天気情報API（/api/weather/<city>）のスループットのベンチマーク
+キャッシュ済みの都市（ホットキー）について、毎回 to_dict() と jsonify でエンコードする従来の応答と、
+WeatherData が保持する JSON のバイト列をそのまま書き込む応答の1秒あたりのリクエスト数を比較します
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+from flask import jsonify
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.weather_web import WeatherWebApp
+
+
+CONFIG = """\
+api:
+  transport: "fake"
+cache:
+  ttl: 3600
+defaults:
+  city: "Tokyo"
+"""
+
+
+def measure(client, path: str, iterations: int) -> float:
+    """1秒あたりのリクエスト数を計測"""
+    assert client.get(path).status_code == 200  # ウォームアップ（キャッシュに格納）
+    start = time.perf_counter()
+    for _ in range(iterations):
+        client.get(path)
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="天気情報APIのスループットのベンチマーク")
+    parser.add_argument('-n', '--iterations', type=int, default=20000, help='リクエスト数')
+    parser.add_argument('--city', default='Tokyo', help='計測する都市')
+    args = parser.parse_args()
+
+    os.environ.setdefault('OPENWEATHER_API_KEY', 'benchmark')
+    with tempfile.TemporaryDirectory() as directory:
+        config_path = Path(directory) / "config.yaml"
+        config_path.write_text(CONFIG)
+        app = WeatherWebApp(str(config_path))
+
+    # 変更前と同じく、ヒットのたびに辞書を作成して jsonify でエンコードする応答
+    @app.flask_app.route('/bench/jsonify/<city_name>')
+    def api_weather_jsonify(city_name: str):
+        weather_data = app.weather_client.get_current_weather(city_name)
+        return jsonify({'status': 'success', 'data': weather_data.to_dict()})
+
+    client = app.flask_app.test_client()
+    before = measure(client, f'/bench/jsonify/{args.city}', args.iterations)
+    after = measure(client, f'/api/weather/{args.city}', args.iterations)
+
+    print(f"{'to_dict + jsonify（変更前）':<32} {before:>10.0f} req/s")
+    print(f"{'保持したバイト列（変更後）':<32} {after:>10.0f} req/s  ({after / before - 1:+.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+接続プールのベンチマーク
+毎回新規接続する requests.get と、ウォーム済みの SessionPool の1呼び出しあたりの遅延を比較します
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+import requests
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.http_session import SessionPool
+from src.fake_server import start_fake_server
+
+
+def measure(label: str, func, url: str, iterations: int) -> float:
+    """1呼び出しあたりの平均遅延（ミリ秒）を計測"""
+    func(url)  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(url)
+    elapsed_ms = (time.perf_counter() - start) * 1000 / iterations
+    print(f"{label:<28} {elapsed_ms:8.3f} ms/call")
+    return elapsed_ms
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="接続プールのベンチマーク")
+    parser.add_argument('--url', help='計測対象URL（省略時はローカルのフェイクサーバー）')
+    parser.add_argument('-n', '--iterations', type=int, default=200, help='呼び出し回数')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, base_url = start_fake_server()
+        url = f"{base_url}weather?q=Tokyo&units=metric&lang=ja"
+
+    pool = SessionPool()
+    try:
+        cold = measure("requests.get (新規接続)", lambda u: requests.get(u, timeout=10).content,
+                       url, args.iterations)
+        warm = measure("SessionPool (keep-alive)", lambda u: pool.get_session().get(u, timeout=10).content,
+                       url, args.iterations)
+        print(f"{'削減量':<28} {cold - warm:8.3f} ms/call ({(1 - warm / cold) * 100:.1f}%)")
+    finally:
+        pool.close()
+        if server is not None:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+JSONデコードのベンチマーク
+requests.Response.json() と、本文のバイト列を直接解析する json_codec の
+1応答あたりの解析時間（WeatherData への変換を含む）を比較します
+"""
+
+import sys
+import json
+import time
+import argparse
+import logging
+from pathlib import Path
+
+import requests
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src import json_codec
+from src.fake_server import FakeOpenWeatherMap
+from src.weather_api import WeatherAPI
+
+
+def make_response(body: bytes) -> requests.Response:
+    """charset 指定の無い requests.Response を作成（実APIと同じ条件）"""
+    response = requests.Response()
+    response.status_code = 200
+    response.headers['Content-Type'] = 'application/json'
+    response._content = body
+    return response
+
+
+def measure(label: str, func, iterations: int) -> float:
+    """1応答あたりの平均時間（マイクロ秒）を計測"""
+    func()  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    elapsed_us = (time.perf_counter() - start) * 1_000_000 / iterations
+    print(f"{label:<36} {elapsed_us:8.2f} us/response")
+    return elapsed_us
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="JSONデコードのベンチマーク")
+    parser.add_argument('-n', '--iterations', type=int, default=20000, help='解析回数')
+    args = parser.parse_args()
+
+    logging.disable(logging.CRITICAL)
+    body = json.dumps(
+        FakeOpenWeatherMap().current_weather('Tokyo', 'metric', 'ja'), ensure_ascii=False
+    ).encode('utf-8')
+    parse = WeatherAPI.__new__(WeatherAPI)._parse_weather_data
+
+    print(f"応答サイズ: {len(body)} bytes / JSONライブラリ: {json_codec.BACKEND}")
+    before = measure("Response.json() + 変換",
+                     lambda: parse(make_response(body).json()), args.iterations)
+    after = measure("json_codec.decode_response() + 変換",
+                    lambda: parse(json_codec.decode_response(make_response(body))), args.iterations)
+    print(f"{'削減量':<36} {before - after:8.2f} us/response ({(1 - after / before) * 100:.1f}%)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+キャッシュ値のエンコードのベンチマーク
+共有キャッシュ・ディスクキャッシュに保存する WeatherData について、
+JSON・pickle・record_codec のサイズと1件あたりのエンコード・デコード時間を比較します
+"""
+
+import sys
+import json
+import time
+import pickle
+import argparse
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src import record_codec
+from src.fake_server import FakeOpenWeatherMap
+from src.models import WeatherData
+from src.weather_api import WeatherAPI
+
+
+def measure(func, iterations: int) -> float:
+    """1件あたりの平均時間（マイクロ秒）を計測"""
+    func()  # ウォームアップ
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - start) * 1_000_000 / iterations
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="キャッシュ値のエンコードのベンチマーク")
+    parser.add_argument('-n', '--iterations', type=int, default=50000, help='計測回数')
+    args = parser.parse_args()
+
+    parse = WeatherAPI.__new__(WeatherAPI)._parse_weather_data
+    weather = parse(FakeOpenWeatherMap().current_weather('Tokyo', 'metric', 'ja'))
+
+    codecs = [
+        ("JSON (to_dict)",
+         lambda w: json.dumps(w.to_dict(), ensure_ascii=False).encode('utf-8'),
+         lambda b: WeatherData.from_dict(json.loads(b))),
+        ("pickle", pickle.dumps, pickle.loads),
+        ("record_codec", record_codec.encode, record_codec.decode),
+    ]
+
+    print(f"{'形式':<16} {'サイズ':>8} {'エンコード':>12} {'デコード':>12}")
+    for label, encode, decode in codecs:
+        data = encode(weather)
+        assert decode(data) == weather
+        encode_us = measure(lambda: encode(weather), args.iterations)
+        decode_us = measure(lambda: decode(data), args.iterations)
+        print(f"{label:<16} {len(data):>6} B {encode_us:>9.2f} us {decode_us:>9.2f} us")
+
+
+if __name__ == "__main__":
+    main()
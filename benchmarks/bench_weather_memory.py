@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+WeatherData のメモリ使用量のベンチマーク
+キャッシュに大量の観測値を保持した場合の1件あたりのバイト数を、
+従来の dataclass（__dict__ あり・文字列の共有なし）と比較します
+"""
+
+import sys
+import gc
+import argparse
+import tracemalloc
+from dataclasses import fields, make_dataclass
+from pathlib import Path
+
+# プロジェクトルートをパスに追加
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.fake_server import FakeOpenWeatherMap, KNOWN_CITIES
+from src.models import WeatherData
+from src.weather_api import WeatherAPI
+
+
+# 変更前と同じ __slots__ なしの dataclass
+LegacyWeatherData = make_dataclass(
+    'LegacyWeatherData', [(field.name, field.type, field) for field in fields(WeatherData) if field.init]
+)
+
+
+def fresh_fields(weather: WeatherData) -> dict:
+    """応答を個別にデコードした場合と同じく、文字列を別オブジェクトにしたフィールドの辞書"""
+    return {
+        field.name: (value.encode('utf-8').decode('utf-8') if isinstance(value, str) else value)
+        for field in fields(weather) if field.init
+        for value in (getattr(weather, field.name),)
+    }
+
+
+def measure(factory, samples, count: int) -> float:
+    """count 件のインスタンスを保持した場合の1件あたりのバイト数を計測"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    instances = [factory(**fresh_fields(samples[i % len(samples)])) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del instances
+    return (after - before) / count
+
+
+def main():
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="WeatherData のメモリ使用量のベンチマーク")
+    parser.add_argument('-n', '--count', type=int, default=100000, help='インスタンス数')
+    args = parser.parse_args()
+
+    parse = WeatherAPI.__new__(WeatherAPI)._parse_weather_data
+    fake = FakeOpenWeatherMap()
+    samples = [parse(fake.current_weather(name, 'metric', lang))
+               for name in KNOWN_CITIES for lang in ('ja', 'en')]
+
+    legacy = measure(LegacyWeatherData, samples, args.count)
+    compact = measure(WeatherData, samples, args.count)
+
+    print(f"{args.count}件（{len(samples)}種類の観測値）を保持した場合の1件あたりのメモリ")
+    print(f"{'従来の dataclass':<24} {legacy:>8.0f} B")
+    print(f"{'WeatherData（slots・intern）':<24} {compact:>8.0f} B  ({compact / legacy:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,26 +7,31 @@ __version__ = "1.0.0"
 __author__ = "Weather App Team"
 
 from .weather_api import WeatherAPI
+from .async_weather_api import AsyncWeatherAPI
 from .models import WeatherData
+from .weather_batch import WeatherBatch
 from .exceptions import (
     WeatherAPIError,
     CityNotFoundError,
     APIKeyError,
     APIConnectionError,
-    APIResponseError
+    APIResponseError,
+    RateLimitExceededError,
+    CircuitOpenError
 )
 from .utils import load_environment, setup_logging
 
 
-def create_weather_client(config_path: str = "config.yaml") -> WeatherAPI:
+def create_weather_client(config_path: str = "config.yaml", cache=None) -> WeatherAPI:
     """
     天気APIクライアントを作成するファクトリ関数
     
     Args:
         config_path: 設定ファイルのパス
+        cache: 天気データのキャッシュ（省略時は設定ファイルから作成）
         
     Returns:
         WeatherAPI: 初期化済みのAPIクライアント
     """
     load_environment()
-    return WeatherAPI(config_path)
\ No newline at end of file
+    return WeatherAPI(config_path, cache=cache)
\ No newline at end of file
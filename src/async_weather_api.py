@@ -0,0 +1,221 @@
+"""
+OpenWeatherMap API 非同期クライアント
+asyncio上で複数都市の天気情報を並行取得する
+"""
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Tuple, Union
+
+try:
+    import aiohttp
+except ImportError:  # aiohttp はオプショナル依存
+    aiohttp = None
+
+from .models import WeatherData
+from .exceptions import WeatherAPIError, APIConnectionError
+from .weather_api import WeatherAPI
+from .transport import RequestsTransport, Transport, TransportResponse
+
+
+class AiohttpTransport(Transport):
+    """aiohttp を使うトランスポート
+
+    HTTP通信だけをイベントループ上の aiohttp セッションで行います。get() は
+    WeatherAPI の同期処理を実行するワーカースレッドから呼び出し、イベントループでの
+    通信の完了を待ちます。bind() でイベントループを指定してから使用してください。
+    """
+
+    def __init__(self, limit_per_host: int = 0):
+        """
+        初期化
+
+        Args:
+            limit_per_host: ホストあたりの最大同時接続数（0 で無制限。同時実行数は呼び出し側で制御）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.limit_per_host = limit_per_host
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """通信を行うイベントループを指定"""
+        self._loop = loop
+
+    async def _get_session(self):
+        """aiohttp セッションを取得（初回呼び出し時に作成）"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit_per_host=self.limit_per_host)
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+
+    async def _request(self, url: str, params: Dict[str, Any], timeout: float) -> TransportResponse:
+        """イベントループ上でGETリクエストを送信"""
+        try:
+            session = await self._get_session()
+            async with session.get(url, params=params,
+                                   timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                return TransportResponse(response.status, await response.read(), response.headers)
+        except asyncio.TimeoutError:
+            self.logger.error(f"APIタイムアウト: {url}")
+            raise APIConnectionError("APIリクエストがタイムアウトしました")
+        except aiohttp.ClientConnectionError:
+            self.logger.error(f"API接続エラー: {url}")
+            raise APIConnectionError("APIサーバーに接続できません")
+        except aiohttp.ClientError as e:
+            self.logger.error(f"APIリクエストエラー: {e}")
+            raise APIConnectionError(f"APIリクエストエラー: {e}")
+
+    def get(self, url: str, params: Dict[str, Any], timeout: float):
+        loop = self._loop
+        if loop is None or loop.is_closed():
+            raise RuntimeError("AiohttpTransport のイベントループが指定されていません")
+        return asyncio.run_coroutine_threadsafe(self._request(url, params, timeout), loop).result()
+
+    async def aclose(self) -> None:
+        """aiohttp セッションを閉じる"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+class AsyncWeatherAPI:
+    """OpenWeatherMap API 非同期連携クラス
+
+    WeatherAPI の同期呼び出しをスレッドプールで実行するため、キャッシュ・ネガティブキャッシュ・
+    同一リクエストの合流・リトライ・レート制限・サーキットブレーカー・都市IDの学習は
+    同期版と共通です。aiohttp がインストールされていて requests トランスポートを使う設定の場合は、
+    HTTP通信を AiohttpTransport でイベントループ上の aiohttp セッションに切り替えます。
+
+    スレッドプールはイベントループの既定のもの（CPU数+4が上限）ではなく専用のものを使い、
+    fetch_many() の concurrency に合わせてワーカー数を増やすため、同時実行数が
+    スレッド数で頭打ちになりません。
+    """
+
+    def __init__(self, config_path: str = "config.yaml"):
+        """
+        初期化
+
+        Args:
+            config_path: 設定ファイルのパス
+        """
+        self.logger = logging.getLogger(__name__)
+        self.sync_client = WeatherAPI(config_path)
+        self.config = self.sync_client.config
+
+        api_config = self.config.get('api', {})
+        self.pool_maxsize = api_config.get('pool_maxsize', 10)
+
+        # requests の代わりに aiohttp で通信（フェイクなど他のトランスポートはそのまま）
+        self.transport: Optional[AiohttpTransport] = None
+        if aiohttp is not None and isinstance(self.sync_client.transport, RequestsTransport):
+            self.transport = AiohttpTransport()
+            self.sync_client.transport = self.transport
+
+        # 同期呼び出しを実行する専用のスレッドプール（初回使用時に作成し、必要に応じて拡大）
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._max_workers = 0
+
+    async def __aenter__(self) -> "AsyncWeatherAPI":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    async def get_current_weather(self, city_name: str, lang: str = None) -> WeatherData:
+        """
+        指定都市の現在の天気情報を非同期で取得
+
+        Args:
+            city_name: 都市名
+            lang: 言語設定（デフォルト: 設定ファイルの defaults.language）
+
+        Returns:
+            WeatherData: 天気情報データ
+
+        Raises:
+            CityNotFoundError: 都市が見つからない場合
+            APIKeyError: APIキーエラー
+            APIConnectionError: 接続エラー
+            APIResponseError: その他のAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
+        """
+        loop = asyncio.get_running_loop()
+        if self.transport is not None:
+            self.transport.bind(loop)
+        executor = self._ensure_workers(self.pool_maxsize)
+        return await loop.run_in_executor(
+            executor, self.sync_client.get_current_weather, city_name, lang
+        )
+
+    def _ensure_workers(self, workers: int) -> ThreadPoolExecutor:
+        """
+        ワーカー数が workers 以上のスレッドプールを返す
+
+        足りない場合は大きいプールに切り替えます（実行中の呼び出しは元のプールで完了させます）。
+        スレッドは必要になった時に作成されるため、上限を大きくしても使わない分のスレッドは作られません。
+
+        Args:
+            workers: 必要なワーカー数
+
+        Returns:
+            ThreadPoolExecutor: スレッドプール
+        """
+        if self._executor is None or self._max_workers < workers:
+            previous = self._executor
+            self._max_workers = max(workers, self._max_workers)
+            self._executor = ThreadPoolExecutor(max_workers=self._max_workers,
+                                                thread_name_prefix="weather-async")
+            if previous is not None:
+                previous.shutdown(wait=False)
+        return self._executor
+
+    async def fetch_many(self, cities: Iterable[str], concurrency: int = 10,
+                         lang: str = None
+                         ) -> AsyncIterator[Tuple[str, Union[WeatherData, WeatherAPIError]]]:
+        """
+        複数都市の天気情報を並行取得し、完了した順に返す
+
+        Args:
+            cities: 都市名のリスト
+            concurrency: 同時実行数の上限
+            lang: 言語設定
+
+        Yields:
+            Tuple[str, Union[WeatherData, WeatherAPIError]]:
+                都市名と取得結果（失敗時は例外オブジェクト）
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency は1以上を指定してください")
+
+        # 同時に concurrency 件の同期呼び出しを実行できるようにする
+        self._ensure_workers(concurrency)
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch_one(city: str):
+            async with semaphore:
+                try:
+                    return city, await self.get_current_weather(city, lang)
+                except WeatherAPIError as e:
+                    return city, e
+
+        tasks = [asyncio.ensure_future(fetch_one(city)) for city in cities]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # 途中で打ち切られた場合は残りのタスクをキャンセル
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def close(self) -> None:
+        """HTTPセッションとスレッドプールを閉じる"""
+        if self.transport is not None:
+            await self.transport.aclose()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+            self._max_workers = 0
+        self.sync_client.close()
@@ -0,0 +1,410 @@
+"""
+天気データのキャッシュ
+TTL（有効期限）とLRU（最近使われていない順の削除）によるプロセス内キャッシュ
+"""
+
+import sys
+import time
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+def estimate_size(value: Any) -> int:
+    """
+    オブジェクトのおおよそのメモリ使用量（バイト）を計算
+
+    dict・list・tuple とインスタンス属性（__dict__・__slots__）を再帰的にたどって合計します。
+    共有されている文字列なども重複して数えるため、上限管理用の概算値です。
+
+    Args:
+        value: 対象オブジェクト
+
+    Returns:
+        int: 概算バイト数
+    """
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, int, float, bool, datetime)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(estimate_size(item) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        return size + estimate_size(attributes)
+    # 親クラスのスロットも含めて値を読む
+    for cls in type(value).__mro__:
+        slots = cls.__dict__.get('__slots__', ())
+        for name in (slots,) if isinstance(slots, str) else slots:
+            try:
+                size += estimate_size(cls.__dict__[name].__get__(value, cls))
+            except (AttributeError, KeyError):
+                continue
+    return size
+
+
+def format_key(key: Hashable) -> str:
+    """
+    キャッシュキーを管理用の文字列に変換
+
+    WeatherAPI のキー (('id', 1850144), 'ja', 'metric') は "id:1850144/ja/metric"、
+    座標のキー (('geo', 35.7, 139.7), 'ja', 'metric') は "geo:35.7,139.7/ja/metric"、
+    ネガティブキャッシュのキー ('q', 'atlantis') は "q:atlantis" になります。
+    前方一致で都市単位・都市と言語単位の指定ができます。
+
+    Args:
+        key: キャッシュキー
+
+    Returns:
+        str: キーの文字列表現
+    """
+    if isinstance(key, (tuple, list)):
+        if len(key) == 2 and key[0] in ('id', 'q'):
+            return f"{key[0]}:{key[1]}"
+        if len(key) == 3 and key[0] == 'geo':
+            return f"geo:{key[1]},{key[2]}"
+        return '/'.join(format_key(part) for part in key)
+    return str(key)
+
+
+def key_from_json(value: Any) -> Hashable:
+    """JSON から復元したキーのリストをタプルに戻す"""
+    if isinstance(value, list):
+        return tuple(key_from_json(item) for item in value)
+    return value
+
+
+class CacheEntry:
+    """キャッシュの1エントリ"""
+
+    __slots__ = ('value', 'stored_at', 'expires_at', 'size', 'hits')
+
+    def __init__(self, value: Any, stored_at: float, expires_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+        self.size = size
+        self.hits = 0
+
+
+class HitCounter:
+    """キーごとのヒット数（プロセス内、スレッドセーフ）
+
+    プロセス外のキャッシュ（共有・ディスク）で人気のキーを調べるために使います。
+    数えるキーが max_keys を超えると、ヒット数の少ない半分を捨てます。
+    """
+
+    def __init__(self, max_keys: int = 1024):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._counts: Dict[Hashable, int] = {}
+
+    def hit(self, key: Hashable) -> None:
+        """ヒットを1回数える"""
+        with self._lock:
+            self._counts[key] = self._counts.get(key, 0) + 1
+            if len(self._counts) > self.max_keys:
+                keep = heapq.nlargest(self.max_keys // 2, self._counts.items(), key=lambda item: item[1])
+                self._counts = dict(keep)
+
+    def discard(self, key: Hashable) -> None:
+        """削除したキーのヒット数を捨てる"""
+        with self._lock:
+            self._counts.pop(key, None)
+
+    def clear(self) -> None:
+        """全キーのヒット数を捨てる"""
+        with self._lock:
+            self._counts.clear()
+
+    def top(self, limit: int, live: Iterable[Hashable]) -> List[Tuple[Hashable, int]]:
+        """保持中のキー（live）のうちヒット数の多い順に limit 件を返す"""
+        live = set(live)
+        with self._lock:
+            counts = [(key, hits) for key, hits in self._counts.items() if key in live]
+        return heapq.nlargest(limit, counts, key=lambda item: item[1])
+
+
+class TTLCache:
+    """TTL付きLRUキャッシュ（スレッドセーフ）
+
+    エントリは ttl 秒で期限切れになります。エントリ数が max_entries、
+    または概算サイズの合計が max_bytes を超えると、最も長く使われていない
+    エントリから削除します。
+
+    期限切れのエントリは stale_while_revalidate・stale_if_error のうち長い方の
+    秒数だけ保持され、lookup() と get_stale_if_error() から参照できます。
+    """
+
+    FRESH = 'fresh'
+    STALE = 'stale'
+    MISS = 'miss'
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 1024,
+                 max_bytes: Optional[int] = None,
+                 stale_while_revalidate: float = 0.0, stale_if_error: float = 0.0):
+        """
+        初期化
+
+        Args:
+            ttl: エントリの有効期限（秒）
+            max_entries: 保持する最大エントリ数
+            max_bytes: 保持する概算サイズの上限（バイト、None で無制限）
+            stale_while_revalidate: 期限切れ後、再取得中に古い値を返してよい秒数
+            stale_if_error: 期限切れ後、上流エラー時に古い値を返してよい秒数
+        """
+        if ttl <= 0:
+            raise ValueError("ttl は正の値を指定してください")
+        if max_entries < 1:
+            raise ValueError("max_entries は1以上を指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self._grace = max(stale_while_revalidate, stale_if_error)
+
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, CacheEntry]" = OrderedDict()
+        self._bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._stale_if_error_hits = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[Dict[str, Any]]) -> Optional["TTLCache"]:
+        """
+        設定辞書からキャッシュを作成
+
+        Args:
+            cache_config: config.yaml の cache セクション
+
+        Returns:
+            Optional[TTLCache]: キャッシュ（設定が無いか無効の場合は None）
+        """
+        if not cache_config or not cache_config.get('enabled', True):
+            return None
+        return cls(
+            ttl=cache_config.get('ttl', 600),
+            max_entries=cache_config.get('max_entries', 1024),
+            max_bytes=cache_config.get('max_bytes'),
+            stale_while_revalidate=cache_config.get('stale_while_revalidate', 0),
+            stale_if_error=cache_config.get('stale_if_error', 0)
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """
+        キャッシュから値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[Any]: 有効期限内の値（無い場合は None）
+        """
+        value, state = self.lookup(key, allow_stale=False)
+        return value if state == self.FRESH else None
+
+    def lookup(self, key: Hashable, allow_stale: bool = True) -> Tuple[Optional[Any], str]:
+        """
+        キャッシュから値と鮮度を取得
+
+        Args:
+            key: キャッシュキー
+            allow_stale: stale_while_revalidate の範囲内の期限切れ値を返すかどうか
+
+        Returns:
+            Tuple[Optional[Any], str]: 値と状態（FRESH / STALE / MISS）
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._get_entry(key, now)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                if entry.expires_at > now:
+                    self._hits += 1
+                    entry.hits += 1
+                    return entry.value, self.FRESH
+                if allow_stale and now - entry.expires_at < self.stale_while_revalidate:
+                    self._stale_hits += 1
+                    entry.hits += 1
+                    return entry.value, self.STALE
+            self._misses += 1
+            return None, self.MISS
+
+    def get_stale_if_error(self, key: Hashable) -> Optional[Any]:
+        """
+        上流エラー時に返す期限切れの値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[Any]: 期限切れから stale_if_error 秒以内の値（無い場合は None）
+        """
+        with self._lock:
+            now = time.monotonic()
+            entry = self._get_entry(key, now)
+            if entry is None or now - entry.expires_at >= self.stale_if_error:
+                return None
+            self._stale_if_error_hits += 1
+            return entry.value
+
+    def _get_entry(self, key: Hashable, now: float) -> Optional[CacheEntry]:
+        """保持期間内のエントリを取得し、期間を過ぎたものは削除（ロック取得中に呼び出す）"""
+        entry = self._entries.get(key)
+        if entry is not None and entry.expires_at + self._grace <= now:
+            self._remove(key)
+            self._expirations += 1
+            return None
+        return entry
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """
+        キャッシュに値を格納
+
+        Args:
+            key: キャッシュキー
+            value: 格納する値
+            ttl: このエントリの有効期限（秒、省略時はキャッシュの ttl）
+        """
+        size = estimate_size(value)
+        now = time.monotonic()
+        entry = CacheEntry(value, now, now + (ttl if ttl is not None else self.ttl), size)
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if self.max_bytes is not None and size > self.max_bytes:
+                self.logger.debug(f"キャッシュ上限を超えるため格納しません: {key}")
+                return
+            self._entries[key] = entry
+            self._bytes += size
+            self._evict()
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        エントリを削除
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            bool: 削除したかどうか
+        """
+        with self._lock:
+            if key not in self._entries:
+                return False
+            self._remove(key)
+            return True
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def _remove(self, key: Hashable) -> CacheEntry:
+        """エントリを削除（ロック取得中に呼び出す）"""
+        entry = self._entries.pop(key)
+        self._bytes -= entry.size
+        return entry
+
+    def _evict(self) -> None:
+        """上限を超えた分を古い順に削除（ロック取得中に呼び出す）"""
+        while self._entries and (
+            len(self._entries) > self.max_entries
+            or (self.max_bytes is not None and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._entries))
+            self._remove(key)
+            self._evictions += 1
+
+    def keys(self) -> List[Hashable]:
+        """
+        保持中のキーを取得（古い値として保持している期限切れのものを含む）
+
+        Returns:
+            List[Hashable]: キーのリスト
+        """
+        with self._lock:
+            return list(self._entries)
+
+    def hot_keys(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """
+        ヒット数の多いキーを取得
+
+        Args:
+            limit: 取得する件数
+
+        Returns:
+            List[Tuple[Hashable, int]]: キーとヒット数（多い順）
+        """
+        with self._lock:
+            return heapq.nlargest(limit, ((key, entry.hits) for key, entry in self._entries.items()),
+                                  key=lambda item: item[1])
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry is not None and entry.expires_at > time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        Returns:
+            Dict[str, Any]: ヒット数・ミス数・古い値の使用数・削除数・エントリ数・概算サイズ
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'stale_hits': self._stale_hits,
+                'stale_if_error_hits': self._stale_if_error_hits,
+                'evictions': self._evictions,
+                'expirations': self._expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+
+def create_cache(cache_config: Optional[Dict[str, Any]]):
+    """
+    設定の backend に応じてキャッシュを作成
+
+    Args:
+        cache_config: config.yaml の cache セクション
+
+    Returns:
+        キャッシュ（設定が無いか無効の場合は None）
+        memory: プロセス内の TTLCache
+        shared: 同一ホストの全ワーカーで共有する SharedMemoryCache
+
+    Raises:
+        ValueError: 未知の backend の場合
+    """
+    if not cache_config or not cache_config.get('enabled', True):
+        return None
+    backend = cache_config.get('backend', 'memory')
+    if backend == 'memory':
+        return TTLCache.from_config(cache_config)
+    if backend == 'shared':
+        from .shared_cache import SharedMemoryCache
+        return SharedMemoryCache.from_config(cache_config)
+    raise ValueError(f"未知のキャッシュバックエンドです: {backend}")
@@ -0,0 +1,222 @@
+"""
+サーキットブレーカー
+上流の障害時に呼び出しを即座に失敗させ、ワーカースレッドの滞留を防ぐ
+"""
+
+import time
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from .exceptions import (
+    WeatherAPIError,
+    APIConnectionError,
+    APIResponseError,
+    RateLimitExceededError,
+    CircuitOpenError
+)
+
+
+class CircuitBreaker:
+    """エラー率ベースのサーキットブレーカー
+
+    直近 window_size 件の呼び出しのうち、失敗の割合が failure_rate_threshold
+    以上になると OPEN になり、open_timeout 秒間は CircuitOpenError で即座に
+    失敗させます。その後 HALF_OPEN となり、half_open_max_calls 件の試行が
+    すべて成功すれば CLOSED に戻ります。
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_rate_threshold: float = 0.5, window_size: int = 20,
+                 minimum_calls: int = 10, open_timeout: float = 30.0,
+                 half_open_max_calls: int = 1):
+        """
+        初期化
+
+        Args:
+            failure_rate_threshold: OPEN にする失敗率（0〜1）
+            window_size: 失敗率を計算する直近の呼び出し数
+            minimum_calls: 失敗率を判定するのに必要な最小呼び出し数
+            open_timeout: OPEN を維持する秒数
+            half_open_max_calls: HALF_OPEN で許可する試行数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.failure_rate_threshold = failure_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_timeout = open_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+
+        self._lock = threading.Lock()
+        self._outcomes = deque(maxlen=window_size)
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._trials_in_flight = 0
+        self._trial_successes = 0
+        self._opened_count = 0
+        self._rejected = 0
+
+    @classmethod
+    def from_config(cls, breaker_config: Optional[Dict[str, Any]]) -> Optional["CircuitBreaker"]:
+        """
+        設定辞書からサーキットブレーカーを作成
+
+        Args:
+            breaker_config: config.yaml の api.circuit_breaker セクション
+
+        Returns:
+            Optional[CircuitBreaker]: ブレーカー（設定が無いか無効の場合は None）
+        """
+        if not breaker_config or not breaker_config.get('enabled', True):
+            return None
+        return cls(
+            failure_rate_threshold=breaker_config.get('failure_rate_threshold', 0.5),
+            window_size=breaker_config.get('window_size', 20),
+            minimum_calls=breaker_config.get('minimum_calls', 10),
+            open_timeout=breaker_config.get('open_timeout', 30.0),
+            half_open_max_calls=breaker_config.get('half_open_max_calls', 1)
+        )
+
+    @property
+    def state(self) -> str:
+        """現在の状態（closed / open / half_open）"""
+        with self._lock:
+            self._update_state(time.monotonic())
+            return self._state
+
+    def _update_state(self, now: float) -> None:
+        """OPEN の期限切れを HALF_OPEN に遷移（ロック取得中に呼び出す）"""
+        if self._state == self.OPEN and now - self._opened_at >= self.open_timeout:
+            self.logger.info("サーキットブレーカー: HALF_OPEN に移行します")
+            self._state = self.HALF_OPEN
+            self._trials_in_flight = 0
+            self._trial_successes = 0
+
+    def _open(self, now: float) -> None:
+        """OPEN に遷移（ロック取得中に呼び出す）"""
+        self._state = self.OPEN
+        self._opened_at = now
+        self._opened_count += 1
+        self._outcomes.clear()
+        self.logger.warning(f"サーキットブレーカー: OPEN に移行します（{self.open_timeout}秒間）")
+
+    def _before_call(self) -> bool:
+        """
+        呼び出し可否を判定
+
+        Returns:
+            bool: HALF_OPEN の試行として許可された場合 True
+
+        Raises:
+            CircuitOpenError: OPEN 中、または試行枠が埋まっている場合
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._update_state(now)
+            if self._state == self.CLOSED:
+                return False
+            if self._state == self.HALF_OPEN and self._trials_in_flight < self.half_open_max_calls:
+                self._trials_in_flight += 1
+                return True
+            self._rejected += 1
+            if self._state == self.OPEN:
+                retry_after = max(0.0, self.open_timeout - (now - self._opened_at))
+            else:
+                retry_after = None
+            raise CircuitOpenError(retry_after=retry_after)
+
+    def _record(self, trial: bool, failure: Optional[bool]) -> None:
+        """
+        呼び出し結果を記録
+
+        Args:
+            trial: HALF_OPEN の試行だったかどうか
+            failure: 失敗なら True、成功なら False、判定対象外なら None
+        """
+        with self._lock:
+            now = time.monotonic()
+            if trial:
+                self._trials_in_flight -= 1
+                if self._state != self.HALF_OPEN or failure is None:
+                    return
+                if failure:
+                    self._open(now)
+                    return
+                self._trial_successes += 1
+                if self._trial_successes >= self.half_open_max_calls:
+                    self.logger.info("サーキットブレーカー: CLOSED に戻ります")
+                    self._state = self.CLOSED
+                    self._outcomes.clear()
+                return
+
+            if failure is None or self._state != self.CLOSED:
+                return
+            self._outcomes.append(failure)
+            calls = len(self._outcomes)
+            if calls >= self.minimum_calls:
+                failure_rate = sum(self._outcomes) / calls
+                if failure_rate >= self.failure_rate_threshold:
+                    self._open(now)
+
+    @staticmethod
+    def is_failure(error: WeatherAPIError) -> Optional[bool]:
+        """
+        例外が上流の障害を示すかどうかを判定
+
+        Returns:
+            Optional[bool]: 障害なら True、正常応答なら False、判定対象外なら None
+        """
+        if isinstance(error, APIConnectionError):
+            return True
+        if isinstance(error, APIResponseError):
+            return error.status_code >= 500 or error.status_code == 429
+        if isinstance(error, RateLimitExceededError):
+            # クライアント側で送信を止めた場合は上流の状態と無関係
+            return None
+        return False
+
+    def call(self, func: Callable[[], Any]) -> Any:
+        """
+        ブレーカーを通して関数を実行
+
+        Args:
+            func: 上流を呼び出す関数
+
+        Returns:
+            Any: 関数の戻り値
+
+        Raises:
+            CircuitOpenError: OPEN 中の場合
+        """
+        trial = self._before_call()
+        try:
+            result = func()
+        except WeatherAPIError as e:
+            self._record(trial, self.is_failure(e))
+            raise
+        except BaseException:
+            self._record(trial, None)
+            raise
+        self._record(trial, False)
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ブレーカーの統計情報を取得
+
+        Returns:
+            Dict[str, Any]: 状態・直近の失敗率・OPEN回数・拒否数
+        """
+        with self._lock:
+            self._update_state(time.monotonic())
+            calls = len(self._outcomes)
+            return {
+                'state': self._state,
+                'failure_rate': round(sum(self._outcomes) / calls, 3) if calls else 0.0,
+                'window_calls': calls,
+                'opened_count': self._opened_count,
+                'rejected': self._rejected
+            }
@@ -0,0 +1,222 @@
+"""
+都市名の正規化
+表記ゆれ（大文字小文字・空白・全角半角・かなカナ漢字・国コード付き）を
+同じ OpenWeatherMap 都市IDにまとめ、キャッシュキーと上流リクエストを共通化する
+"""
+
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, NamedTuple, Optional, Tuple
+
+
+# 都市ID → (英語名, 国コード, 別名)
+SEED_ALIASES: Dict[int, Tuple[str, str, Tuple[str, ...]]] = {
+    1850144: ('Tokyo', 'JP', ('東京', '東京都', 'とうきょう', 'Tokio')),
+    1853909: ('Osaka', 'JP', ('大阪', '大阪市', 'おおさか')),
+    1857910: ('Kyoto', 'JP', ('京都', '京都市', 'きょうと')),
+    1856057: ('Nagoya', 'JP', ('名古屋', '名古屋市', 'なごや')),
+    2128295: ('Sapporo', 'JP', ('札幌', '札幌市', 'さっぽろ')),
+    1863967: ('Fukuoka', 'JP', ('福岡', '福岡市', 'ふくおか')),
+    1862415: ('Hiroshima', 'JP', ('広島', '広島市', 'ひろしま')),
+    2111149: ('Sendai', 'JP', ('仙台', '仙台市', 'せんだい')),
+    2643743: ('London', 'GB', ('ロンドン',)),
+    5128581: ('New York', 'US', ('ニューヨーク', 'NYC', 'New York City')),
+    2988507: ('Paris', 'FR', ('パリ',)),
+}
+
+
+def _strip_latin_accents(text: str) -> str:
+    """ラテン文字の発音記号を除去（Tōkyō → Tokyo）。かなの濁点などは残す"""
+    result = []
+    for char in unicodedata.normalize('NFD', text):
+        if unicodedata.combining(char) and result and result[-1].isascii():
+            continue
+        result.append(char)
+    return unicodedata.normalize('NFC', ''.join(result))
+
+
+def _katakana_to_hiragana(text: str) -> str:
+    """カタカナをひらがなに変換"""
+    return ''.join(chr(ord(c) - 0x60) if 'ァ' <= c <= 'ヶ' else c for c in text)
+
+
+def normalize_query(query: str) -> Tuple[str, Optional[str]]:
+    """
+    都市名の表記ゆれを正規化
+
+    全角半角の統一（NFKC）、前後・連続空白の整理、大文字小文字の統一、
+    カタカナのひらがな化、ラテン文字の発音記号の除去を行い、
+    末尾の ",JP" のような国コードを分離します。
+
+    Args:
+        query: 入力された都市名
+
+    Returns:
+        Tuple[str, Optional[str]]: 正規化した都市名と国コード（大文字、無い場合は None）
+    """
+    text = unicodedata.normalize('NFKC', query)
+    text = text.replace('、', ',')
+    name, _, country = text.partition(',')
+    name = ' '.join(_katakana_to_hiragana(_strip_latin_accents(name)).split()).casefold()
+    country = country.strip().upper() or None
+    return name, country
+
+
+class CityQuery(NamedTuple):
+    """正規化した都市の問い合わせ"""
+    key: Hashable              # キャッシュ・合流のキー（都市IDが分かれば ('id', ID)）
+    query: str                 # 上流へ q= で送る都市名
+    city_id: Optional[int]     # 都市ID（分からない場合は None）
+    use_id: bool               # 上流へ id= で問い合わせるかどうか
+
+
+class CityResolver:
+    """都市名 → 都市ID の対応表
+
+    ローカルの別名表（SEED_ALIASES と設定の city_aliases）で初期化し、
+    上流の応答に含まれる都市IDを学習して拡張します。学習した名前は任意の入力から
+    増えるため、max_learned 件を超えると最も長く使われていないものから削除します。
+    スレッドセーフです。
+    """
+
+    def __init__(self, extra_aliases: Optional[Dict[Any, Iterable[str]]] = None,
+                 max_learned: int = 1024):
+        """
+        初期化
+
+        Args:
+            extra_aliases: 追加の別名表（都市ID → 別名のリスト）
+            max_learned: 学習した名前を保持する最大件数
+        """
+        if max_learned < 1:
+            raise ValueError("max_learned は1以上を指定してください")
+        self.logger = logging.getLogger(__name__)
+        self.max_learned = max_learned
+        self._lock = threading.Lock()
+        self._seeded: Dict[Tuple[str, Optional[str]], int] = {}
+        self._learned: "OrderedDict[Tuple[str, Optional[str]], int]" = OrderedDict()
+        self._evictions = 0
+        self._names: Dict[int, str] = {}
+        self._countries: Dict[int, str] = {}
+
+        for city_id, (name, country, aliases) in SEED_ALIASES.items():
+            self._seed(city_id, name, country, (name,) + aliases)
+        for city_id, aliases in (extra_aliases or {}).items():
+            city_id = int(city_id)
+            name = self._names.get(city_id)
+            aliases = list(aliases)
+            self._seed(city_id, name or aliases[0], self._countries.get(city_id), aliases)
+
+    def _seed(self, city_id: int, name: str, country: Optional[str], aliases: Iterable[str]) -> None:
+        self._names.setdefault(city_id, name)
+        if country:
+            self._countries.setdefault(city_id, country)
+        for alias in aliases:
+            normalized, _ = normalize_query(alias)
+            self._seeded[(normalized, None)] = city_id
+
+    def _get_learned(self, key: Tuple[str, Optional[str]]) -> Optional[int]:
+        """学習結果を探し、見つかれば最近使われたものにする（ロック取得中に呼び出す）"""
+        city_id = self._learned.get(key)
+        if city_id is not None:
+            self._learned.move_to_end(key)
+        return city_id
+
+    def _add_learned(self, key: Tuple[str, Optional[str]], city_id: int) -> None:
+        """学習結果を追加し、上限を超えた分を古い順に削除（ロック取得中に呼び出す）"""
+        if key in self._learned:
+            self._learned.move_to_end(key)
+            return
+        self._learned[key] = city_id
+        while len(self._learned) > self.max_learned:
+            self._learned.popitem(last=False)
+            self._evictions += 1
+
+    def _lookup(self, name: str, country: Optional[str]) -> Optional[int]:
+        """正規化済みの名前と国コードから都市IDを探す（ロック取得中に呼び出す）"""
+        if country is not None:
+            city_id = self._get_learned((name, country))
+            if city_id is not None:
+                return city_id
+        # 国コード無しの名前は別名表を学習結果より優先する
+        city_id = self._seeded.get((name, None)) or self._get_learned((name, None))
+        if city_id is not None and country is not None and self._countries.get(city_id) != country:
+            # 国コードが一致しない同名都市（Paris,US など）は別の都市として扱う
+            return None
+        return city_id
+
+    def resolve(self, query: str) -> Optional[int]:
+        """
+        都市名を都市IDに解決
+
+        Args:
+            query: 都市名（国コード付きも可）
+
+        Returns:
+            Optional[int]: 都市ID（未知の場合は None）
+        """
+        name, country = normalize_query(query)
+        with self._lock:
+            return self._lookup(name, country)
+
+    def canonicalize(self, query: str) -> CityQuery:
+        """
+        都市名を正規化した問い合わせに変換
+
+        Args:
+            query: 入力された都市名
+
+        Returns:
+            CityQuery: キャッシュキーと上流への問い合わせ方法
+        """
+        name, country = normalize_query(query)
+        with self._lock:
+            city_id = self._lookup(name, country)
+            seeded = city_id is not None and self._seeded.get((name, None)) == city_id
+
+        if city_id is None:
+            # 未知の都市は正規化した表記をキーにし、入力の空白・全角だけ整えて問い合わせる
+            cleaned = ' '.join(unicodedata.normalize('NFKC', query).split())
+            key = ('q', f"{name},{country.lower()}" if country else name)
+            return CityQuery(key, cleaned, None, False)
+        if seeded:
+            # 別名表の都市は英語名で問い合わせる
+            return CityQuery(('id', city_id), self._names[city_id], city_id, False)
+        return CityQuery(('id', city_id), query, city_id, True)
+
+    def learn(self, query: str, city_id: int, name: Optional[str] = None,
+              country: Optional[str] = None) -> None:
+        """
+        上流の応答から都市IDを学習
+
+        Args:
+            query: 問い合わせた都市名
+            city_id: 応答の都市ID
+            name: 応答の都市名
+            country: 応答の国コード
+        """
+        normalized_query, query_country = normalize_query(query)
+        with self._lock:
+            self._add_learned((normalized_query, query_country), city_id)
+            if name:
+                self._names.setdefault(city_id, name)
+                normalized_name, _ = normalize_query(name)
+                # 国コード付きの問い合わせ（Paris,US など）の結果は国コード無しの名前に登録しない
+                self._add_learned((normalized_name, query_country), city_id)
+            if country:
+                self._countries.setdefault(city_id, country)
+                normalized, _ = normalize_query(name or query)
+                self._add_learned((normalized, country), city_id)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        対応表の統計情報を取得
+
+        Returns:
+            Dict[str, int]: 別名表・学習済みの件数と、上限超過で削除した学習結果の件数
+        """
+        with self._lock:
+            return {'seeded_aliases': len(self._seeded), 'learned': len(self._learned),
+                    'learned_evictions': self._evictions}
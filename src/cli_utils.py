@@ -144,6 +144,8 @@ def format_weather_display(weather_data) -> str:
         lines.append(f"👁️  視程: {weather_data.visibility / 1000:.1f} km")
     
     lines.append("")
+    if weather_data.observed_at is not None:
+        lines.append(colored_text(f"📡 観測時刻: {weather_data.observed_at.strftime('%Y-%m-%d %H:%M')} (現地時刻)", Colors.MAGENTA))
     lines.append(colored_text(f"🕐 取得時刻: {weather_data.timestamp.strftime('%Y-%m-%d %H:%M:%S')}", Colors.MAGENTA))
     
     return "\n".join(lines)
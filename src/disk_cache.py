@@ -0,0 +1,392 @@
+"""
+ディスクキャッシュ
+SQLite（WALモード）の単一ファイルに天気データを保存し、CLIの複数プロセス間で共有する
+"""
+
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+from .cache import HitCounter, key_from_json
+from .models import WeatherData
+from . import record_codec
+
+
+class SQLiteCache:
+    """SQLite を使ったプロセス間共有キャッシュ
+
+    TTLCache と同じインターフェースで WeatherData を保存します。値は
+    record_codec のバイナリ形式で保存します（以前の JSON 形式の行も読めます）。
+    WALモードのため読み込みは書き込みを待たず、複数のCLIプロセスが同時に
+    同じファイルを使えます。エントリ数・合計サイズが上限を超えると、
+    最終アクセスの古い順に削除します。ヒット時の最終アクセス時刻の更新は
+    touch_interval 秒に1回までとし、読み込みのたびに書き込みが発生しないようにします。
+
+    ファイルのロック待ちの時間切れ（database is locked）や破損などの SQLite のエラーは
+    ログに記録してキャッシュミスとして扱い、天気情報の取得を止めません。
+
+    時刻はプロセス間で比較するため time.time() を使います。
+    """
+
+    FRESH = 'fresh'
+    STALE = 'stale'
+    MISS = 'miss'
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS weather_cache (
+            key TEXT PRIMARY KEY,
+            value BLOB NOT NULL,
+            stored_at REAL NOT NULL,
+            expires_at REAL NOT NULL,
+            accessed_at REAL NOT NULL,
+            size INTEGER NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS weather_cache_accessed ON weather_cache (accessed_at);
+    """
+
+    def __init__(self, path: str, ttl: float = 600.0, max_entries: int = 10000,
+                 max_bytes: Optional[int] = None, stale_if_error: float = 0.0,
+                 busy_timeout: float = 5.0, touch_interval: float = 60.0):
+        """
+        初期化
+
+        Args:
+            path: データベースファイルのパス（~ は展開）
+            ttl: エントリの有効期限（秒）
+            max_entries: 保持する最大エントリ数
+            max_bytes: 保持する合計サイズの上限（バイト、None で無制限）
+            stale_if_error: 期限切れ後、上流エラー時に古い値を返してよい秒数
+            busy_timeout: 他プロセスの書き込みを待つ最大秒数
+            touch_interval: ヒット時に最終アクセス時刻を更新する最短間隔（秒）
+        """
+        if ttl <= 0:
+            raise ValueError("ttl は正の値を指定してください")
+        if max_entries < 1:
+            raise ValueError("max_entries は1以上を指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        # 短命なプロセスでは裏での再取得が完了しないため stale-while-revalidate は使わない
+        self.stale_while_revalidate = 0.0
+        self.stale_if_error = stale_if_error
+        self.touch_interval = touch_interval
+
+        Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=busy_timeout,
+                                     isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(self.SCHEMA)
+
+        self._hits = 0
+        self._misses = 0
+        self._stale_if_error_hits = 0
+        self._evictions = 0
+        self._errors = 0
+        self._key_hits = HitCounter()
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any], path: Optional[str] = None) -> "SQLiteCache":
+        """
+        設定辞書からディスクキャッシュを作成
+
+        有効期限は cache セクション、ファイルパスとサイズ上限は cache.disk セクションから読み込みます。
+
+        Args:
+            cache_config: config.yaml の cache セクション
+            path: データベースファイルのパス（省略時は cache.disk.path）
+
+        Returns:
+            SQLiteCache: ディスクキャッシュ
+        """
+        disk_config = cache_config.get('disk') or {}
+        return cls(
+            path=path or disk_config.get('path', '~/.cache/weather-app/weather.sqlite3'),
+            ttl=cache_config.get('ttl', 600),
+            max_entries=disk_config.get('max_entries', 10000),
+            max_bytes=disk_config.get('max_bytes'),
+            stale_if_error=cache_config.get('stale_if_error', 0),
+            touch_interval=disk_config.get('touch_interval', 60)
+        )
+
+    @staticmethod
+    def _decode(value) -> WeatherData:
+        """保存した値を WeatherData に戻す（以前の形式の JSON 文字列も読み込む）"""
+        if isinstance(value, str):
+            return WeatherData.from_dict(json.loads(value))
+        return record_codec.decode(value)
+
+    def _error(self, action: str, error: Exception) -> None:
+        """SQLite のエラー・壊れたレコードを記録（呼び出し元はキャッシュミスとして扱う）"""
+        self._errors += 1
+        self.logger.warning(f"ディスクキャッシュの{action}に失敗しました: {self.path} ({error})")
+
+    def _load(self, key_text: str, value) -> Optional[WeatherData]:
+        """
+        保存した値を WeatherData に戻す（ロックを保持して呼び出す）
+
+        壊れたレコードや新しいバージョンで書かれたレコードは読めないため、
+        行を削除してキャッシュミスとして扱います。
+
+        Args:
+            key_text: キャッシュキーの文字列
+            value: 保存した値
+
+        Returns:
+            Optional[WeatherData]: 天気データ（読めない場合は None）
+        """
+        try:
+            return self._decode(value)
+        except (ValueError, KeyError, TypeError) as e:
+            self._error("レコードの復元", e)
+        try:
+            self._conn.execute("DELETE FROM weather_cache WHERE key = ?", (key_text,))
+        except sqlite3.Error as e:
+            self._error("壊れたレコードの削除", e)
+        return None
+
+    @staticmethod
+    def _key(key: Hashable) -> str:
+        """キャッシュキーを文字列に変換"""
+        if isinstance(key, tuple):
+            return json.dumps(list(key), ensure_ascii=False)
+        return json.dumps(key, ensure_ascii=False)
+
+    def get(self, key: Hashable) -> Optional[WeatherData]:
+        """
+        キャッシュから値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[WeatherData]: 有効期限内の値（無い場合は None）
+        """
+        value, state = self.lookup(key, allow_stale=False)
+        return value if state == self.FRESH else None
+
+    def lookup(self, key: Hashable, allow_stale: bool = True) -> Tuple[Optional[WeatherData], str]:
+        """
+        キャッシュから値と鮮度を取得
+
+        Args:
+            key: キャッシュキー
+            allow_stale: 互換用（stale-while-revalidate を使わないため常に FRESH か MISS）
+
+        Returns:
+            Tuple[Optional[WeatherData], str]: 値と状態（FRESH / MISS）
+        """
+        now = time.time()
+        key_text = self._key(key)
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value, accessed_at FROM weather_cache WHERE key = ? AND expires_at > ?",
+                    (key_text, now)
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._error("読み込み", e)
+                row = None
+            value = self._load(key_text, row[0]) if row is not None else None
+            if value is None:
+                self._misses += 1
+                return None, self.MISS
+            self._hits += 1
+            if now - row[1] >= self.touch_interval:
+                try:
+                    self._conn.execute(
+                        "UPDATE weather_cache SET accessed_at = ? WHERE key = ?", (now, key_text)
+                    )
+                except sqlite3.Error as e:
+                    # 値は読めているため、最終アクセス時刻を更新できなくてもヒットとして返す
+                    self._error("最終アクセス時刻の更新", e)
+        self._key_hits.hit(key)
+        return value, self.FRESH
+
+    def get_stale_if_error(self, key: Hashable) -> Optional[WeatherData]:
+        """
+        上流エラー時に返す期限切れの値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[WeatherData]: 期限切れから stale_if_error 秒以内の値（無い場合は None）
+        """
+        key_text = self._key(key)
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT value FROM weather_cache WHERE key = ? AND expires_at + ? > ?",
+                    (key_text, self.stale_if_error, time.time())
+                ).fetchone()
+            except sqlite3.Error as e:
+                self._error("読み込み", e)
+                return None
+            value = self._load(key_text, row[0]) if row is not None else None
+            if value is None:
+                return None
+            self._stale_if_error_hits += 1
+        return value
+
+    def set(self, key: Hashable, value: WeatherData, ttl: Optional[float] = None) -> None:
+        """
+        キャッシュに値を格納
+
+        Args:
+            key: キャッシュキー
+            value: 格納する天気データ
+            ttl: このエントリの有効期限（秒、省略時はキャッシュの ttl）
+        """
+        encoded = record_codec.encode(value)
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO weather_cache "
+                    "(key, value, stored_at, expires_at, accessed_at, size) VALUES (?, ?, ?, ?, ?, ?)",
+                    (self._key(key), encoded, now, expires_at, now, len(encoded))
+                )
+                self._prune(now)
+            except sqlite3.Error as e:
+                self._error("書き込み", e)
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        エントリを削除
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            bool: 削除したかどうか
+        """
+        self._key_hits.discard(key)
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM weather_cache WHERE key = ?", (self._key(key),))
+            return cursor.rowcount > 0
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._key_hits.clear()
+        with self._lock:
+            self._conn.execute("DELETE FROM weather_cache")
+
+    def prune(self) -> int:
+        """
+        保持期間切れのエントリと上限超過分を削除
+
+        Returns:
+            int: 削除したエントリ数
+        """
+        with self._lock:
+            return self._prune(time.time())
+
+    def _prune(self, now: float) -> int:
+        """保持期間切れ・上限超過のエントリを削除（ロック取得中に呼び出す）"""
+        removed = self._conn.execute(
+            "DELETE FROM weather_cache WHERE expires_at + ? <= ?", (self.stale_if_error, now)
+        ).rowcount
+
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM weather_cache"
+        ).fetchone()
+        excess = max(0, count - self.max_entries)
+        if self.max_bytes is not None and total > self.max_bytes:
+            # 最終アクセスの古い順に、合計サイズが上限に収まるまで削除
+            overflow = total - self.max_bytes
+            for index, (size,) in enumerate(self._conn.execute(
+                    "SELECT size FROM weather_cache ORDER BY accessed_at")):
+                overflow -= size
+                if overflow <= 0:
+                    excess = max(excess, index + 1)
+                    break
+        if excess:
+            self._conn.execute(
+                "DELETE FROM weather_cache WHERE key IN "
+                "(SELECT key FROM weather_cache ORDER BY accessed_at LIMIT ?)", (excess,)
+            )
+            self._evictions += excess
+            removed += excess
+        return removed
+
+    def keys(self) -> List[Hashable]:
+        """
+        保持中のキーを取得（他のプロセスが格納したものを含む）
+
+        Returns:
+            List[Hashable]: キーのリスト
+        """
+        with self._lock:
+            rows = self._conn.execute("SELECT key FROM weather_cache").fetchall()
+        return [key_from_json(json.loads(key)) for (key,) in rows]
+
+    def hot_keys(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """
+        ヒット数の多いキーを取得（ヒット数はこのプロセス内の値）
+
+        Args:
+            limit: 取得する件数
+
+        Returns:
+            List[Tuple[Hashable, int]]: キーとヒット数（多い順）
+        """
+        return self._key_hits.top(limit, self.keys())
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM weather_cache").fetchone()[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            try:
+                return self._conn.execute(
+                    "SELECT 1 FROM weather_cache WHERE key = ? AND expires_at > ?",
+                    (self._key(key), time.time())
+                ).fetchone() is not None
+            except sqlite3.Error as e:
+                self._error("読み込み", e)
+                return False
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        ヒット数などはこのプロセス内の値、エントリ数・サイズはファイル全体の値です。
+
+        Returns:
+            Dict[str, Any]: ヒット数・ミス数・削除数・エントリ数・サイズ
+        """
+        with self._lock:
+            count, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM weather_cache"
+            ).fetchone()
+            lookups = self._hits + self._misses
+            return {
+                'backend': 'sqlite',
+                'path': self.path,
+                'hits': self._hits,
+                'misses': self._misses,
+                'hit_rate': round(self._hits / lookups, 4) if lookups else 0.0,
+                'stale_hits': 0,
+                'stale_if_error_hits': self._stale_if_error_hits,
+                'evictions': self._evictions,
+                'errors': self._errors,
+                'entries': count,
+                'bytes': total
+            }
+
+    def close(self) -> None:
+        """データベース接続を閉じる"""
+        with self._lock:
+            self._conn.close()
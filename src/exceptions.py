@@ -30,7 +30,23 @@ class APIConnectionError(WeatherAPIError):
 
 class APIResponseError(WeatherAPIError):
     """API応答エラーの例外"""
-    def __init__(self, status_code: int, message: str = None):
+    def __init__(self, status_code: int, message: str = None, retry_after: float = None):
         self.status_code = status_code
+        self.retry_after = retry_after
         error_msg = message or f"APIエラー (ステータスコード: {status_code})"
-        super().__init__(error_msg)
\ No newline at end of file
+        super().__init__(error_msg)
+
+
+class RateLimitExceededError(WeatherAPIError):
+    """クライアント側のレート制限により呼び出しが拒否された場合の例外"""
+    def __init__(self, retry_after: float = None, message: str = None):
+        self.retry_after = retry_after
+        error_msg = message or "API呼び出しのレート制限に達しました"
+        super().__init__(error_msg)
+
+
+class CircuitOpenError(APIConnectionError):
+    """サーキットブレーカーが開いているため呼び出しを即座に失敗させた場合の例外"""
+    def __init__(self, retry_after: float = None):
+        self.retry_after = retry_after
+        super().__init__("APIサーバーの障害を検知したため、一時的に呼び出しを停止しています")
\ No newline at end of file
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""
+ローカル用の OpenWeatherMap 互換フェイクサーバー
+/weather と /group を実APIと同じJSON形式で応答し、遅延・エラー・429を注入できる
+"""
+
+import sys
+import json
+import time
+import random
+import zlib
+import argparse
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from .transport import Transport, TransportResponse
+
+
+# 主要都市（都市ID・国コード・座標・タイムゾーン）
+KNOWN_CITIES = {
+    'Tokyo': (1850144, 'JP', 35.6895, 139.6917, 32400),
+    'Osaka': (1853909, 'JP', 34.6937, 135.5022, 32400),
+    'Kyoto': (1857910, 'JP', 35.0211, 135.7538, 32400),
+    'Nagoya': (1856057, 'JP', 35.1815, 136.9064, 32400),
+    'Sapporo': (2128295, 'JP', 43.0667, 141.35, 32400),
+    'Fukuoka': (1863967, 'JP', 33.6, 130.4167, 32400),
+    'Hiroshima': (1862415, 'JP', 34.4, 132.45, 32400),
+    'Sendai': (2111149, 'JP', 38.2667, 140.8667, 32400),
+    'London': (2643743, 'GB', 51.5085, -0.1257, 3600),
+    'New York': (5128581, 'US', 40.7143, -74.006, -14400),
+    'Paris': (2988507, 'FR', 48.8534, 2.3488, 7200),
+}
+
+# 天気概況（ID, main, 日本語, 英語, アイコン）
+CONDITIONS = [
+    (800, 'Clear', '晴天', 'clear sky', '01d'),
+    (801, 'Clouds', '薄い雲', 'few clouds', '02d'),
+    (804, 'Clouds', '厚い雲', 'overcast clouds', '04d'),
+    (500, 'Rain', '小雨', 'light rain', '10d'),
+    (600, 'Snow', '小雪', 'light snow', '13d'),
+    (701, 'Mist', '靄', 'mist', '50d'),
+]
+
+
+class FakeOpenWeatherMap:
+    """フェイク OpenWeatherMap のリクエスト処理
+
+    都市名と時刻（update_interval 秒単位）から決定的な天気を生成します。
+    HTTPサーバーとインプロセストランスポートの両方から利用されます。
+    """
+
+    def __init__(self, latency_ms: float = 0.0, latency_jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, rate_limit_rate: float = 0.0,
+                 retry_after: int = 1, not_found: Iterable[str] = (),
+                 api_keys: Optional[Iterable[str]] = None,
+                 update_interval: int = 600, seed: Optional[int] = None):
+        """
+        初期化
+
+        Args:
+            latency_ms: 応答前に待機するミリ秒
+            latency_jitter_ms: 待機時間に加えるランダムなミリ秒（0〜指定値）
+            error_rate: 500 エラーを返す確率（0〜1）
+            rate_limit_rate: 429 を返す確率（0〜1）
+            retry_after: 429 応答の Retry-After 秒数
+            not_found: 404 を返す都市名
+            api_keys: 有効なAPIキー（None の場合はすべて有効）
+            update_interval: 天気データが更新される間隔（秒）
+            seed: 乱数シード（エラー注入の再現用）
+        """
+        self.latency_ms = latency_ms
+        self.latency_jitter_ms = latency_jitter_ms
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.not_found = {name.lower() for name in not_found}
+        self.api_keys = set(api_keys) if api_keys is not None else None
+        self.update_interval = update_interval
+
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._names_by_id = {info[0]: name for name, info in KNOWN_CITIES.items()}
+        self.request_count = 0
+
+    @classmethod
+    def from_config(cls, fake_config: Dict[str, Any]) -> "FakeOpenWeatherMap":
+        """
+        設定辞書からフェイクサーバーを作成
+
+        Args:
+            fake_config: config.yaml の fake_server セクション
+
+        Returns:
+            FakeOpenWeatherMap: フェイクサーバー
+        """
+        return cls(
+            latency_ms=fake_config.get('latency_ms', 0.0),
+            latency_jitter_ms=fake_config.get('latency_jitter_ms', 0.0),
+            error_rate=fake_config.get('error_rate', 0.0),
+            rate_limit_rate=fake_config.get('rate_limit_rate', 0.0),
+            retry_after=fake_config.get('retry_after', 1),
+            not_found=fake_config.get('not_found', ()),
+            api_keys=fake_config.get('api_keys'),
+            update_interval=fake_config.get('update_interval', 600),
+            seed=fake_config.get('seed')
+        )
+
+    def handle(self, path: str, params: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        リクエストを処理
+
+        Args:
+            path: リクエストパス
+            params: クエリパラメータ
+
+        Returns:
+            Tuple[int, Dict[str, str], bytes]: ステータスコード・ヘッダー・本文
+        """
+        with self._lock:
+            self.request_count += 1
+            roll_error = self._random.random()
+            roll_limit = self._random.random()
+            jitter = self._random.uniform(0, self.latency_jitter_ms)
+
+        delay = (self.latency_ms + jitter) / 1000
+        if delay > 0:
+            time.sleep(delay)
+
+        if self.api_keys is not None and params.get('appid') not in self.api_keys:
+            return self._error(401, "Invalid API key. Please see https://openweathermap.org/faq#error401 for more info.")
+        if roll_limit < self.rate_limit_rate:
+            status, headers, body = self._error(429, "Your account is temporary blocked due to exceeding of requests limitation of your subscription type.")
+            headers['Retry-After'] = str(self.retry_after)
+            return status, headers, body
+        if roll_error < self.error_rate:
+            return self._error(500, "Internal error")
+
+        units = params.get('units', 'standard')
+        lang = params.get('lang', 'en')
+        endpoint = path.rstrip('/').rsplit('/', 1)[-1]
+
+        if endpoint == 'weather':
+            if 'lat' in params and 'lon' in params:
+                try:
+                    lat, lon = float(params['lat']), float(params['lon'])
+                except ValueError:
+                    return self._error(400, "wrong latitude or longitude")
+                return self._json(200, self.current_weather(self.nearest_city(lat, lon), units, lang))
+            if 'id' in params:
+                raw_id = params['id'].strip()
+                name = self._names_by_id.get(int(raw_id)) if raw_id.isdigit() else None
+                if name is None:
+                    return self._error(404, "city not found")
+                return self._json(200, self.current_weather(name, units, lang))
+            name = params.get('q', '').split(',')[0].strip()
+            if not name or name.lower() in self.not_found:
+                return self._error(404, "city not found")
+            return self._json(200, self.current_weather(name, units, lang))
+
+        if endpoint == 'group':
+            entries = []
+            for raw_id in params.get('id', '').split(','):
+                if not raw_id.strip().isdigit():
+                    return self._error(400, f"{raw_id} is not a city ID")
+                name = self._names_by_id.get(int(raw_id))
+                if name is not None:
+                    entries.append(self.current_weather(name, units, lang))
+            return self._json(200, {'cnt': len(entries), 'list': entries})
+
+        return self._error(404, "Internal error: 404")
+
+    @staticmethod
+    def nearest_city(lat: float, lon: float) -> str:
+        """座標に最も近い主要都市の名前を返す"""
+        return min(KNOWN_CITIES, key=lambda name: (KNOWN_CITIES[name][2] - lat) ** 2
+                   + (KNOWN_CITIES[name][3] - lon) ** 2)
+
+    def city_id(self, name: str) -> int:
+        """都市名に対応する決定的な都市IDを返す"""
+        known = KNOWN_CITIES.get(name)
+        if known is not None:
+            return known[0]
+        city_id = 9000000 + zlib.crc32(name.lower().encode('utf-8')) % 1000000
+        with self._lock:
+            self._names_by_id.setdefault(city_id, name)
+        return city_id
+
+    def current_weather(self, name: str, units: str = 'standard', lang: str = 'en') -> Dict[str, Any]:
+        """
+        都市の現在の天気を生成（/weather と同じ形式）
+
+        Args:
+            name: 都市名
+            units: 単位系（standard / metric / imperial）
+            lang: 言語（ja の場合は日本語の概況）
+
+        Returns:
+            Dict[str, Any]: API応答データ
+        """
+        city_id = self.city_id(name)
+        country, lat, lon, timezone = self._city_info(name)
+        observed = int(time.time()) // self.update_interval * self.update_interval
+
+        # 都市と観測時刻から決定的に天気を生成
+        rng = random.Random(zlib.crc32(f"{city_id}:{observed}".encode('utf-8')))
+        condition_id, main, description_ja, description_en, icon = rng.choice(CONDITIONS)
+        temp_c = rng.uniform(-5.0, 35.0)
+        feels_c = temp_c + rng.uniform(-3.0, 3.0)
+
+        return {
+            'coord': {'lon': lon, 'lat': lat},
+            'weather': [{
+                'id': condition_id,
+                'main': main,
+                'description': description_ja if lang == 'ja' else description_en,
+                'icon': icon
+            }],
+            'base': 'stations',
+            'main': {
+                'temp': self._temperature(temp_c, units),
+                'feels_like': self._temperature(feels_c, units),
+                'temp_min': self._temperature(temp_c - 1.5, units),
+                'temp_max': self._temperature(temp_c + 1.5, units),
+                'pressure': rng.randint(990, 1035),
+                'humidity': rng.randint(20, 100)
+            },
+            'visibility': rng.choice([10000, 8000, 5000, 2000]),
+            'wind': {'speed': round(rng.uniform(0.0, 12.0), 2), 'deg': rng.randint(0, 359)},
+            'clouds': {'all': rng.randint(0, 100)},
+            'dt': observed,
+            'sys': {
+                'type': 2,
+                'id': city_id % 100000,
+                'country': country,
+                'sunrise': observed - 6 * 3600,
+                'sunset': observed + 6 * 3600
+            },
+            'timezone': timezone,
+            'id': city_id,
+            'name': name,
+            'cod': 200
+        }
+
+    @staticmethod
+    def _city_info(name: str) -> Tuple[str, float, float, int]:
+        """国コード・緯度・経度・タイムゾーンを返す"""
+        known = KNOWN_CITIES.get(name)
+        if known is not None:
+            return known[1], known[2], known[3], known[4]
+        crc = zlib.crc32(name.lower().encode('utf-8'))
+        return 'ZZ', round((crc % 18000) / 100 - 90, 4), round((crc // 18000 % 36000) / 100 - 180, 4), 0
+
+    @staticmethod
+    def _temperature(celsius: float, units: str) -> float:
+        """摂氏を指定の単位系に変換"""
+        if units == 'metric':
+            value = celsius
+        elif units == 'imperial':
+            value = celsius * 9 / 5 + 32
+        else:
+            value = celsius + 273.15
+        return round(value, 2)
+
+    @staticmethod
+    def _json(status: int, payload: Dict[str, Any]) -> Tuple[int, Dict[str, str], bytes]:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        return status, {'Content-Type': 'application/json; charset=utf-8'}, body
+
+    def _error(self, status: int, message: str) -> Tuple[int, Dict[str, str], bytes]:
+        return self._json(status, {'cod': str(status), 'message': message})
+
+
+class InProcessTransport(Transport):
+    """ソケットを使わずにフェイクサーバーを直接呼び出すトランスポート"""
+
+    def __init__(self, fake: FakeOpenWeatherMap):
+        """
+        初期化
+
+        Args:
+            fake: フェイク OpenWeatherMap
+        """
+        self.fake = fake
+
+    def get(self, url: str, params: Dict[str, Any], timeout: float):
+        path = urlsplit(url).path
+        str_params = {key: str(value) for key, value in params.items()}
+        status, headers, body = self.fake.handle(path, str_params)
+        return TransportResponse(status, body, headers)
+
+
+def create_handler(fake: FakeOpenWeatherMap):
+    """フェイクサーバー用のHTTPハンドラクラスを作成"""
+
+    class FakeOpenWeatherMapHandler(BaseHTTPRequestHandler):
+        """keep-alive対応のHTTPハンドラ"""
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            parts = urlsplit(self.path)
+            params = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+            status, headers, body = fake.handle(parts.path, params)
+            self.send_response(status)
+            for key, value in headers.items():
+                self.send_header(key, value)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            logging.getLogger(__name__).debug(format % args)
+
+    return FakeOpenWeatherMapHandler
+
+
+def start_fake_server(host: str = '127.0.0.1', port: int = 0,
+                      fake: Optional[FakeOpenWeatherMap] = None) -> Tuple[ThreadingHTTPServer, str]:
+    """
+    フェイクサーバーをバックグラウンドスレッドで起動
+
+    Args:
+        host: 待ち受けアドレス
+        port: 待ち受けポート（0 で空きポート）
+        fake: フェイク OpenWeatherMap（省略時はデフォルト設定）
+
+    Returns:
+        Tuple[ThreadingHTTPServer, str]: サーバーと base_url（停止は server.shutdown()）
+    """
+    fake = fake or FakeOpenWeatherMap()
+    server = ThreadingHTTPServer((host, port), create_handler(fake))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    bound_host, bound_port = server.server_address[:2]
+    return server, f"http://{bound_host}:{bound_port}/data/2.5/"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """メイン実行関数"""
+    parser = argparse.ArgumentParser(description="OpenWeatherMap 互換フェイクサーバー")
+    parser.add_argument('--host', default='127.0.0.1', help='ホストアドレス')
+    parser.add_argument('--port', type=int, default=8081, help='ポート番号')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='応答遅延（ミリ秒）')
+    parser.add_argument('--latency-jitter-ms', type=float, default=0.0, help='遅延のゆらぎ（ミリ秒）')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='500エラーの発生率（0〜1）')
+    parser.add_argument('--rate-limit-rate', type=float, default=0.0, help='429の発生率（0〜1）')
+    parser.add_argument('--not-found', nargs='*', default=[], help='404を返す都市名')
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    fake = FakeOpenWeatherMap(
+        latency_ms=args.latency_ms,
+        latency_jitter_ms=args.latency_jitter_ms,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        not_found=args.not_found
+    )
+    server = ThreadingHTTPServer((args.host, args.port), create_handler(fake))
+    print(f"Fake OpenWeatherMap: http://{args.host}:{args.port}/data/2.5/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nフェイクサーバーを停止しました")
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+ヘッジリクエスト
+応答の遅いリクエストに対して同一リクエストを追加送信し、テールレイテンシを削減する
+"""
+
+import time
+import math
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+from typing import Any, Callable, Dict, Optional
+
+from .exceptions import WeatherAPIError
+
+
+class HedgingPolicy:
+    """パーセンタイル遅延ベースのヘッジリクエスト
+
+    最初のリクエストが直近の応答時間の percentile パーセンタイルを過ぎても
+    応答しない場合に、同一リクエストをもう1本送信し、先に成功した方を採用します。
+    requests は送信中の通信を中断できないため、負けた側は未開始ならキャンセルし、
+    実行中なら結果を破棄します（接続はプールへ返却されます）。
+    最初のリクエストとヘッジは別々のスレッドプールで送信し、ヘッジが詰まっていても
+    最初のリクエストは待たされません。最初のリクエスト用のプールが埋まっている場合は
+    呼び出し元のスレッドでヘッジなしに送信します。
+    """
+
+    def __init__(self, percentile: float = 95.0, initial_delay: float = 0.5,
+                 min_delay: float = 0.05, max_delay: float = 2.0,
+                 window_size: int = 200, min_samples: int = 20,
+                 max_hedge_ratio: float = 0.1, max_workers: int = 16,
+                 max_primary_workers: int = 64):
+        """
+        初期化
+
+        Args:
+            percentile: ヘッジ遅延に使う応答時間のパーセンタイル
+            initial_delay: 計測サンプルが揃うまでのヘッジ遅延（秒）
+            min_delay: ヘッジ遅延の下限（秒）
+            max_delay: ヘッジ遅延の上限（秒）
+            window_size: 保持する直近の応答時間の数
+            min_samples: パーセンタイルを使い始めるサンプル数
+            max_hedge_ratio: リクエスト数に対するヘッジ送信数の上限割合
+            max_workers: ヘッジの送信に使うスレッド数
+            max_primary_workers: 最初のリクエストの送信に使うスレッド数
+        """
+        self.logger = logging.getLogger(__name__)
+        self.percentile = percentile
+        self.initial_delay = initial_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.min_samples = min_samples
+        self.max_hedge_ratio = max_hedge_ratio
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._primary_executor = ThreadPoolExecutor(max_workers=max_primary_workers,
+                                                    thread_name_prefix="hedge-primary")
+        # 空きワーカーの数（埋まっている場合は待ち行列に入れず呼び出し元で送信する）
+        self._primary_slots = threading.BoundedSemaphore(max_primary_workers)
+        self._lock = threading.Lock()
+        self._latencies = deque(maxlen=window_size)
+        self._requests = 0
+        self._hedges_sent = 0
+        self._hedge_wins = 0
+        self._skipped_ratio = 0
+        self._skipped_rate_limit = 0
+        self._skipped_busy = 0
+        self._hedges_refunded = 0
+
+    @classmethod
+    def from_config(cls, hedging_config: Optional[Dict[str, Any]]) -> Optional["HedgingPolicy"]:
+        """
+        設定辞書からヘッジポリシーを作成
+
+        Args:
+            hedging_config: config.yaml の api.hedging セクション
+
+        Returns:
+            Optional[HedgingPolicy]: ヘッジポリシー（enabled でない場合は None）
+        """
+        if not hedging_config or not hedging_config.get('enabled', False):
+            return None
+        return cls(
+            percentile=hedging_config.get('percentile', 95.0),
+            initial_delay=hedging_config.get('initial_delay', 0.5),
+            min_delay=hedging_config.get('min_delay', 0.05),
+            max_delay=hedging_config.get('max_delay', 2.0),
+            window_size=hedging_config.get('window_size', 200),
+            min_samples=hedging_config.get('min_samples', 20),
+            max_hedge_ratio=hedging_config.get('max_hedge_ratio', 0.1),
+            max_workers=hedging_config.get('max_workers', 16),
+            max_primary_workers=hedging_config.get('max_primary_workers', 64)
+        )
+
+    def hedge_delay(self) -> float:
+        """
+        ヘッジを送信するまでの待機秒数を計算
+
+        Returns:
+            float: 待機秒数
+        """
+        with self._lock:
+            samples = sorted(self._latencies)
+        if len(samples) < self.min_samples:
+            delay = self.initial_delay
+        else:
+            index = min(len(samples) - 1, math.ceil(len(samples) * self.percentile / 100) - 1)
+            delay = samples[max(0, index)]
+        return min(self.max_delay, max(self.min_delay, delay))
+
+    def record_latency(self, seconds: float) -> None:
+        """成功した応答の所要時間を記録"""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    def _timed(self, func: Callable[[], Any]) -> Any:
+        """関数を実行し、成功時の所要時間を記録"""
+        start = time.monotonic()
+        result = func()
+        self.record_latency(time.monotonic() - start)
+        return result
+
+    def _start_primary(self, func: Callable[[], Any]) -> Optional[Future]:
+        """
+        最初のリクエストを専用のスレッドプールで開始
+
+        ヘッジ用のスレッドプールの待ち行列に入れると、待ち時間がヘッジ遅延に含まれ、
+        プールが埋まっている間は送信も遅れるため、別のプールで送信します。
+        空きワーカーが無い場合は待ち行列に入れずに None を返します。
+        呼び出し元のスレッドはヘッジが先に成功した場合に結果を返せるよう待機に使います。
+        """
+        if not self._primary_slots.acquire(blocking=False):
+            return None
+        future = self._primary_executor.submit(self._timed, func)
+        future.add_done_callback(lambda _: self._primary_slots.release())
+        return future
+
+    def _may_hedge(self, allow_hedge: Optional[Callable[[], bool]]) -> bool:
+        """ヘッジ送信の可否を判定（ヘッジ率上限・レート制限）"""
+        with self._lock:
+            if self._hedges_sent + 1 > self.max_hedge_ratio * self._requests:
+                self._skipped_ratio += 1
+                return False
+        if allow_hedge is not None and not allow_hedge():
+            with self._lock:
+                self._skipped_rate_limit += 1
+            return False
+        return True
+
+    def call(self, func: Callable[[], Any],
+             allow_hedge: Optional[Callable[[], bool]] = None,
+             refund_hedge: Optional[Callable[[], None]] = None) -> Any:
+        """
+        ヘッジ付きで関数を実行
+
+        Args:
+            func: 1回分のリクエストを行う関数
+            allow_hedge: ヘッジ送信前に呼ばれ、False なら送信しない（レート制限用）
+            refund_hedge: 許可されたヘッジが開始前にキャンセルされた場合に呼ばれる
+
+        Returns:
+            Any: 先に成功した方の戻り値
+
+        Raises:
+            WeatherAPIError: 両方失敗した場合（最初のリクエストの例外を優先）
+        """
+        with self._lock:
+            self._requests += 1
+
+        delay = self.hedge_delay()
+        primary = self._start_primary(func)
+        if primary is None:
+            with self._lock:
+                self._skipped_busy += 1
+            return self._timed(func)
+        done, _ = wait([primary], timeout=delay)
+        if done or not self._may_hedge(allow_hedge):
+            return primary.result()
+
+        self.logger.debug(f"ヘッジリクエストを送信します（{delay:.3f}秒経過）")
+        hedge = self._executor.submit(self._timed, func)
+        with self._lock:
+            self._hedges_sent += 1
+
+        errors = {}
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except WeatherAPIError as e:
+                    errors[future] = e
+                    continue
+                # 負けた側はキャンセル（実行中の場合は結果を破棄）
+                for other in pending:
+                    if other.cancel() and other is hedge:
+                        # 送信していないヘッジのトークンは戻す
+                        with self._lock:
+                            self._hedges_refunded += 1
+                        if refund_hedge is not None:
+                            refund_hedge()
+                if future is hedge:
+                    with self._lock:
+                        self._hedge_wins += 1
+                return result
+
+        raise errors.get(primary) or errors[hedge]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ヘッジの統計情報を取得
+
+        Returns:
+            Dict[str, Any]: ヘッジ送信数・ヘッジ勝率・現在の遅延など
+        """
+        delay = self.hedge_delay()
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'hedges_sent': self._hedges_sent,
+                'hedge_wins': self._hedge_wins,
+                'hedge_rate': round(self._hedges_sent / self._requests, 4) if self._requests else 0.0,
+                'hit_rate': round(self._hedge_wins / self._hedges_sent, 4) if self._hedges_sent else 0.0,
+                'skipped_ratio': self._skipped_ratio,
+                'skipped_rate_limit': self._skipped_rate_limit,
+                'skipped_busy': self._skipped_busy,
+                'hedges_refunded': self._hedges_refunded,
+                'current_delay_seconds': round(delay, 4)
+            }
+
+    def close(self) -> None:
+        """送信用スレッドを停止"""
+        self._executor.shutdown(wait=False)
+        self._primary_executor.shutdown(wait=False)
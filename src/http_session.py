@@ -0,0 +1,90 @@
+"""
+HTTPセッションプール
+keep-alive接続をスレッド間・都市間で再利用するための接続管理
+"""
+
+import os
+import time
+import threading
+import logging
+from typing import Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class SessionPool:
+    """スレッド安全・fork安全なHTTPセッションプール
+
+    セッションはスレッドごとに作成し、接続プール（HTTPAdapter）は
+    全スレッドで共有します。fork後の子プロセスでは親の接続を使わず、
+    新しいプールを作り直します。
+    """
+
+    def __init__(self, pool_connections: int = 10, pool_maxsize: int = 10,
+                 keepalive_timeout: Optional[float] = 60.0):
+        """
+        初期化
+
+        Args:
+            pool_connections: 接続プールを保持するホスト数
+            pool_maxsize: ホストあたりの最大接続数
+            keepalive_timeout: アイドル接続を破棄するまでの秒数（Noneで無期限）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.keepalive_timeout = keepalive_timeout
+
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        """接続プールとスレッドローカルセッションを作り直す"""
+        self._pid = os.getpid()
+        self._generation = getattr(self, '_generation', 0) + 1
+        self._local = threading.local()
+        self._adapter = HTTPAdapter(
+            pool_connections=self.pool_connections,
+            pool_maxsize=self.pool_maxsize,
+            max_retries=0
+        )
+        self._last_used = time.monotonic()
+
+    def get_session(self) -> requests.Session:
+        """
+        現在のスレッド用のセッションを取得
+
+        Returns:
+            requests.Session: 共有接続プールを使うセッション
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._pid != os.getpid():
+                # fork後は親プロセスのソケットを共有しない
+                self.logger.debug("fork を検出したため接続プールを再作成します")
+                self._reset()
+            elif (self.keepalive_timeout is not None
+                  and now - self._last_used > self.keepalive_timeout):
+                self.logger.debug("keep-alive 期限切れのため接続プールを再作成します")
+                self._adapter.close()
+                self._reset()
+            self._last_used = now
+            generation = self._generation
+            adapter = self._adapter
+            local = self._local
+
+        session = getattr(local, 'session', None)
+        if session is None or getattr(local, 'generation', None) != generation:
+            session = requests.Session()
+            session.mount('https://', adapter)
+            session.mount('http://', adapter)
+            local.session = session
+            local.generation = generation
+        return session
+
+    def close(self) -> None:
+        """プール内の全接続を閉じる"""
+        with self._lock:
+            self._adapter.close()
+            self._reset()
@@ -0,0 +1,77 @@
+"""
+JSONエンコード・デコード
+上流の応答本文（バイト列）を直接解析し、応答本文をバイト列として直接作成する。
+orjson がインストールされていれば使用する
+"""
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # orjson はオプショナル依存
+    orjson = None
+
+
+# 使用中のJSONライブラリ名（ベンチマーク・ログ用）
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+
+def loads(data: bytes) -> Any:
+    """
+    バイト列をJSONとして解析
+
+    文字コード判定を行わず UTF-8 として直接解析します。
+
+    Args:
+        data: JSON本文
+
+    Returns:
+        Any: 解析結果
+
+    Raises:
+        ValueError: JSONとして不正な場合
+    """
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(value: Any) -> bytes:
+    """
+    値をJSON（UTF-8のバイト列）にエンコード
+
+    Args:
+        value: エンコードする値（dict・list・str・数値・bool・None）
+
+    Returns:
+        bytes: JSON本文
+
+    Raises:
+        TypeError: JSONにできない値を含む場合
+    """
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def decode_response(response) -> Any:
+    """
+    HTTP応答の本文をJSONとして解析
+
+    本文がバイト列の場合は loads() で直接解析し、それ以外（テスト用のモックなど）は
+    応答オブジェクトの json() に委ねます。
+
+    Args:
+        response: content と json() を持つ応答オブジェクト
+
+    Returns:
+        Any: 解析結果
+
+    Raises:
+        ValueError: JSONとして不正な場合
+    """
+    content = getattr(response, 'content', None)
+    if isinstance(content, (bytes, bytearray)):
+        return loads(content)
+    return response.json()
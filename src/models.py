@@ -3,14 +3,63 @@
 APIレスポンスを構造化したデータクラス
 """
 
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field, fields
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
+from .json_codec import dumps
 
+
+# is_stale のデータを返した理由（stale_reason）
+STALE_REVALIDATING = 'revalidating'      # 期限切れの値を返し、裏で再取得中（stale-while-revalidate）
+STALE_UPSTREAM_ERROR = 'upstream_error'  # 上流エラーのため期限切れの値を返した（stale-if-error）
+
+
+# 同じ値が大量のインスタンスで繰り返される文字列フィールド（sys.intern で1つの文字列を共有）
+INTERNED_FIELDS = ('city_name', 'country', 'description', 'description_en')
+
+
+def observation_time(dt: Optional[int], utc_offset: Optional[int] = None) -> Optional[datetime]:
+    """
+    API応答の dt（UNIX時刻）と timezone（UTCからのずれ、秒）から観測時刻を作成
+
+    Args:
+        dt: 観測時刻（UNIX時刻）
+        utc_offset: 都市のUTCからのずれ（秒、省略時はUTC）
+
+    Returns:
+        Optional[datetime]: 都市の現地時刻のタイムゾーン付き観測時刻（dt が無い場合は None）
+    """
+    if dt is None:
+        return None
+    return datetime.fromtimestamp(dt, timezone(timedelta(seconds=utc_offset or 0)))
+
+
+def _with_slots(cls: type) -> type:
+    """
+    データクラスを __slots__ 付きのクラスとして作り直す
+
+    dataclass(slots=True) は Python 3.10 以降のため、同じ処理を行います。
+    フィールドの既定値は生成済みの __init__ が保持しているため、クラス属性からは削除します。
+    """
+    names = tuple(item.name for item in fields(cls))
+    namespace = {key: value for key, value in cls.__dict__.items()
+                 if key not in names and key not in ('__dict__', '__weakref__')}
+    namespace['__slots__'] = names
+    return type(cls)(cls.__name__, cls.__bases__, namespace)
+
+
+@_with_slots
 @dataclass
 class WeatherData:
-    """天気情報を格納するデータクラス"""
+    """天気情報を格納するデータクラス
+
+    キャッシュに大量のインスタンスを保持するため、__slots__ でインスタンスごとの
+    __dict__ を持たず、都市名・国名・天気概況は生成時に intern して同じ文字列を共有します。
+    キャッシュ内のインスタンスは他の呼び出し元と共有されるため、値を変える場合は
+    属性への代入ではなく dataclasses.replace() で新しいインスタンスを作成してください。
+    """
     city_name: str                    # 都市名
     country: str                      # 国名
     temperature: float                # 気温（℃）
@@ -23,6 +72,18 @@ class WeatherData:
     wind_direction: Optional[int]     # 風向（度）
     visibility: Optional[int]         # 視程（メートル）
     timestamp: datetime               # データ取得時刻
+    is_stale: bool = False            # 有効期限切れのキャッシュから返したデータかどうか
+    observed_at: Optional[datetime] = None  # 上流での観測時刻（都市の現地時刻、タイムゾーン付き）
+    stale_reason: Optional[str] = None  # is_stale の理由（STALE_REVALIDATING / STALE_UPSTREAM_ERROR）
+    _json: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)  # to_json() の結果
+    
+    def __post_init__(self) -> None:
+        """繰り返し現れる文字列を intern"""
+        self._json = None  # init=False のフィールドは __slots__ のクラスでは既定値が設定されない
+        for name in INTERNED_FIELDS:
+            value = getattr(self, name)
+            if type(value) is str:
+                setattr(self, name, sys.intern(value))
     
     def __str__(self) -> str:
         """天気情報の文字列表現"""
@@ -48,5 +109,36 @@ class WeatherData:
             'wind_speed': self.wind_speed,
             'wind_direction': self.wind_direction,
             'visibility': self.visibility,
-            'timestamp': self.timestamp.isoformat()
-        }
\ No newline at end of file
+            'timestamp': self.timestamp.isoformat(),
+            'is_stale': self.is_stale,
+            'observed_at': self.observed_at.isoformat() if self.observed_at is not None else None,
+            'stale_reason': self.stale_reason
+        }
+    
+    def to_json(self) -> bytes:
+        """
+        to_dict() の JSON（UTF-8のバイト列）
+        
+        初回のみエンコードしてインスタンスに保持し、以降は同じバイト列を返します。
+        WeatherAPI はキャッシュへの格納時に作成し、エントリのサイズに含めます。
+        キャッシュのエントリは lang・units ごとに別のインスタンスのため、キャッシュヒットでは
+        変種ごとに作成済みのバイト列をそのまま応答に書き込めます。保持後に属性へ代入した
+        場合は反映されないため、値を変える場合は dataclasses.replace() を使用してください。
+        
+        Returns:
+            bytes: JSON本文
+        """
+        body = self._json
+        if body is None:
+            body = self._json = dumps(self.to_dict())
+        return body
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> "WeatherData":
+        """to_dict() の出力から復元（ディスクキャッシュで使用）"""
+        fields = dict(data)
+        fields['timestamp'] = datetime.fromisoformat(fields['timestamp'])
+        if fields.get('observed_at') is not None:
+            fields['observed_at'] = datetime.fromisoformat(fields['observed_at'])
+        return cls(**fields)
+
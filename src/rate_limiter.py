@@ -0,0 +1,206 @@
+"""
+クライアント側レート制限
+OpenWeatherMap のプラン上限を超えないよう、トークンバケットで呼び出しを制御する
+"""
+
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+from .exceptions import RateLimitExceededError
+
+
+class TokenBucketRateLimiter:
+    """トークンバケット方式のレートリミッター
+
+    1分あたり calls_per_minute 個のトークンを補充し、最大 burst 個まで
+    貯めておけます。トークンが無い場合、mode が "wait" なら max_wait 秒まで
+    待機し、"reject" なら即座に RateLimitExceededError を送出します。
+    """
+
+    MODES = ('wait', 'reject')
+
+    def __init__(self, calls_per_minute: float, burst: Optional[float] = None,
+                 mode: str = 'wait', max_wait: float = 5.0):
+        """
+        初期化
+
+        Args:
+            calls_per_minute: 1分あたりの呼び出し上限
+            burst: 貯めておけるトークン数（デフォルト: 1分あたりの上限と同じ）
+            mode: トークンが無い場合の動作（wait / reject）
+            max_wait: wait モードでの最大待機秒数
+        """
+        if calls_per_minute <= 0:
+            raise ValueError("calls_per_minute は正の値を指定してください")
+        if mode not in self.MODES:
+            raise ValueError(f"mode は {', '.join(self.MODES)} のいずれかを指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.rate = calls_per_minute / 60.0
+        self.capacity = float(burst if burst is not None else calls_per_minute)
+        self.mode = mode
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._prepaid = threading.local()
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._acquired = 0
+        self._waited = 0
+        self._rejected = 0
+        self._wait_time = 0.0
+
+    def _refill(self, now: float) -> None:
+        """経過時間に応じてトークンを補充（ロック取得中に呼び出す）"""
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, reserve: float = 0.0) -> bool:
+        """
+        待機せずにトークンを1つ取得
+
+        Args:
+            reserve: 取得後に残っている必要があるトークン数（下回る場合は取得しない）
+
+        Returns:
+            bool: 取得できたかどうか
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens - 1.0 >= reserve:
+                self._tokens -= 1.0
+                self._acquired += 1
+                return True
+            return False
+
+    def refund(self) -> None:
+        """try_acquire() で取得したが使わなかったトークンを戻す"""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + 1.0)
+            self._acquired -= 1
+
+    def available(self) -> float:
+        """
+        消費せずに現在のトークン数を取得
+
+        Returns:
+            float: 利用可能なトークン数
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return max(0.0, self._tokens)
+
+    def acquire(self) -> float:
+        """
+        トークンを1つ取得（mode に応じて待機または拒否）
+
+        Returns:
+            float: 待機した秒数
+
+        Raises:
+            RateLimitExceededError: 待機上限内にトークンを取得できない場合
+        """
+        if getattr(self._prepaid, 'active', False):
+            # try_acquire() で取得済みのトークンを使う
+            self._prepaid.active = False
+            return 0.0
+
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                self._acquired += 1
+                return 0.0
+
+            # 次のトークンが補充されるまでの秒数（予約済みの待機分を含む）
+            wait = (1.0 - self._tokens) / self.rate
+            if self.mode == 'reject' or wait > self.max_wait:
+                self._rejected += 1
+                raise RateLimitExceededError(retry_after=wait)
+
+            # トークンを予約して待機（先着順に補充分を割り当てる）
+            self._tokens -= 1.0
+            self._acquired += 1
+            self._waited += 1
+            self._wait_time += wait
+
+        self.logger.debug(f"レート制限のため {wait:.2f}秒待機します")
+        time.sleep(wait)
+        return wait
+
+    @contextmanager
+    def prepaid(self) -> Iterator[None]:
+        """
+        try_acquire() で取得済みのトークンを、このスレッドの次の acquire() に充てる
+
+        確認と消費を同時に行ってから通常の呼び出し経路でリクエストする場合に使います。
+        ブロック内で acquire() が呼ばれなかった場合（キャッシュヒットなど）はトークンを戻します。
+        """
+        self._prepaid.active = True
+        try:
+            yield
+        finally:
+            if self._prepaid.active:
+                self._prepaid.active = False
+                self.refund()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        レート制限の統計情報を取得
+
+        Returns:
+            Dict[str, Any]: 取得数・待機数・拒否数などの統計
+        """
+        with self._lock:
+            self._refill(time.monotonic())
+            return {
+                'acquired': self._acquired,
+                'waited': self._waited,
+                'rejected': self._rejected,
+                'wait_time_seconds': round(self._wait_time, 3),
+                'available_tokens': round(max(0.0, self._tokens), 2)
+            }
+
+
+# プロセス内で共有するリミッター（APIキーと設定の組ごとにクォータを管理）
+_shared_limiters: Dict[Tuple, TokenBucketRateLimiter] = {}
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter(name: str, rate_config: Dict[str, Any]) -> Optional[TokenBucketRateLimiter]:
+    """
+    プロセス内で共有されるレートリミッターを取得
+
+    同じ name・同じ設定に対しては、全スレッド・全 WeatherAPI インスタンスで
+    同じリミッターを返します。
+
+    Args:
+        name: 共有キー（APIキーなど、クォータの単位）
+        rate_config: config.yaml の api.rate_limit セクション
+
+    Returns:
+        Optional[TokenBucketRateLimiter]: リミッター（calls_per_minute 未設定の場合は None）
+    """
+    calls_per_minute = rate_config.get('calls_per_minute')
+    if not calls_per_minute:
+        return None
+
+    burst = rate_config.get('burst')
+    mode = rate_config.get('mode', 'wait')
+    max_wait = rate_config.get('max_wait', 5.0)
+    key = (name, calls_per_minute, burst, mode, max_wait)
+
+    with _shared_lock:
+        limiter = _shared_limiters.get(key)
+        if limiter is None:
+            limiter = TokenBucketRateLimiter(
+                calls_per_minute=calls_per_minute,
+                burst=burst,
+                mode=mode,
+                max_wait=max_wait
+            )
+            _shared_limiters[key] = limiter
+        return limiter
@@ -0,0 +1,224 @@
+"""
+天気データのバイナリエンコード
+WeatherData を固定レイアウトのバイト列に変換し、共有キャッシュ・ディスクキャッシュ・
+プロセス間通信で JSON より小さく速く受け渡す
+"""
+
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional, Tuple, Union
+
+from .models import STALE_REVALIDATING, STALE_UPSTREAM_ERROR, WeatherData
+
+
+# 固定長部分: マジック・フォーマットバージョン・フラグ・気温・体感温度・風速・湿度・気圧・
+# 風向・視程・時刻（エポックからのマイクロ秒）・UTCオフセット（秒）
+RECORD = struct.Struct('<2sBBdddiihiqi')
+MAGIC = b'WX'
+VERSION = 2
+
+# バージョン2で追加: 観測時刻（UTCのエポックからのマイクロ秒）・都市のUTCオフセット（秒）
+OBSERVED = struct.Struct('<qi')
+
+# 文字列: 辞書のコード（INLINE の場合は長さ＋UTF-8バイト列が続く）
+CODE = struct.Struct('<H')
+INLINE = 0xFFFF
+
+# フラグ
+FLAG_STALE = 0x01
+FLAG_NO_WIND_SPEED = 0x02
+FLAG_NO_WIND_DIRECTION = 0x04
+FLAG_NO_VISIBILITY = 0x08
+FLAG_AWARE = 0x10
+FLAG_OBSERVED = 0x20
+FLAG_STALE_REVALIDATING = 0x40
+FLAG_STALE_UPSTREAM_ERROR = 0x80
+
+# stale_reason とフラグの対応
+STALE_REASON_FLAGS = {
+    STALE_REVALIDATING: FLAG_STALE_REVALIDATING,
+    STALE_UPSTREAM_ERROR: FLAG_STALE_UPSTREAM_ERROR,
+}
+
+
+def stale_reason_from_flags(flags: int) -> Optional[str]:
+    """フラグから stale_reason を取り出す"""
+    for reason, flag in STALE_REASON_FLAGS.items():
+        if flags & flag:
+            return reason
+    return None
+
+
+EPOCH = datetime(1970, 1, 1)
+UTC_EPOCH = EPOCH.replace(tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+# 文字列辞書（追記のみ可。既存のコードを変えるとエンコード済みのレコードが読めなくなる）
+STRING_TABLE: Tuple[str, ...] = (
+    # 国コード
+    'JP', 'US', 'GB', 'FR', 'DE', 'IT', 'ES', 'CN', 'KR', 'TW', 'HK', 'SG', 'TH', 'VN', 'PH',
+    'ID', 'MY', 'IN', 'AU', 'NZ', 'CA', 'MX', 'BR', 'AR', 'RU', 'NL', 'BE', 'CH', 'AT', 'SE',
+    'NO', 'DK', 'FI', 'IE', 'PT', 'PL', 'CZ', 'GR', 'TR', 'AE', 'EG', 'ZA',
+    # 天気の分類（weather.main）
+    'Clear', 'Clouds', 'Rain', 'Drizzle', 'Thunderstorm', 'Snow', 'Mist', 'Smoke', 'Haze',
+    'Dust', 'Fog', 'Sand', 'Ash', 'Squall', 'Tornado',
+    # 天気概況（lang=ja）
+    '晴天', '晴れ', '薄い雲', '雲', '曇りがち', '厚い雲', '曇り', '小雨', '適度な雨', '強い雨',
+    '激しい雨', '非常に激しい雨', 'にわか雨', '霧雨', '雨', '小雪', '雪', '大雪', 'みぞれ',
+    '雷雨', '霧', '靄', '煙', '砂塵', '竜巻',
+    # 天気概況（lang=en）
+    'clear sky', 'few clouds', 'scattered clouds', 'broken clouds', 'overcast clouds',
+    'light rain', 'moderate rain', 'heavy intensity rain', 'very heavy rain', 'extreme rain',
+    'freezing rain', 'light intensity shower rain', 'shower rain', 'heavy intensity shower rain',
+    'light intensity drizzle', 'drizzle', 'heavy intensity drizzle', 'light snow', 'snow',
+    'heavy snow', 'sleet', 'light rain and snow', 'rain and snow', 'light shower snow',
+    'shower snow', 'thunderstorm', 'thunderstorm with light rain', 'thunderstorm with rain',
+    'thunderstorm with heavy rain', 'mist', 'smoke', 'haze', 'fog', 'sand', 'dust',
+    # 主要都市
+    'Tokyo', 'Osaka', 'Kyoto', 'Nagoya', 'Sapporo', 'Fukuoka', 'Hiroshima', 'Sendai',
+    'London', 'New York', 'Paris',
+)
+STRING_CODES: Dict[str, int] = {value: code for code, value in enumerate(STRING_TABLE)}
+
+
+def _encode_string(value: str, parts: List[bytes]) -> None:
+    """文字列を辞書のコード、または長さ付きのUTF-8バイト列として追加"""
+    code = STRING_CODES.get(value)
+    if code is not None:
+        parts.append(CODE.pack(code))
+        return
+    raw = value.encode('utf-8')
+    parts.append(CODE.pack(INLINE))
+    parts.append(CODE.pack(len(raw)))
+    parts.append(raw)
+
+
+def _decode_string(data: bytes, offset: int) -> Tuple[str, int]:
+    """offset から文字列を1つ読み、文字列と次の offset を返す"""
+    code = CODE.unpack_from(data, offset)[0]
+    offset += CODE.size
+    if code != INLINE:
+        return STRING_TABLE[code], offset
+    length = CODE.unpack_from(data, offset)[0]
+    offset += CODE.size
+    end = offset + length
+    if end > len(data):
+        raise ValueError("レコードが途中で切れています")
+    return data[offset:end].decode('utf-8'), end
+
+
+def encode(weather_data: WeatherData) -> bytes:
+    """
+    WeatherData をバイナリレコードに変換
+
+    Args:
+        weather_data: 天気データ
+
+    Returns:
+        bytes: バイナリレコード
+    """
+    flags = FLAG_STALE if weather_data.is_stale else 0
+    flags |= STALE_REASON_FLAGS.get(weather_data.stale_reason, 0)
+    wind_speed = weather_data.wind_speed
+    if wind_speed is None:
+        flags |= FLAG_NO_WIND_SPEED
+        wind_speed = 0.0
+    wind_direction = weather_data.wind_direction
+    if wind_direction is None:
+        flags |= FLAG_NO_WIND_DIRECTION
+        wind_direction = 0
+    visibility = weather_data.visibility
+    if visibility is None:
+        flags |= FLAG_NO_VISIBILITY
+        visibility = 0
+
+    # 時刻は現地時刻のままマイクロ秒で保存し、タイムゾーン付きの場合はUTCオフセットも保存
+    timestamp = weather_data.timestamp
+    offset = timestamp.utcoffset()
+    utc_offset = 0
+    if offset is not None:
+        flags |= FLAG_AWARE
+        utc_offset = int(offset.total_seconds())
+        timestamp = timestamp.replace(tzinfo=None)
+    micros = (timestamp - EPOCH) // MICROSECOND
+
+    observed_at = weather_data.observed_at
+    observed_micros = observed_offset = 0
+    if observed_at is not None:
+        flags |= FLAG_OBSERVED
+        observed_micros = (observed_at - UTC_EPOCH) // MICROSECOND
+        observed_offset = int(observed_at.utcoffset().total_seconds())
+
+    parts = [RECORD.pack(
+        MAGIC, VERSION, flags,
+        weather_data.temperature, weather_data.feels_like, wind_speed,
+        weather_data.humidity, weather_data.pressure, wind_direction, visibility,
+        micros, utc_offset
+    ), OBSERVED.pack(observed_micros, observed_offset)]
+    for value in (weather_data.city_name, weather_data.country,
+                  weather_data.description, weather_data.description_en):
+        _encode_string(value, parts)
+    return b''.join(parts)
+
+
+def decode(data: Union[bytes, bytearray, memoryview]) -> WeatherData:
+    """
+    バイナリレコードを WeatherData に変換
+
+    Args:
+        data: encode() で作成したバイト列
+
+    Returns:
+        WeatherData: 天気データ
+
+    Raises:
+        ValueError: マジック・バージョンが不正、またはレコードが壊れている場合
+    """
+    try:
+        (magic, version, flags, temperature, feels_like, wind_speed, humidity, pressure,
+         wind_direction, visibility, micros, utc_offset) = RECORD.unpack_from(data)
+    except struct.error as e:
+        raise ValueError(f"レコードが途中で切れています: {e}")
+    if magic != MAGIC:
+        raise ValueError("天気データのレコードではありません")
+    if version > VERSION:
+        raise ValueError(f"未対応のレコードバージョンです: {version}")
+
+    try:
+        offset = RECORD.size
+        observed_at = None
+        if version >= 2:
+            observed_micros, observed_offset = OBSERVED.unpack_from(data, offset)
+            offset += OBSERVED.size
+            if flags & FLAG_OBSERVED:
+                observed_at = (UTC_EPOCH + timedelta(microseconds=observed_micros)).astimezone(
+                    timezone(timedelta(seconds=observed_offset))
+                )
+        city_name, offset = _decode_string(data, offset)
+        country, offset = _decode_string(data, offset)
+        description, offset = _decode_string(data, offset)
+        description_en, offset = _decode_string(data, offset)
+    except (struct.error, IndexError, UnicodeDecodeError) as e:
+        raise ValueError(f"レコードが壊れています: {e}")
+
+    timestamp = EPOCH + timedelta(microseconds=micros)
+    if flags & FLAG_AWARE:
+        timestamp = timestamp.replace(tzinfo=timezone(timedelta(seconds=utc_offset)))
+
+    return WeatherData(
+        city_name=city_name,
+        country=country,
+        temperature=temperature,
+        feels_like=feels_like,
+        humidity=humidity,
+        pressure=pressure,
+        description=description,
+        description_en=description_en,
+        wind_speed=None if flags & FLAG_NO_WIND_SPEED else wind_speed,
+        wind_direction=None if flags & FLAG_NO_WIND_DIRECTION else wind_direction,
+        visibility=None if flags & FLAG_NO_VISIBILITY else visibility,
+        timestamp=timestamp,
+        is_stale=bool(flags & FLAG_STALE),
+        observed_at=observed_at,
+        stale_reason=stale_reason_from_flags(flags)
+    )
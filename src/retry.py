@@ -0,0 +1,244 @@
+"""
+リトライ制御
+指数バックオフ＋ジッター、Retry-After ヘッダー、リトライ予算による再試行
+"""
+
+import time
+import random
+import logging
+import threading
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from .exceptions import WeatherAPIError, APIConnectionError, APIResponseError
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """
+    Retry-After ヘッダーを秒数に変換
+
+    Args:
+        value: ヘッダー値（秒数 または HTTP日付）
+
+    Returns:
+        Optional[float]: 待機秒数（解釈できない場合は None）
+    """
+    if not isinstance(value, str) or not value.strip():
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class RetryBudget:
+    """リトライ予算
+
+    リクエストごとに ratio 分のトークンを積み立て、リトライ1回につき
+    トークンを1つ消費します。障害時にリトライが上流への負荷を
+    増幅させないよう、リトライ数をリクエスト数の一定割合に抑えます。
+    """
+
+    def __init__(self, ratio: float = 0.2, max_tokens: float = 10.0):
+        """
+        初期化
+
+        Args:
+            ratio: リクエスト1件あたりに積み立てるトークン数
+            max_tokens: トークンの上限
+        """
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self._tokens = max_tokens
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        """リクエスト1件分のトークンを積み立てる"""
+        with self._lock:
+            self._tokens = min(self.max_tokens, self._tokens + self.ratio)
+
+    def try_withdraw(self) -> bool:
+        """
+        リトライ1回分のトークンを消費
+
+        Returns:
+            bool: リトライ可能かどうか
+        """
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        """現在のトークン数"""
+        with self._lock:
+            return self._tokens
+
+
+class RetryPolicy:
+    """リトライポリシー
+
+    APIConnectionError（タイムアウト・接続エラー）と、retry_statuses に
+    含まれるステータスの APIResponseError を再試行対象とします。
+    """
+
+    def __init__(self, max_attempts: int = 1, backoff_base: float = 0.5,
+                 backoff_max: float = 8.0, max_retry_after: float = 10.0,
+                 retry_statuses: Iterable[int] = (429, 500, 502, 503, 504),
+                 budget: Optional[RetryBudget] = None):
+        """
+        初期化
+
+        Args:
+            max_attempts: 最大試行回数（1でリトライなし）
+            backoff_base: バックオフの基準秒数
+            backoff_max: バックオフの上限秒数
+            max_retry_after: 従う Retry-After の上限秒数（超える場合はリトライしない）
+            retry_statuses: 再試行するHTTPステータスコード
+            budget: リトライ予算（None で無制限）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.max_attempts = max(1, max_attempts)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget = budget
+
+        self._lock = threading.Lock()
+        self._retries = 0
+        self._retry_time = 0.0
+        self._budget_exhausted = 0
+        self._gave_up = 0
+
+    @classmethod
+    def from_config(cls, retry_config: Dict[str, Any]) -> "RetryPolicy":
+        """
+        設定辞書からリトライポリシーを作成
+
+        Args:
+            retry_config: config.yaml の api.retry セクション
+
+        Returns:
+            RetryPolicy: リトライポリシー
+        """
+        budget = RetryBudget(
+            ratio=retry_config.get('budget_ratio', 0.2),
+            max_tokens=retry_config.get('budget_max_tokens', 10)
+        )
+        return cls(
+            max_attempts=retry_config.get('max_attempts', 1),
+            backoff_base=retry_config.get('backoff_base', 0.5),
+            backoff_max=retry_config.get('backoff_max', 8.0),
+            max_retry_after=retry_config.get('max_retry_after', 10.0),
+            retry_statuses=retry_config.get('retry_statuses', (429, 500, 502, 503, 504)),
+            budget=budget
+        )
+
+    def is_retryable(self, error: WeatherAPIError) -> bool:
+        """再試行対象の例外かどうか"""
+        if isinstance(error, APIResponseError):
+            return error.status_code in self.retry_statuses
+        return isinstance(error, APIConnectionError)
+
+    def compute_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """
+        次の試行までの待機秒数を計算（フルジッター）
+
+        Args:
+            attempt: 失敗した試行の番号（1始まり）
+            retry_after: 上流が指定した待機秒数
+
+        Returns:
+            float: 待機秒数
+        """
+        ceiling = min(self.backoff_max, self.backoff_base * (2 ** (attempt - 1)))
+        delay = random.uniform(0, ceiling)
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+    def call(self, func: Callable[[], Any], label: str = "") -> Any:
+        """
+        リトライ付きで関数を実行
+
+        Args:
+            func: 1回分の試行を行う関数
+            label: ログ用のラベル（都市名など）
+
+        Returns:
+            Any: 関数の戻り値
+
+        Raises:
+            WeatherAPIError: 再試行しても成功しなかった場合の最後の例外
+        """
+        if self.budget is not None:
+            self.budget.deposit()
+
+        attempt = 1
+        while True:
+            try:
+                return func()
+            except WeatherAPIError as e:
+                delay = self._next_delay(e, attempt)
+                if delay is None:
+                    raise
+                self.logger.warning(
+                    f"リトライ {attempt}/{self.max_attempts - 1}: {label} "
+                    f"({delay:.2f}秒後) - {e}"
+                )
+                with self._lock:
+                    self._retries += 1
+                    self._retry_time += delay
+                time.sleep(delay)
+                attempt += 1
+
+    def _next_delay(self, error: WeatherAPIError, attempt: int) -> Optional[float]:
+        """再試行する場合は待機秒数を、しない場合は None を返す"""
+        if not self.is_retryable(error):
+            return None
+        if attempt >= self.max_attempts:
+            if self.max_attempts > 1:
+                with self._lock:
+                    self._gave_up += 1
+            return None
+
+        retry_after = getattr(error, 'retry_after', None)
+        if retry_after is not None and retry_after > self.max_retry_after:
+            self.logger.warning(f"Retry-After が上限を超えるためリトライしません: {retry_after}秒")
+            return None
+
+        if self.budget is not None and not self.budget.try_withdraw():
+            self.logger.warning("リトライ予算を使い切ったためリトライしません")
+            with self._lock:
+                self._budget_exhausted += 1
+            return None
+
+        return self.compute_delay(attempt, retry_after)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        リトライの統計情報を取得
+
+        Returns:
+            Dict[str, Any]: リトライ回数・リトライ待機時間などの統計
+        """
+        with self._lock:
+            stats = {
+                'retries': self._retries,
+                'retry_time_seconds': round(self._retry_time, 3),
+                'budget_exhausted': self._budget_exhausted,
+                'gave_up': self._gave_up
+            }
+        if self.budget is not None:
+            stats['budget_tokens'] = round(self.budget.tokens, 2)
+        return stats
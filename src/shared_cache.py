@@ -0,0 +1,494 @@
+"""
+ワーカー間共有キャッシュ
+mmap したファイル上の固定長スロットのハッシュテーブルに天気データを保存し、
+同一ホストの全ワーカープロセスで共有する
+"""
+
+import os
+import stat
+import json
+import mmap
+import time
+import errno
+import struct
+import hashlib
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows ではプロセス間ロックが使えない
+    fcntl = None
+
+from .cache import HitCounter, key_from_json
+from .models import WeatherData
+from . import record_codec
+
+
+# ファイルヘッダ: マジック・バージョン・スロット数・スロットサイズ
+FILE_HEADER = struct.Struct('<8sIII')
+MAGIC = b'WXCACHE1'
+# 2: 値を record_codec のバイナリ形式で保存
+# （バージョン・slots・slot_size が異なる既存のファイルは初期化せず、開く時に ValueError にする）
+VERSION = 2
+
+# スロットヘッダ: シーケンス番号・キーのハッシュ・格納時刻・有効期限・キー長・値の長さ
+SLOT_HEADER = struct.Struct('<IQddHH')
+SEQ = struct.Struct('<I')
+
+
+def default_path() -> str:
+    """
+    共有ファイルの既定のパス
+
+    他のユーザーが事前に作成・差し替えできないよう、共有の /tmp ではなくユーザーごとの
+    ディレクトリ（$XDG_RUNTIME_DIR、未設定の場合は ~/.cache）の下に置きます。
+
+    Returns:
+        str: 共有ファイルのパス
+    """
+    base = os.environ.get('XDG_RUNTIME_DIR') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'weather-app', 'shared-cache.bin')
+
+
+def _open_private_file(path: str) -> int:
+    """
+    共有ファイルを開く（無ければ作成）
+
+    シンボリックリンクはたどらず、他のユーザーが所有するファイルや、グループ・他のユーザーが
+    読み書きできるファイルは使用しません。
+
+    Args:
+        path: 共有ファイルのパス
+
+    Returns:
+        int: ファイルディスクリプタ
+
+    Raises:
+        ValueError: シンボリックリンク・通常のファイル以外・他のユーザーのファイルの場合
+    """
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, 'O_NOFOLLOW', 0), 0o600)
+    except OSError as e:
+        if e.errno == errno.ELOOP:
+            raise ValueError(f"共有キャッシュのファイルがシンボリックリンクです: {path}")
+        raise
+    try:
+        info = os.fstat(fd)
+        if not stat.S_ISREG(info.st_mode):
+            raise ValueError(f"共有キャッシュのファイルが通常のファイルではありません: {path}")
+        if hasattr(os, 'getuid') and info.st_uid != os.getuid():
+            raise ValueError(f"共有キャッシュのファイルを他のユーザーが所有しています: {path}")
+        if info.st_mode & 0o077:
+            raise ValueError(f"共有キャッシュのファイルを他のユーザーが読み書きできます: {path}"
+                             "（chmod 600 で権限を変更してください）")
+    except BaseException:
+        os.close(fd)
+        raise
+    return fd
+
+
+class SharedMemoryCache:
+    """mmap ファイルを使ったワーカー間共有キャッシュ
+
+    TTLCache と同じインターフェースで WeatherData を保存します。値は
+    record_codec のバイナリ形式で、1スロットに収まりやすくしています。
+
+    - 読み込みはロックを取らず、スロットごとのシーケンス番号（seqlock）で
+      書き込み途中のデータを検出して読み直します。
+    - 書き込みはファイルロック（fcntl）で直列化します。天気データの書き込みは
+      都市ごとに TTL に1回程度のため、競合はほとんど発生しません。
+    - キーのハッシュ位置から probe 個のスロットを探し、空き・期限切れ・
+      最も古いスロットの順に上書きします（近似的な削除方式）。
+
+    時刻はプロセス間で比較するため time.time() を使います。
+    """
+
+    FRESH = 'fresh'
+    STALE = 'stale'
+    MISS = 'miss'
+
+    def __init__(self, path: str, ttl: float = 600.0, slots: int = 4096, slot_size: int = 512,
+                 probe: int = 8, stale_while_revalidate: float = 0.0, stale_if_error: float = 0.0):
+        """
+        初期化
+
+        Args:
+            path: 共有ファイルのパス（全ワーカーで同じパスを指定。ディレクトリが無ければ 700 で作成）
+            ttl: エントリの有効期限（秒）
+            slots: スロット数（保持できる最大エントリ数）
+            slot_size: 1スロットのバイト数（キーと値の合計がこれに収まる必要がある）
+            probe: 1つのキーに対して探索するスロット数
+            stale_while_revalidate: 期限切れ後、再取得中に古い値を返してよい秒数
+            stale_if_error: 期限切れ後、上流エラー時に古い値を返してよい秒数
+        """
+        if ttl <= 0:
+            raise ValueError("ttl は正の値を指定してください")
+        if slots < 1:
+            raise ValueError("slots は1以上を指定してください")
+        if slot_size <= SLOT_HEADER.size:
+            raise ValueError(f"slot_size は {SLOT_HEADER.size} より大きい値を指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.slots = slots
+        self.slot_size = slot_size
+        self.probe = min(probe, slots)
+        self.stale_while_revalidate = stale_while_revalidate
+        self.stale_if_error = stale_if_error
+        self._grace = max(stale_while_revalidate, stale_if_error)
+
+        self._write_lock = threading.Lock()
+        os.makedirs(os.path.dirname(self.path) or '.', mode=0o700, exist_ok=True)
+        self._fd = _open_private_file(self.path)
+        try:
+            self._mm = self._open_mapping()
+        except BaseException:
+            os.close(self._fd)
+            raise
+
+        # 統計情報（このプロセス内の値）
+        self._stats_lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._stale_hits = 0
+        self._stale_if_error_hits = 0
+        self._oversized = 0
+        self._evictions = 0
+        self._key_hits = HitCounter()
+
+    @classmethod
+    def from_config(cls, cache_config: Dict[str, Any]) -> "SharedMemoryCache":
+        """
+        設定辞書から共有キャッシュを作成
+
+        有効期限は cache セクション、ファイルとスロット設定は cache.shared セクションから読み込みます。
+
+        Args:
+            cache_config: config.yaml の cache セクション
+
+        Returns:
+            SharedMemoryCache: 共有キャッシュ
+        """
+        shared_config = cache_config.get('shared') or {}
+        return cls(
+            path=shared_config.get('path') or default_path(),
+            ttl=cache_config.get('ttl', 600),
+            slots=shared_config.get('slots', 4096),
+            slot_size=shared_config.get('slot_size', 512),
+            probe=shared_config.get('probe', 8),
+            stale_while_revalidate=cache_config.get('stale_while_revalidate', 0),
+            stale_if_error=cache_config.get('stale_if_error', 0)
+        )
+
+    def _open_mapping(self) -> mmap.mmap:
+        """
+        共有ファイルを mmap する（空のファイルは初期化する）
+
+        他のワーカーが mmap しているファイルを縮めたり作り直したりすると、そのワーカーが
+        SIGBUS で停止するかデータが壊れるため、レイアウト（形式のバージョン・slots・
+        slot_size）が異なるファイルは初期化せずにエラーにします。
+
+        Raises:
+            ValueError: 既存のファイルのレイアウトが設定と異なる場合
+        """
+        size = FILE_HEADER.size + self.slots * self.slot_size
+        header = FILE_HEADER.pack(MAGIC, VERSION, self.slots, self.slot_size)
+        with self._locked():
+            file_size = os.fstat(self._fd).st_size
+            if file_size == 0:
+                os.ftruncate(self._fd, size)
+                os.pwrite(self._fd, header, 0)
+            elif os.pread(self._fd, FILE_HEADER.size, 0) != header or file_size != size:
+                raise ValueError(
+                    f"共有キャッシュのファイルのレイアウトが設定と異なります: {self.path}"
+                    "（cache.shared.path に別のファイルを指定するか、全ワーカーを停止してからファイルを削除してください）"
+                )
+        return mmap.mmap(self._fd, size)
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        """書き込み用のスレッド間・プロセス間ロック"""
+        with self._write_lock:
+            if fcntl is not None:
+                fcntl.lockf(self._fd, fcntl.LOCK_EX, 1, 0)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, 0)
+
+    @staticmethod
+    def _key(key: Hashable) -> bytes:
+        """キャッシュキーをバイト列に変換"""
+        if isinstance(key, tuple):
+            key = list(key)
+        return json.dumps(key, ensure_ascii=False).encode('utf-8')
+
+    @staticmethod
+    def _hash(key_bytes: bytes) -> int:
+        """プロセス間で一致するキーのハッシュ（0 は空きスロットを表すため使わない）"""
+        return int.from_bytes(hashlib.blake2b(key_bytes, digest_size=8).digest(), 'little') or 1
+
+    def _offset(self, index: int) -> int:
+        return FILE_HEADER.size + (index % self.slots) * self.slot_size
+
+    def _read_slot(self, offset: int) -> Optional[Tuple[int, float, float, bytes, bytes]]:
+        """
+        スロットをロックせずに読み込む（書き込み中なら読み直す）
+
+        Returns:
+            Optional[Tuple]: キーのハッシュ・格納時刻・有効期限・キー・値（空きスロットは None）
+        """
+        for _ in range(100):
+            raw = self._mm[offset:offset + self.slot_size]
+            seq, key_hash, stored_at, expires_at, key_len, value_len = SLOT_HEADER.unpack_from(raw)
+            if seq & 1:
+                # 書き込み中
+                time.sleep(0)
+                continue
+            if SEQ.unpack_from(self._mm, offset)[0] != seq:
+                continue
+            if key_hash == 0:
+                return None
+            start = SLOT_HEADER.size
+            key = raw[start:start + key_len]
+            value = raw[start + key_len:start + key_len + value_len]
+            return key_hash, stored_at, expires_at, key, value
+        return None
+
+    def _find(self, key_bytes: bytes) -> Optional[Tuple[float, bytes]]:
+        """キーに一致するスロットの有効期限と値を探す"""
+        key_hash = self._hash(key_bytes)
+        for i in range(self.probe):
+            slot = self._read_slot(self._offset(key_hash + i))
+            if slot is not None and slot[0] == key_hash and slot[3] == key_bytes:
+                return slot[2], slot[4]
+        return None
+
+    @staticmethod
+    def _decode(value: bytes) -> WeatherData:
+        return record_codec.decode(value)
+
+    def get(self, key: Hashable) -> Optional[WeatherData]:
+        """
+        キャッシュから値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[WeatherData]: 有効期限内の値（無い場合は None）
+        """
+        value, state = self.lookup(key, allow_stale=False)
+        return value if state == self.FRESH else None
+
+    def lookup(self, key: Hashable, allow_stale: bool = True) -> Tuple[Optional[WeatherData], str]:
+        """
+        キャッシュから値と鮮度を取得
+
+        Args:
+            key: キャッシュキー
+            allow_stale: stale_while_revalidate の範囲内の期限切れ値を返すかどうか
+
+        Returns:
+            Tuple[Optional[WeatherData], str]: 値と状態（FRESH / STALE / MISS）
+        """
+        found = self._find(self._key(key))
+        now = time.time()
+        if found is not None:
+            expires_at, value = found
+            if expires_at > now:
+                with self._stats_lock:
+                    self._hits += 1
+                self._key_hits.hit(key)
+                return self._decode(value), self.FRESH
+            if allow_stale and now - expires_at < self.stale_while_revalidate:
+                with self._stats_lock:
+                    self._stale_hits += 1
+                self._key_hits.hit(key)
+                return self._decode(value), self.STALE
+        with self._stats_lock:
+            self._misses += 1
+        return None, self.MISS
+
+    def get_stale_if_error(self, key: Hashable) -> Optional[WeatherData]:
+        """
+        上流エラー時に返す期限切れの値を取得
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            Optional[WeatherData]: 期限切れから stale_if_error 秒以内の値（無い場合は None）
+        """
+        found = self._find(self._key(key))
+        if found is None or time.time() - found[0] >= self.stale_if_error:
+            return None
+        with self._stats_lock:
+            self._stale_if_error_hits += 1
+        return self._decode(found[1])
+
+    def set(self, key: Hashable, value: WeatherData, ttl: Optional[float] = None) -> None:
+        """
+        キャッシュに値を格納
+
+        Args:
+            key: キャッシュキー
+            value: 格納する天気データ
+            ttl: このエントリの有効期限（秒、省略時はキャッシュの ttl）
+        """
+        key_bytes = self._key(key)
+        value_bytes = record_codec.encode(value)
+        if SLOT_HEADER.size + len(key_bytes) + len(value_bytes) > self.slot_size:
+            with self._stats_lock:
+                self._oversized += 1
+            self.logger.debug(f"スロットに収まらないため共有キャッシュに格納しません: {key}")
+            return
+
+        key_hash = self._hash(key_bytes)
+        now = time.time()
+        expires_at = now + (ttl if ttl is not None else self.ttl)
+        with self._locked():
+            offset = self._choose_slot(key_hash, key_bytes, now)
+            self._write_slot(offset, key_hash, now, expires_at, key_bytes, value_bytes)
+
+    def _choose_slot(self, key_hash: int, key_bytes: bytes, now: float) -> int:
+        """書き込み先のスロットを選ぶ（同じキー > 空き > 保持期間切れ > 最も古い）（ロック取得中に呼び出す）"""
+        oldest_offset, oldest_stored = None, None
+        for i in range(self.probe):
+            offset = self._offset(key_hash + i)
+            slot = self._read_slot(offset)
+            if slot is None:
+                return offset
+            slot_hash, stored_at, expires_at, slot_key, _ = slot
+            if slot_hash == key_hash and slot_key == key_bytes:
+                return offset
+            if expires_at + self._grace <= now:
+                return offset
+            if oldest_stored is None or stored_at < oldest_stored:
+                oldest_offset, oldest_stored = offset, stored_at
+        with self._stats_lock:
+            self._evictions += 1
+        return oldest_offset
+
+    def _write_slot(self, offset: int, key_hash: int, stored_at: float, expires_at: float,
+                    key_bytes: bytes, value_bytes: bytes) -> None:
+        """スロットに書き込む（ロック取得中に呼び出す）"""
+        seq = SEQ.unpack_from(self._mm, offset)[0]
+        # 書き込み中に停止したワーカーが奇数のまま残した番号は偶数に切り上げる
+        # （そのままだと +1・+2 で偶奇が逆になり、読み込み側が二度と読めなくなる）
+        seq += seq & 1
+        # 奇数のシーケンス番号で書き込み中であることを読み込み側に知らせる
+        SEQ.pack_into(self._mm, offset, (seq + 1) & 0xFFFFFFFF)
+        header = SLOT_HEADER.pack(0, key_hash, stored_at, expires_at, len(key_bytes), len(value_bytes))
+        payload = key_bytes + value_bytes
+        self._mm[offset + SEQ.size:offset + SLOT_HEADER.size] = header[SEQ.size:]
+        self._mm[offset + SLOT_HEADER.size:offset + SLOT_HEADER.size + len(payload)] = payload
+        SEQ.pack_into(self._mm, offset, (seq + 2) & 0xFFFFFFFF)
+
+    def delete(self, key: Hashable) -> bool:
+        """
+        エントリを削除
+
+        Args:
+            key: キャッシュキー
+
+        Returns:
+            bool: 削除したかどうか
+        """
+        key_bytes = self._key(key)
+        key_hash = self._hash(key_bytes)
+        self._key_hits.discard(key)
+        with self._locked():
+            for i in range(self.probe):
+                offset = self._offset(key_hash + i)
+                slot = self._read_slot(offset)
+                if slot is not None and slot[0] == key_hash and slot[3] == key_bytes:
+                    self._write_slot(offset, 0, 0.0, 0.0, b'', b'')
+                    return True
+        return False
+
+    def clear(self) -> None:
+        """全エントリを削除"""
+        self._key_hits.clear()
+        with self._locked():
+            for index in range(self.slots):
+                offset = self._offset(index)
+                if SLOT_HEADER.unpack_from(self._mm, offset)[1] != 0:
+                    self._write_slot(offset, 0, 0.0, 0.0, b'', b'')
+
+    def _live_slots(self):
+        """保持期間内のスロットを列挙"""
+        now = time.time()
+        for index in range(self.slots):
+            slot = self._read_slot(self._offset(index))
+            if slot is not None and slot[2] + self._grace > now:
+                yield slot
+
+    def keys(self) -> List[Hashable]:
+        """
+        保持中のキーを取得（全ワーカーが格納したものを含む）
+
+        Returns:
+            List[Hashable]: キーのリスト
+        """
+        return [key_from_json(json.loads(slot[3])) for slot in self._live_slots()]
+
+    def hot_keys(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """
+        ヒット数の多いキーを取得（ヒット数はこのプロセス内の値）
+
+        Args:
+            limit: 取得する件数
+
+        Returns:
+            List[Tuple[Hashable, int]]: キーとヒット数（多い順）
+        """
+        return self._key_hits.top(limit, self.keys())
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self._live_slots())
+
+    def __contains__(self, key: Hashable) -> bool:
+        found = self._find(self._key(key))
+        return found is not None and found[0] > time.time()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報を取得
+
+        ヒット数などはこのプロセス内の値、エントリ数・サイズは全ワーカー共通の値です。
+
+        Returns:
+            Dict[str, Any]: ヒット数・ミス数・削除数・エントリ数・サイズ
+        """
+        slots = list(self._live_slots())
+        with self._stats_lock:
+            hits, misses = self._hits, self._misses
+            counters = {
+                'stale_hits': self._stale_hits,
+                'stale_if_error_hits': self._stale_if_error_hits,
+                'evictions': self._evictions,
+                'oversized': self._oversized
+            }
+        lookups = hits + misses
+        return {
+            'backend': 'shared',
+            'path': self.path,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            **counters,
+            'entries': len(slots),
+            'capacity': self.slots,
+            'bytes': sum(len(slot[3]) + len(slot[4]) for slot in slots)
+        }
+
+    def close(self) -> None:
+        """mmap とファイルを閉じる"""
+        self._mm.close()
+        os.close(self._fd)
@@ -0,0 +1,96 @@
+"""
+単一フライト（リクエスト合流）
+同じキーで同時に実行中の呼び出しを1回の実行にまとめる
+"""
+
+import threading
+from typing import Any, Callable, Dict, Hashable
+
+
+class _Call:
+    """実行中の呼び出し"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        self.waiters = 0
+
+
+class SingleFlight:
+    """同一キーの同時呼び出しを合流させるクラス
+
+    最初の呼び出し（リーダー）だけが関数を実行し、実行中に同じキーで
+    呼び出したスレッドはその結果、または同じ例外を受け取ります。
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._requests = 0
+        self._executions = 0
+        self._coalesced = 0
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        キー単位で合流させて関数を実行
+
+        Args:
+            key: 合流キー
+            func: 実行する関数
+
+        Returns:
+            Any: 関数の戻り値（合流した場合はリーダーの戻り値）
+
+        Raises:
+            Exception: 関数が送出した例外（合流した全呼び出しに伝播）
+        """
+        with self._lock:
+            self._requests += 1
+            call = self._calls.get(key)
+            if call is not None:
+                call.waiters += 1
+                self._coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self._executions += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def in_flight(self) -> int:
+        """実行中のキー数"""
+        with self._lock:
+            return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        合流の統計情報を取得
+
+        Returns:
+            Dict[str, int]: 呼び出し数・実行数・合流により省略された数
+        """
+        with self._lock:
+            return {
+                'requests': self._requests,
+                'executions': self._executions,
+                'coalesced': self._coalesced,
+                'in_flight': len(self._calls)
+            }
@@ -0,0 +1,109 @@
+"""
+HTTPトランスポート層
+WeatherAPI が上流へリクエストを送る手段を差し替え可能にする
+"""
+
+import logging
+from typing import Any, Dict, Mapping, Optional
+
+import requests
+
+from .exceptions import APIConnectionError
+from .http_session import SessionPool
+from . import json_codec
+
+
+class TransportResponse:
+    """トランスポートが返す応答（requests.Response と同じ属性を持つ）"""
+
+    def __init__(self, status_code: int, content: bytes,
+                 headers: Optional[Mapping[str, str]] = None):
+        self.status_code = status_code
+        self.content = content
+        self.headers = dict(headers or {})
+
+    def json(self) -> Any:
+        """応答本文をJSONとして解析"""
+        return json_codec.loads(self.content)
+
+
+class Transport:
+    """トランスポートの基底クラス
+
+    get() は status_code・headers・content・json() を持つ応答を返し、
+    通信エラーは APIConnectionError として送出します。
+    """
+
+    def get(self, url: str, params: Dict[str, Any], timeout: float):
+        """
+        GETリクエストを送信
+
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+            timeout: タイムアウト秒数
+
+        Returns:
+            応答オブジェクト
+
+        Raises:
+            APIConnectionError: 通信エラー
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """保持しているリソースを解放"""
+
+
+class RequestsTransport(Transport):
+    """requests と SessionPool を使うトランスポート（デフォルト）"""
+
+    def __init__(self, session_pool: SessionPool):
+        """
+        初期化
+
+        Args:
+            session_pool: HTTPセッションプール
+        """
+        self.logger = logging.getLogger(__name__)
+        self.session_pool = session_pool
+
+    def get(self, url: str, params: Dict[str, Any], timeout: float):
+        try:
+            session = self.session_pool.get_session()
+            return session.get(url, params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            self.logger.error(f"APIタイムアウト: {url}")
+            raise APIConnectionError("APIリクエストがタイムアウトしました")
+        except requests.exceptions.ConnectionError:
+            self.logger.error(f"API接続エラー: {url}")
+            raise APIConnectionError("APIサーバーに接続できません")
+        except requests.exceptions.RequestException as e:
+            self.logger.error(f"APIリクエストエラー: {e}")
+            raise APIConnectionError(f"APIリクエストエラー: {e}")
+
+    def close(self) -> None:
+        self.session_pool.close()
+
+
+def create_transport(name: str, config: Dict[str, Any], session_pool: SessionPool) -> Transport:
+    """
+    設定名からトランスポートを作成
+
+    Args:
+        name: トランスポート名（requests / fake）
+        config: 設定全体（fake の場合は fake_server セクションを使用）
+        session_pool: requests トランスポート用のセッションプール
+
+    Returns:
+        Transport: トランスポート
+
+    Raises:
+        ValueError: 未知のトランスポート名の場合
+    """
+    if name == 'requests':
+        return RequestsTransport(session_pool)
+    if name == 'fake':
+        from .fake_server import FakeOpenWeatherMap, InProcessTransport
+        return InProcessTransport(FakeOpenWeatherMap.from_config(config.get('fake_server', {})))
+    raise ValueError(f"未知のトランスポートです: {name}")
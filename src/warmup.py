@@ -0,0 +1,138 @@
+"""
+キャッシュのウォームアップ
+起動時にデフォルト都市・人気都市の天気を並行取得し、最初の利用者が上流の遅延を待たないようにする
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from typing import Any, Dict, Iterable, List, Optional
+
+from .exceptions import RateLimitExceededError, WeatherAPIError
+
+
+# テンプレートの候補ボタンと同じ人気都市
+DEFAULT_WARMUP_CITIES = ['Tokyo', 'Osaka', 'London', 'New York', 'Paris']
+
+
+class CacheWarmer:
+    """起動時のキャッシュウォームアップ
+
+    指定した都市を max_workers 本のスレッドで並行取得してキャッシュに載せます。
+    レートリミッターの残りトークンが rate_limit_reserve（バケット容量に対する割合）を
+    下回る場合はその都市を取得せずにスキップし、起動直後の利用者のリクエスト用に
+    トークンを残します。共有キャッシュ・ディスクキャッシュで既に有効な値がある都市は
+    通信しません。
+
+    レートリミッターはプロセスごとのため、予備もワーカーごとに確保されます。
+    N 個のワーカーが同時に起動すると、上流へは最大で N 倍の都市数の
+    リクエストが送られます。backend: shared などの共有キャッシュを使うと、
+    先に取得したワーカーの値を後続のワーカーが使うため重複を減らせます。
+    上流のクォータに余裕が無い場合は cities を絞ってください。
+    """
+
+    WARMED = 'warmed'
+    CACHED = 'cached'
+    SKIPPED = 'skipped'
+    FAILED = 'failed'
+    PENDING = 'pending'
+
+    def __init__(self, cities: Iterable[str], lang: Optional[str] = None, max_workers: int = 4,
+                 rate_limit_reserve: float = 0.5, timeout: float = 10.0):
+        """
+        初期化
+
+        Args:
+            cities: ウォームアップする都市名のリスト（重複は除外）
+            lang: 言語設定（省略時はクライアントのデフォルト）
+            max_workers: 同時に取得する最大数
+            rate_limit_reserve: 通常のリクエスト用に残すトークンの割合（0〜1）
+            timeout: ウォームアップ全体の最大待機秒数（超えた分は裏で続行）
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers は1以上を指定してください")
+        if not 0 <= rate_limit_reserve <= 1:
+            raise ValueError("rate_limit_reserve は0〜1の範囲で指定してください")
+
+        self.logger = logging.getLogger(__name__)
+        self.cities: List[str] = list(dict.fromkeys(city for city in cities if city))
+        self.lang = lang
+        self.max_workers = max_workers
+        self.rate_limit_reserve = rate_limit_reserve
+        self.timeout = timeout
+
+    @classmethod
+    def from_config(cls, warmup_config: Optional[Dict[str, Any]],
+                    default_city: Optional[str] = None) -> Optional["CacheWarmer"]:
+        """
+        設定辞書からウォームアップを作成
+
+        Args:
+            warmup_config: config.yaml の web.warmup セクション
+            default_city: defaults.city（リストの先頭に追加）
+
+        Returns:
+            Optional[CacheWarmer]: ウォームアップ（セクションが無いか enabled が false の場合は None）
+        """
+        if not warmup_config or not warmup_config.get('enabled', True):
+            return None
+        cities = warmup_config.get('cities', DEFAULT_WARMUP_CITIES)
+        return cls(
+            cities=[default_city] + list(cities) if default_city else cities,
+            lang=warmup_config.get('lang'),
+            max_workers=warmup_config.get('max_workers', 4),
+            rate_limit_reserve=warmup_config.get('rate_limit_reserve', 0.5),
+            timeout=warmup_config.get('timeout', 10.0)
+        )
+
+    def _warm(self, client, city: str, lang: str) -> str:
+        """1都市をウォームアップして結果を返す"""
+        cache = client.cache
+        key = (client.city_resolver.canonicalize(city).key, lang, client.units)
+        if cache is not None and key in cache:
+            return self.CACHED
+
+        # 予備の確認とトークンの消費を同時に行い、並行するスレッドが同じ残量で通過しないようにする
+        limiter = getattr(client, 'rate_limiter', None)
+        if limiter is None:
+            budget = nullcontext()
+        elif limiter.try_acquire(reserve=limiter.capacity * self.rate_limit_reserve):
+            budget = limiter.prepaid()
+        else:
+            self.logger.info(f"レート制限の予備を残すためウォームアップをスキップします: {city}")
+            return self.SKIPPED
+        try:
+            with budget:
+                client.get_current_weather(city, lang)
+        except RateLimitExceededError:
+            return self.SKIPPED
+        except WeatherAPIError as e:
+            self.logger.warning(f"ウォームアップに失敗しました: {city} ({e})")
+            return self.FAILED
+        return self.WARMED
+
+    def run(self, client) -> Dict[str, str]:
+        """
+        ウォームアップを実行
+
+        Args:
+            client: WeatherAPI
+
+        Returns:
+            Dict[str, str]: 都市ごとの結果（warmed / cached / skipped / failed / pending）
+        """
+        lang = self.lang or client.default_language
+        self.logger.info(f"キャッシュのウォームアップ開始: {len(self.cities)}都市")
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='warmup')
+        futures = {city: executor.submit(self._warm, client, city, lang) for city in self.cities}
+        wait(futures.values(), timeout=self.timeout)
+        executor.shutdown(wait=False)
+
+        results = {
+            city: future.result() if future.done() else self.PENDING
+            for city, future in futures.items()
+        }
+        warmed = sum(1 for status in results.values() if status in (self.WARMED, self.CACHED))
+        self.logger.info(f"キャッシュのウォームアップ完了: {warmed}/{len(results)}都市")
+        return results
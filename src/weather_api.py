@@ -3,31 +3,55 @@ OpenWeatherMap API連携クラス
 天気情報の取得とデータ変換を行う
 """
 
-import requests
+import time
 import logging
+import threading
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional, Dict, Any
+from functools import partial
+from typing import Optional, Dict, Any, Callable, Iterable, List, Mapping, Tuple, Union
 from urllib.parse import urljoin
 
-from .models import WeatherData
+from .models import (
+    STALE_REVALIDATING, STALE_UPSTREAM_ERROR, WeatherData, observation_time
+)
 from .exceptions import (
+    WeatherAPIError,
     CityNotFoundError, 
     APIKeyError, 
     APIConnectionError, 
-    APIResponseError
+    APIResponseError,
+    RateLimitExceededError
 )
 from .utils import load_config, get_api_key
+from .http_session import SessionPool
+from .singleflight import SingleFlight
+from .retry import RetryPolicy, parse_retry_after
+from .rate_limiter import get_shared_rate_limiter
+from .circuit_breaker import CircuitBreaker
+from .hedging import HedgingPolicy
+from .transport import Transport, create_transport
+from .json_codec import decode_response
+from .cache import TTLCache, create_cache, format_key
+from .city_resolver import CityQuery, CityResolver
+from .weather_batch import UNITS, WeatherBatch
 
 
 class WeatherAPI:
     """OpenWeatherMap API連携クラス"""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    # group エンドポイントで1回に指定できる都市IDの上限
+    GROUP_MAX_IDS = 20
+    
+    def __init__(self, config_path: str = "config.yaml", transport: Optional[Transport] = None,
+                 cache=None):
         """
         初期化
         
         Args:
             config_path: 設定ファイルのパス
+            transport: HTTPトランスポート（省略時は api.transport の設定から作成）
+            cache: 天気データのキャッシュ（省略時は cache セクションの設定から作成）
         """
         self.logger = logging.getLogger(__name__)
         self.config = load_config(config_path)
@@ -39,6 +63,65 @@ class WeatherAPI:
         self.timeout = api_config.get('timeout', 10)
         self.units = api_config.get('units', 'metric')
         
+        # 接続プール設定（keep-alive接続を都市・スレッド間で再利用）
+        self.session_pool = SessionPool(
+            pool_connections=api_config.get('pool_connections', 10),
+            pool_maxsize=api_config.get('pool_maxsize', 10),
+            keepalive_timeout=api_config.get('keepalive_timeout', 60)
+        )
+        
+        # トランスポート（requests: 実API / fake: ローカルのフェイクサーバー）
+        self.transport = transport or create_transport(
+            api_config.get('transport', 'requests'), self.config, self.session_pool
+        )
+        
+        # レート制限（同じAPIキーを使うプロセス内の全スレッドで共有）
+        self.rate_limiter = get_shared_rate_limiter(self.api_key, api_config.get('rate_limit', {}))
+        
+        # リトライポリシー（指数バックオフ＋ジッター、リトライ予算）
+        self.retry_policy = RetryPolicy.from_config(api_config.get('retry', {}))
+        
+        # サーキットブレーカー（上流障害時は即座に APIConnectionError を送出）
+        self.circuit_breaker = CircuitBreaker.from_config(api_config.get('circuit_breaker'))
+        
+        # ヘッジリクエスト（オプトイン、遅い応答に対して同一リクエストを追加送信）
+        self.hedging = HedgingPolicy.from_config(api_config.get('hedging'))
+        
+        # 天気データのキャッシュ（cache.backend で選択、cache セクションが無い場合は無効）
+        cache_config = self.config.get('cache') or {}
+        self.cache = cache if cache is not None else create_cache(cache_config)
+        
+        # 見つからなかった都市のキャッシュ（ネガティブキャッシュ、正のキャッシュとは別に上限を管理）
+        self.negative_cache = TTLCache.from_config(cache_config.get('negative'))
+        
+        # 上流の更新間隔（秒）。設定すると観測時刻から次の更新予定までをキャッシュの有効期限にし、
+        # 新しい観測が存在し得ない間は再取得しない。予定を過ぎても更新が無い場合は
+        # 予定からの遅れと同じ秒数（最短 update_recheck 秒、最長 update_interval 秒）後に
+        # 再確認する（未設定の場合は cache.ttl で一律に期限切れ）
+        update_interval = cache_config.get('update_interval')
+        self.update_interval = float(update_interval) if update_interval else None
+        self.update_recheck = float(cache_config.get('update_recheck', 60))
+        if self.update_recheck <= 0:
+            raise ValueError("cache.update_recheck は正の値を指定してください")
+        
+        # 座標検索で丸める格子の間隔（度）。大きいほど共有されやすく、小さいほど正確
+        self.geo_grid = float(cache_config.get('geo_grid', 0.05))
+        if self.geo_grid <= 0:
+            raise ValueError("cache.geo_grid は正の値を指定してください")
+        
+        # バックグラウンド再取得中のキー（同じキーの再取得を重複させない）
+        self._refreshing: Dict[Any, threading.Thread] = {}
+        self._refresh_lock = threading.Lock()
+        
+        # 同一リクエストの合流（同時に同じ都市を取得する場合は1回の通信にまとめる）
+        self.single_flight = SingleFlight()
+        
+        # 都市名 → 都市ID の対応表（別名表で初期化し、/weather の応答から学習）
+        # 表記ゆれのある都市名を同じキャッシュエントリ・同じ上流リクエストにまとめる
+        # 学習結果は任意の入力から増えるため、キャッシュと同じ max_entries 件を上限にする
+        self.city_resolver = CityResolver(self.config.get('city_aliases'),
+                                          max_learned=cache_config.get('max_entries', 1024))
+        
         # デフォルト設定
         defaults = self.config.get('defaults', {})
         self.default_language = defaults.get('language', 'ja')
@@ -61,52 +144,528 @@ class WeatherAPI:
             APIKeyError: APIキーエラー
             APIConnectionError: 接続エラー
             APIResponseError: その他のAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
+        """
+        if lang is None:
+            lang = self.default_language
+        
+        city = self.city_resolver.canonicalize(city_name)
+        key = (city.key, lang, self.units)
+        if self.negative_cache is not None and self.negative_cache.get(city.key) is not None:
+            self.logger.debug(f"ネガティブキャッシュヒット: {city_name}")
+            raise CityNotFoundError(city_name)
+        
+        if self.cache is None:
+            return self.single_flight.do(key, lambda: self._fetch_current_weather(city_name, lang, city))
+        return self._get_cached(key, city_name, lambda: self._fetch_and_cache(key, city_name, lang, city))
+    
+    def get_current_weather_by_coords(self, lat: float, lon: float, lang: str = None) -> WeatherData:
+        """
+        緯度・経度から現在の天気情報を取得
+        
+        座標は geo_grid 度の格子点に丸めてから問い合わせるため、近くの地点の
+        リクエストは同じキャッシュエントリ・同じ上流リクエストを共有します。
+        
+        Args:
+            lat: 緯度（-90〜90）
+            lon: 経度（-180〜180）
+            lang: 言語設定（デフォルト: ja）
+        
+        Returns:
+            WeatherData: 天気情報データ
+        
+        Raises:
+            ValueError: 座標が範囲外の場合
+            APIKeyError: APIキーエラー
+            APIConnectionError: 接続エラー
+            APIResponseError: その他のAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
+        """
+        if lang is None:
+            lang = self.default_language
+        
+        lat, lon = self.snap_coords(lat, lon)
+        key = (('geo', lat, lon), lang, self.units)
+        if self.cache is None:
+            return self.single_flight.do(key, lambda: self._fetch_by_coords(lat, lon, lang))
+        return self._get_cached(key, f"{lat},{lon}",
+                                lambda: self._fetch_coords_and_cache(key, lat, lon, lang))
+    
+    def snap_coords(self, lat: float, lon: float) -> Tuple[float, float]:
+        """
+        座標を geo_grid 度の格子点に丸める
+        
+        Args:
+            lat: 緯度
+            lon: 経度
+        
+        Returns:
+            Tuple[float, float]: 格子点の緯度・経度（経度は -180〜180 に正規化）
+        
+        Raises:
+            ValueError: 座標が範囲外の場合
+        """
+        lat, lon = float(lat), float(lon)
+        if not (-90.0 <= lat <= 90.0 and -180.0 <= lon <= 180.0):
+            raise ValueError(f"座標が範囲外です: {lat}, {lon}")
+        grid = self.geo_grid
+        snapped_lat = max(-90.0, min(90.0, round(lat / grid) * grid))
+        snapped_lon = (round(lon / grid) * grid + 180.0) % 360.0 - 180.0
+        # 浮動小数点の誤差でキーが分かれないよう桁を揃える（-0.0 は 0.0 にする）
+        return round(snapped_lat, 6) + 0.0, round(snapped_lon, 6) + 0.0
+    
+    def _get_cached(self, key: Any, label: str, fetch: Callable[[], WeatherData]) -> WeatherData:
+        """
+        キャッシュから天気情報を取得し、無ければ取得してキャッシュに格納
+        
+        Args:
+            key: キャッシュキー
+            label: ログ用の表示名
+            fetch: 取得してキャッシュに格納する関数
+        
+        Returns:
+            WeatherData: 天気情報データ
+        """
+        cached, state = self.cache.lookup(key)
+        if state == self.cache.FRESH:
+            self.logger.debug(f"キャッシュヒット: {label}")
+            return cached
+        if state == self.cache.STALE:
+            # 古い値をすぐに返し、裏で再取得する（stale-while-revalidate）
+            self.logger.debug(f"期限切れのキャッシュを返して再取得します: {label}")
+            self._refresh_in_background(key, label, fetch)
+            return replace(cached, is_stale=True, stale_reason=STALE_REVALIDATING)
+        
+        try:
+            return self.single_flight.do(key, fetch)
+        except (APIConnectionError, APIResponseError, RateLimitExceededError) as e:
+            # 上流の障害時は猶予期間内の古い値を返す（stale-if-error）
+            stale = self.cache.get_stale_if_error(key)
+            if stale is None:
+                raise
+            self.logger.warning(f"上流エラーのため期限切れのキャッシュを返します: {label} ({e})")
+            return replace(stale, is_stale=True, stale_reason=STALE_UPSTREAM_ERROR)
+    
+    def _fetch_and_cache(self, key: Any, city_name: str, lang: str, city: CityQuery) -> WeatherData:
+        """天気情報を取得してキャッシュに格納"""
+        weather_data = self._prepare_for_cache(self._fetch_current_weather(city_name, lang, city))
+        ttl = self._cache_ttl(weather_data)
+        self.cache.set(key, weather_data, ttl=ttl)
+        
+        # 初回の問い合わせで都市IDを学習した場合は、IDのキーにも格納して別表記と共有する
+        learned = self.city_resolver.canonicalize(city_name)
+        if learned.key != city.key:
+            self.cache.set((learned.key, lang, self.units), weather_data, ttl=ttl)
+        return weather_data
+    
+    def _fetch_coords_and_cache(self, key: Any, lat: float, lon: float, lang: str) -> WeatherData:
+        """座標の天気情報を取得してキャッシュに格納"""
+        weather_data = self._prepare_for_cache(self._fetch_by_coords(lat, lon, lang))
+        self.cache.set(key, weather_data, ttl=self._cache_ttl(weather_data))
+        return weather_data
+    
+    @staticmethod
+    def _prepare_for_cache(weather_data: WeatherData) -> WeatherData:
+        """
+        キャッシュに格納する前に応答用の JSON（to_json()）を作成
+        
+        格納時にエントリの概算サイズへ含め、max_bytes の上限管理の対象にします。
+        """
+        weather_data.to_json()
+        return weather_data
+    
+    def _cache_ttl(self, weather_data: WeatherData) -> Optional[float]:
+        """
+        観測時刻と上流の更新間隔からキャッシュの有効期限を計算
+        
+        次の更新予定までは新しい観測が存在しないため、その時刻まで有効とします。
+        予定を過ぎている（上流の更新が遅れている、または観測時刻が古いまま更新されない）場合は
+        予定からの遅れと同じ秒数を有効期限とし、update_recheck 秒〜update_interval 秒に収めます。
+        再取得しても観測時刻が変わらなければ遅れが倍になるため、再確認の間隔は指数的に延びます。
+        
+        Args:
+            weather_data: 取得した天気情報
+        
+        Returns:
+            Optional[float]: 有効期限（秒、update_interval 未設定・観測時刻が無い場合は None でキャッシュの ttl）
+        """
+        if self.update_interval is None or weather_data.observed_at is None:
+            return None
+        next_update = weather_data.observed_at.timestamp() + self.update_interval
+        remaining = next_update - time.time()
+        if remaining > 0:
+            return max(min(remaining, self.update_interval), self.update_recheck)
+        overdue = -remaining
+        self.logger.debug(f"上流の更新予定を過ぎています: {weather_data.city_name} "
+                          f"(観測 {weather_data.observed_at.isoformat()}, 遅れ {overdue:.0f}秒)")
+        return min(max(overdue, self.update_recheck), self.update_interval)
+    
+    def _refresh_in_background(self, key: Any, label: str, fetch: Callable[[], WeatherData]) -> None:
+        """
+        キャッシュエントリをバックグラウンドスレッドで再取得
+        
+        Args:
+            key: キャッシュキー
+            label: ログ用の表示名
+            fetch: 取得してキャッシュに格納する関数
+        """
+        def refresh():
+            try:
+                self.single_flight.do(key, fetch)
+            except WeatherAPIError as e:
+                self.logger.warning(f"バックグラウンド再取得に失敗しました: {label} ({e})")
+            finally:
+                with self._refresh_lock:
+                    self._refreshing.pop(key, None)
+        
+        with self._refresh_lock:
+            if key in self._refreshing:
+                return
+            thread = threading.Thread(target=refresh, name=f"refresh-{label}", daemon=True)
+            self._refreshing[key] = thread
+        thread.start()
+    
+    def get_current_weather_many(self, ids_or_names: Iterable[Union[int, str]],
+                                 lang: str = None
+                                 ) -> Dict[Union[int, str], Union[WeatherData, WeatherAPIError]]:
+        """
+        複数都市の天気情報を group エンドポイントで一括取得
+        
+        都市IDが分かっている入力は最大20件ずつ /group にまとめて問い合わせます。
+        IDが未知の都市名は /weather で取得し、応答に含まれるIDを記憶して
+        次回以降の一括取得に使います。
+        
+        Args:
+            ids_or_names: 都市ID（int または数字文字列）・都市名のリスト
+            lang: 言語設定（デフォルト: ja）
+            
+        Returns:
+            Dict[Union[int, str], Union[WeatherData, WeatherAPIError]]:
+                入力ごとの天気情報（見つからない都市は CityNotFoundError）
+            
+        Raises:
+            APIKeyError: APIキーエラー
+            APIConnectionError: 接続エラー
+            APIResponseError: group リクエストのAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
         """
         if lang is None:
             lang = self.default_language
+        
+        keys = list(dict.fromkeys(ids_or_names))
+        results: Dict[Union[int, str], Union[WeatherData, WeatherAPIError]] = {}
+        id_by_key: Dict[Union[int, str], int] = {}
+        
+        # 都市IDへの解決（未知の都市名は個別取得）
+        for key in keys:
+            city_id = self._resolve_city_id(key)
+            if city_id is not None:
+                id_by_key[key] = city_id
+                continue
+            try:
+                results[key] = self.get_current_weather(key, lang)
+            except CityNotFoundError as e:
+                results[key] = e
+        
+        # GROUP_MAX_IDS 件ずつ一括取得
+        city_ids = list(dict.fromkeys(id_by_key.values()))
+        by_id: Dict[int, WeatherData] = {}
+        for i in range(0, len(city_ids), self.GROUP_MAX_IDS):
+            by_id.update(self._fetch_group(city_ids[i:i + self.GROUP_MAX_IDS], lang))
+        
+        for key, city_id in id_by_key.items():
+            weather_data = by_id.get(city_id)
+            results[key] = weather_data if weather_data is not None else CityNotFoundError(str(key))
+        
+        return {key: results[key] for key in keys}
+    
+    def get_weather_batch(self, ids_or_names: Iterable[Union[int, str]], lang: str = None) -> WeatherBatch:
+        """
+        複数都市の天気情報を group エンドポイントで一括取得し、列指向のバッチで返す
+        
+        バッチ処理向けに /group の応答を WeatherData を経由せずにバッチへ追加します。
+        キャッシュは使用せず、常に最新の値を取得します。IDが未知の都市名は
+        /weather で取得してIDを記憶し、見つからない都市・応答データが不完全な都市は
+        結果に含めません。
+        
+        Args:
+            ids_or_names: 都市ID（int または数字文字列）・都市名のリスト
+            lang: 言語設定（デフォルト: ja）
+            
+        Returns:
+            WeatherBatch: 取得できた都市の天気情報（単位系はクライアントの units）
             
+        Raises:
+            APIKeyError: APIキーエラー
+            APIConnectionError: 接続エラー
+            APIResponseError: group リクエストのAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
+        """
+        if lang is None:
+            lang = self.default_language
+        
+        # 未知の units は API 側で standard（ケルビン）として扱われる
+        batch = WeatherBatch(self.units if self.units in UNITS else 'standard')
+        city_ids: List[int] = []
+        for key in dict.fromkeys(ids_or_names):
+            city_id = self._resolve_city_id(key)
+            if city_id is None:
+                try:
+                    batch.append(self._fetch_current_weather(key, lang))
+                except CityNotFoundError:
+                    self.logger.warning(f"都市が見つからないため除外します: {key}")
+                continue
+            city_ids.append(city_id)
+        
+        city_ids = list(dict.fromkeys(city_ids))
+        for i in range(0, len(city_ids), self.GROUP_MAX_IDS):
+            chunk = city_ids[i:i + self.GROUP_MAX_IDS]
+            label = ','.join(str(city_id) for city_id in chunk)
+            params = {
+                'id': label,
+                'appid': self.api_key,
+                'units': self.units,
+                'lang': lang
+            }
+            skipped = batch.extend_response(self._request('group', params, label))
+            if skipped:
+                self.logger.warning(f"応答データが不完全なため除外します: {skipped}都市")
+        
+        self.logger.info(f"天気情報一括取得成功: {len(batch)}都市（バッチ）")
+        return batch
+    
+    def _resolve_city_id(self, id_or_name: Union[int, str]) -> Optional[int]:
+        """
+        入力を都市IDに解決
+        
+        Args:
+            id_or_name: 都市ID または都市名
+            
+        Returns:
+            Optional[int]: 都市ID（未知の都市名の場合は None）
+        """
+        if isinstance(id_or_name, int):
+            return id_or_name
+        if id_or_name.isdigit():
+            return int(id_or_name)
+        return self.city_resolver.resolve(id_or_name)
+    
+    def _fetch_current_weather(self, city_name: str, lang: str,
+                               city: Optional[CityQuery] = None) -> WeatherData:
+        """
+        APIへリクエストを送信して天気情報を取得
+        
+        Args:
+            city_name: 都市名
+            lang: 言語設定
+            city: 正規化した都市の問い合わせ（省略時は city_name から作成）
+            
+        Returns:
+            WeatherData: 天気情報データ
+        """
         self.logger.info(f"天気情報取得開始: {city_name}")
+        if city is None:
+            city = self.city_resolver.canonicalize(city_name)
+        
+        # APIパラメータの設定（学習済みの都市はIDで問い合わせる）
+        params = self._build_params(city.query, lang, city.city_id if city.use_id else None)
+        
+        try:
+            data = self._request('weather', params, city_name)
+        except CityNotFoundError:
+            if self.negative_cache is not None:
+                self.negative_cache.set(city.key, True)
+            raise
+        weather_data = self._parse_weather_data(data)
+        
+        # 都市IDを記憶（別表記の合流・一括取得で使用）
+        if 'id' in data:
+            self.city_resolver.learn(city_name, data['id'], data.get('name'),
+                                     data.get('sys', {}).get('country'))
+        
+        self.logger.info(f"天気情報取得成功: {city_name}")
+        return weather_data
+    
+    def _fetch_by_coords(self, lat: float, lon: float, lang: str) -> WeatherData:
+        """
+        APIへ座標でリクエストを送信して天気情報を取得
+        
+        Args:
+            lat: 緯度
+            lon: 経度
+            lang: 言語設定
+        
+        Returns:
+            WeatherData: 天気情報データ
+        """
+        label = f"{lat},{lon}"
+        self.logger.info(f"天気情報取得開始: {label}")
+        
+        params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key,
+            'units': self.units,
+            'lang': lang
+        }
+        
+        data = self._request('weather', params, label)
+        weather_data = self._parse_weather_data(data)
+        
+        self.logger.info(f"天気情報取得成功: {label} ({weather_data.city_name})")
+        return weather_data
+    
+    def _fetch_group(self, city_ids: List[int], lang: str) -> Dict[int, WeatherData]:
+        """
+        group エンドポイントで最大20都市を1リクエストで取得
+        
+        Args:
+            city_ids: 都市IDのリスト
+            lang: 言語設定
+            
+        Returns:
+            Dict[int, WeatherData]: 都市IDごとの天気情報
+        """
+        label = ','.join(str(city_id) for city_id in city_ids)
+        self.logger.info(f"天気情報一括取得開始: {len(city_ids)}都市")
         
-        # APIパラメータの設定
         params = {
-            'q': city_name,
+            'id': label,
             'appid': self.api_key,
             'units': self.units,
             'lang': lang
         }
         
+        data = self._request('group', params, label)
+        
+        results = {}
+        for entry in data.get('list', []):
+            results[entry['id']] = self._parse_weather_data(entry)
+        
+        self.logger.info(f"天気情報一括取得成功: {len(results)}/{len(city_ids)}都市")
+        return results
+    
+    def _request(self, endpoint: str, params: Dict[str, Any], city_name: str) -> Dict[str, Any]:
+        """
+        APIリクエストを送信し、応答JSONを返す
+        
+        Args:
+            endpoint: エンドポイント名（weather, group）
+            params: クエリパラメータ
+            city_name: 都市名（エラーメッセージ用）
+            
+        Returns:
+            Dict[str, Any]: API応答データ
+            
+        Raises:
+            CityNotFoundError: 都市が見つからない場合
+            APIKeyError: APIキーエラー
+            APIConnectionError: 接続エラー
+            APIResponseError: その他のAPIエラー
+            RateLimitExceededError: クライアント側のレート制限に達した場合
+        """
         # API URL の構築
-        url = urljoin(self.base_url, 'weather')
+        url = urljoin(self.base_url, endpoint)
+        
+        def send_with_retry():
+            return self.retry_policy.call(lambda: self._send(url, params, city_name), city_name)
+        
+        if self.circuit_breaker is None:
+            return send_with_retry()
+        return self.circuit_breaker.call(send_with_retry)
+    
+    def _send(self, url: str, params: Dict[str, Any], city_name: str) -> Dict[str, Any]:
+        """
+        APIリクエストを1回送信し、応答JSONを返す
+        
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+            city_name: 都市名（エラーメッセージ用）
+            
+        Returns:
+            Dict[str, Any]: API応答データ
+        """
+        # レート制限（リトライを含め、上流への送信ごとにトークンを消費）
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        
+        if self.hedging is not None:
+            # ヘッジ分も待機せずに取得できるトークンがある場合のみ送信（送信前にキャンセルされたら戻す）
+            allow_hedge = self.rate_limiter.try_acquire if self.rate_limiter is not None else None
+            refund_hedge = self.rate_limiter.refund if self.rate_limiter is not None else None
+            return self.hedging.call(lambda: self._send_once(url, params, city_name),
+                                     allow_hedge, refund_hedge)
+        return self._send_once(url, params, city_name)
+    
+    def _send_once(self, url: str, params: Dict[str, Any], city_name: str) -> Dict[str, Any]:
+        """
+        HTTPリクエストを1本送信し、応答JSONを返す
+        
+        Args:
+            url: リクエストURL
+            params: クエリパラメータ
+            city_name: 都市名（エラーメッセージ用）
+            
+        Returns:
+            Dict[str, Any]: API応答データ
+        """
+        # API リクエスト実行（通信エラーはトランスポートが APIConnectionError に変換）
+        response = self.transport.get(url, params=params, timeout=self.timeout)
+        self.logger.debug(f"API応答ステータス: {response.status_code}")
+        
+        # ステータスコード別のエラーハンドリング
+        self._check_status(response.status_code, city_name, response.headers)
         
+        # JSON データの解析（本文のバイト列を直接デコード）
         try:
-            # API リクエスト実行
-            response = requests.get(url, params=params, timeout=self.timeout)
-            self.logger.debug(f"API応答ステータス: {response.status_code}")
-            
-            # ステータスコード別のエラーハンドリング
-            if response.status_code == 404:
-                raise CityNotFoundError(city_name)
-            elif response.status_code == 401:
-                raise APIKeyError("APIキーが無効です")
-            elif response.status_code != 200:
-                raise APIResponseError(response.status_code)
-            
-            # JSON データの解析
-            data = response.json()
-            weather_data = self._parse_weather_data(data)
-            
-            self.logger.info(f"天気情報取得成功: {city_name}")
-            return weather_data
-            
-        except requests.exceptions.Timeout:
-            self.logger.error(f"APIタイムアウト: {city_name}")
-            raise APIConnectionError("APIリクエストがタイムアウトしました")
-        except requests.exceptions.ConnectionError:
-            self.logger.error(f"API接続エラー: {city_name}")
-            raise APIConnectionError("APIサーバーに接続できません")
-        except requests.exceptions.RequestException as e:
-            self.logger.error(f"APIリクエストエラー: {e}")
-            raise APIConnectionError(f"APIリクエストエラー: {e}")
+            return decode_response(response)
+        except ValueError as e:
+            self.logger.error(f"API応答のJSON解析エラー: {e}")
+            raise APIResponseError(response.status_code, f"API応答がJSONとして不正です: {e}")
+    
+    def _build_params(self, city_name: str, lang: str, city_id: Optional[int] = None) -> Dict[str, Any]:
+        """
+        APIリクエストパラメータを構築
+        
+        Args:
+            city_name: 都市名
+            lang: 言語設定
+            city_id: 都市ID（指定時は q の代わりに id で問い合わせる）
+            
+        Returns:
+            Dict[str, Any]: クエリパラメータ
+        """
+        location = {'id': city_id} if city_id is not None else {'q': city_name}
+        return {
+            **location,
+            'appid': self.api_key,
+            'units': self.units,
+            'lang': lang
+        }
+    
+    def _check_status(self, status_code: int, city_name: str,
+                      headers: Optional[Mapping[str, str]] = None) -> None:
+        """
+        ステータスコードを検査し、エラーであれば対応する例外を送出
+        
+        Args:
+            status_code: HTTPステータスコード
+            city_name: 都市名（エラーメッセージ用）
+            headers: 応答ヘッダー（Retry-After の取得に使用）
+            
+        Raises:
+            CityNotFoundError: 404の場合
+            APIKeyError: 401の場合
+            APIResponseError: その他の200以外の場合
+        """
+        if status_code == 404:
+            raise CityNotFoundError(city_name)
+        elif status_code == 401:
+            raise APIKeyError("APIキーが無効です")
+        elif status_code != 200:
+            retry_after = parse_retry_after(headers.get('Retry-After')) if headers is not None else None
+            raise APIResponseError(status_code, retry_after=retry_after)
     
     def _parse_weather_data(self, data: Dict[str, Any]) -> WeatherData:
         """
@@ -143,7 +702,8 @@ class WeatherAPI:
             # 視程（オプショナル）
             visibility = data.get('visibility')
             
-            # タイムスタンプ
+            # 観測時刻（上流の dt・timezone）と取得時刻
+            observed_at = observation_time(data.get('dt'), data.get('timezone'))
             timestamp = datetime.now()
             
             return WeatherData(
@@ -158,13 +718,156 @@ class WeatherAPI:
                 wind_speed=wind_speed,
                 wind_direction=wind_direction,
                 visibility=visibility,
-                timestamp=timestamp
+                timestamp=timestamp,
+                observed_at=observed_at
             )
             
         except KeyError as e:
             self.logger.error(f"API応答データの解析エラー: {e}")
             raise APIResponseError(200, f"API応答データが不完全です: {e}")
     
+    def get_metrics(self) -> Dict[str, Any]:
+        """
+        クライアントの統計情報を取得
+        
+        Returns:
+            Dict[str, Any]: 機能別の統計情報
+        """
+        return {
+            'cache': self.cache.stats() if self.cache else None,
+            'negative_cache': self.negative_cache.stats() if self.negative_cache else None,
+            'single_flight': self.single_flight.stats(),
+            'retry': self.retry_policy.stats(),
+            'rate_limit': self.rate_limiter.stats() if self.rate_limiter else None,
+            'circuit_breaker': self.circuit_breaker.stats() if self.circuit_breaker else None,
+            'hedging': self.hedging.stats() if self.hedging else None
+        }
+    
+    def get_cache_stats(self, hot_keys: int = 10) -> Dict[str, Any]:
+        """
+        キャッシュの統計情報とヒット数の多いキーを取得
+        
+        Args:
+            hot_keys: 返す人気キーの件数
+            
+        Returns:
+            Dict[str, Any]: キャッシュ・ネガティブキャッシュの統計と人気キー
+        """
+        def hottest(cache):
+            if cache is None:
+                return []
+            return [{'key': format_key(key), 'hits': hits} for key, hits in cache.hot_keys(hot_keys)]
+        
+        return {
+            'cache': self.cache.stats() if self.cache else None,
+            'negative_cache': self.negative_cache.stats() if self.negative_cache else None,
+            'hot_keys': hottest(self.cache),
+            'negative_hot_keys': hottest(self.negative_cache)
+        }
+    
+    def _match_keys(self, cache, pattern: str, prefix: bool) -> List[Any]:
+        """キャッシュ内で pattern に一致するキーを列挙"""
+        if cache is None:
+            return []
+        if prefix:
+            # "/" で終わるパターン（都市単位）は区切りの前までと一致するキー（ネガティブキャッシュ）も対象
+            exact = pattern[:-1] if pattern.endswith('/') else None
+            matched = []
+            for key in cache.keys():
+                text = format_key(key)
+                if text.startswith(pattern) or text == exact:
+                    matched.append(key)
+            return matched
+        return [key for key in cache.keys() if format_key(key) == pattern]
+    
+    def city_key_prefix(self, city_name: str, lang: Optional[str] = None) -> str:
+        """
+        都市名（と言語）に対応するキャッシュキーの前方一致パターンを取得
+        
+        Args:
+            city_name: 都市名（表記ゆれは正規化される）
+            lang: 言語設定（省略時は全言語）
+            
+        Returns:
+            str: キーの前方一致パターン（例: "id:1850144/ja/"、言語の省略時は "id:1850144/"）
+        """
+        # 区切りまで含め、"q:york" が "q:yorkshire/..." に一致しないようにする
+        label = format_key(self.city_resolver.canonicalize(city_name).key)
+        return f"{label}/{lang}/" if lang else f"{label}/"
+    
+    def purge_cache(self, pattern: str, prefix: bool = False) -> int:
+        """
+        キャッシュ・ネガティブキャッシュからエントリを削除
+        
+        Args:
+            pattern: キーの文字列表現（format_key の形式）
+            prefix: True の場合は前方一致で削除
+            
+        Returns:
+            int: 削除したエントリ数
+            
+        Raises:
+            ValueError: 前方一致で空のパターンを指定した場合（全エントリの削除は行わない）
+        """
+        if prefix and not pattern:
+            raise ValueError("前方一致の削除には空でないパターンを指定してください")
+        removed = 0
+        for cache in (self.cache, self.negative_cache):
+            for key in self._match_keys(cache, pattern, prefix):
+                removed += bool(cache.delete(key))
+        self.logger.info(f"キャッシュを削除しました: {pattern}{'*' if prefix else ''} ({removed}件)")
+        return removed
+    
+    def refresh_cache(self, pattern: str, prefix: bool = False) -> Dict[str, str]:
+        """
+        キャッシュ済みのエントリを上流から再取得
+        
+        他の単位系（units）のキーは、このクライアントでは取得できないため対象外です。
+        
+        Args:
+            pattern: キーの文字列表現（format_key の形式）
+            prefix: True の場合は前方一致で再取得
+            
+        Returns:
+            Dict[str, str]: キーごとの結果（refreshed またはエラーメッセージ）
+            
+        Raises:
+            ValueError: 前方一致で空のパターンを指定した場合（全エントリの再取得は行わない）
+        """
+        if prefix and not pattern:
+            raise ValueError("前方一致の再取得には空でないパターンを指定してください")
+        results: Dict[str, str] = {}
+        for key in self._match_keys(self.cache, pattern, prefix):
+            city_key, lang, units = key
+            if units != self.units:
+                continue
+            kind, value = city_key[0], city_key[1]
+            if kind == 'geo':
+                fetch = partial(self._fetch_coords_and_cache, key, value, city_key[2], lang)
+            else:
+                if kind == 'id':
+                    city = CityQuery(city_key, str(value), value, True)
+                else:
+                    city = CityQuery(city_key, value, None, False)
+                fetch = partial(self._fetch_and_cache, key, city.query, lang, city)
+            label = format_key(key)
+            try:
+                self.single_flight.do(key, fetch)
+                results[label] = 'refreshed'
+            except WeatherAPIError as e:
+                results[label] = str(e)
+        self.logger.info(f"キャッシュを再取得しました: {pattern}{'*' if prefix else ''} ({len(results)}件)")
+        return results
+    
+    def close(self) -> None:
+        """トランスポート・接続プール・ヘッジ用スレッドとキャッシュを閉じる"""
+        if self.hedging is not None:
+            self.hedging.close()
+        if hasattr(self.cache, 'close'):
+            self.cache.close()
+        self.transport.close()
+        self.session_pool.close()
+    
     def validate_api_key(self) -> bool:
         """
         APIキーの有効性を検証
@@ -173,8 +876,8 @@ class WeatherAPI:
             bool: APIキーが有効かどうか
         """
         try:
-            # 軽量なAPIリクエストでキーを検証
-            self.get_current_weather("London")
+            # 軽量なAPIリクエストでキーを検証（キャッシュを通すと失効したキーを見逃す）
+            self._fetch_current_weather("London", self.default_language)
             return True
         except APIKeyError:
             return False
@@ -0,0 +1,589 @@
+"""
+天気データの列指向コンテナ
+多数の観測値を WeatherData のリストではなく項目ごとの array バッファに詰めて保持し、
+メモリを節約する。絞り込み・並べ替え・集計・単位変換は列の値を Python でループして行い、
+行ごとに WeatherData を作らない（NumPy のようなベクトル演算ではない）
+"""
+
+import math
+import operator
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+from .exceptions import APIResponseError
+from .models import WeatherData, observation_time
+from .record_codec import (
+    EPOCH, UTC_EPOCH, MICROSECOND, FLAG_STALE, FLAG_NO_WIND_SPEED, FLAG_NO_WIND_DIRECTION,
+    FLAG_NO_VISIBILITY, FLAG_AWARE, FLAG_OBSERVED, STALE_REASON_FLAGS, stale_reason_from_flags
+)
+
+
+# 数値の列と array の型コード
+NUMERIC_COLUMNS: Dict[str, str] = {
+    'temperature': 'd',
+    'feels_like': 'd',
+    'humidity': 'i',
+    'pressure': 'i',
+    'wind_speed': 'd',
+    'wind_direction': 'i',
+    'visibility': 'i',
+}
+
+# 辞書エンコードする文字列の列
+STRING_COLUMNS = ('city_name', 'country', 'description', 'description_en')
+
+# 値が無い場合のフラグ（該当する行は集計・比較の対象外）
+MISSING_FLAGS = {
+    'wind_speed': FLAG_NO_WIND_SPEED,
+    'wind_direction': FLAG_NO_WIND_DIRECTION,
+    'visibility': FLAG_NO_VISIBILITY,
+}
+
+# 単位系（OpenWeatherMap の units パラメータと同じ）
+UNITS = ('metric', 'imperial', 'standard')
+
+# 1 mph あたりの m/s
+MPH = 0.44704
+
+COMPARISONS: Dict[str, Callable[[Any, Any], bool]] = {
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+
+def _to_celsius(value: float, units: str) -> float:
+    """温度を摂氏に変換"""
+    if units == 'imperial':
+        return (value - 32) * 5 / 9
+    if units == 'standard':
+        return value - 273.15
+    return value
+
+
+def _from_celsius(value: float, units: str) -> float:
+    """摂氏を指定の単位系の温度に変換"""
+    if units == 'imperial':
+        return value * 9 / 5 + 32
+    if units == 'standard':
+        return value + 273.15
+    return value
+
+
+class WeatherBatch:
+    """天気データの列指向コンテナ
+
+    数値の項目は array バッファ、都市名・国名・天気概況は辞書エンコード
+    （行ごとには辞書のコードだけを持つ）で保持します。時刻は record_codec と同じく
+    現地時刻のエポックからのマイクロ秒とUTCオフセット、観測時刻はUTCのマイクロ秒と都市の
+    UTCオフセット、値の有無・is_stale・stale_reason はフラグで保持します。
+    絞り込み・並べ替えの結果は新しい WeatherBatch として返し、元のバッチは変更しません。
+
+    各操作は列の値を1つずつ Python で処理するため、速度は WeatherData のリストを
+    ループする場合と同程度です。利点は1行あたりのメモリと、WeatherData を作らずに
+    済むことです。
+    """
+
+    def __init__(self, units: str = 'metric'):
+        """
+        初期化
+
+        Args:
+            units: 温度・風速の単位系（metric, imperial, standard）
+        """
+        if units not in UNITS:
+            raise ValueError(f"未対応の単位系です: {units}")
+        self.units = units
+        self._numeric: Dict[str, array] = {name: array(code) for name, code in NUMERIC_COLUMNS.items()}
+        self._codes: Dict[str, array] = {name: array('I') for name in STRING_COLUMNS}
+        self._values: Dict[str, List[str]] = {name: [] for name in STRING_COLUMNS}
+        self._index: Dict[str, Dict[str, int]] = {name: {} for name in STRING_COLUMNS}
+        self._timestamps = array('q')
+        self._utc_offsets = array('i')
+        self._observed = array('q')
+        self._observed_offsets = array('i')
+        self._flags = array('B')
+
+    @classmethod
+    def from_weather_list(cls, items: Iterable[WeatherData], units: str = 'metric') -> "WeatherBatch":
+        """
+        WeatherData のリストから作成
+
+        Args:
+            items: 天気データ
+            units: 天気データの単位系
+
+        Returns:
+            WeatherBatch: 列指向のバッチ
+        """
+        batch = cls(units)
+        batch.extend(items)
+        return batch
+
+    @classmethod
+    def from_response(cls, data: Dict[str, Any], units: str = 'metric',
+                      timestamp: Optional[datetime] = None) -> "WeatherBatch":
+        """
+        group（一括取得）エンドポイントの応答から WeatherData を経由せずに作成
+
+        Args:
+            data: /group の応答（'list' に各都市の /weather と同じ形式の要素）
+            units: 応答の単位系（リクエストの units パラメータ）
+            timestamp: データ取得時刻（省略時は現在時刻）
+
+        Returns:
+            WeatherBatch: 列指向のバッチ（不完全な要素は含めない）
+        """
+        batch = cls(units)
+        batch.extend_response(data, timestamp)
+        return batch
+
+    # ------------------------------------------------------------------
+    # 追加
+    # ------------------------------------------------------------------
+
+    def _append_string(self, name: str, value: str) -> None:
+        """文字列を辞書のコードとして追加"""
+        index = self._index[name]
+        code = index.get(value)
+        if code is None:
+            code = index[value] = len(self._values[name])
+            self._values[name].append(value)
+        self._codes[name].append(code)
+
+    def _truncate(self, rows: int) -> None:
+        """行数を rows に戻す（追加の途中で失敗した行の取り消し）"""
+        columns = [*self._numeric.values(), *self._codes.values(), self._timestamps,
+                   self._utc_offsets, self._observed, self._observed_offsets, self._flags]
+        for column in columns:
+            del column[rows:]
+
+    def _append_row(self, city_name: str, country: str, temperature: float, feels_like: float,
+                    humidity: int, pressure: int, description: str, description_en: str,
+                    wind_speed: Optional[float], wind_direction: Optional[int],
+                    visibility: Optional[int], timestamp: datetime, is_stale: bool,
+                    observed_at: Optional[datetime], stale_reason: Optional[str] = None) -> None:
+        """1行を追加"""
+        flags = FLAG_STALE if is_stale else 0
+        flags |= STALE_REASON_FLAGS.get(stale_reason, 0)
+        if wind_speed is None:
+            flags |= FLAG_NO_WIND_SPEED
+            wind_speed = 0.0
+        if wind_direction is None:
+            flags |= FLAG_NO_WIND_DIRECTION
+            wind_direction = 0
+        if visibility is None:
+            flags |= FLAG_NO_VISIBILITY
+            visibility = 0
+
+        offset = timestamp.utcoffset()
+        utc_offset = 0
+        if offset is not None:
+            flags |= FLAG_AWARE
+            utc_offset = int(offset.total_seconds())
+            timestamp = timestamp.replace(tzinfo=None)
+
+        observed = observed_offset = 0
+        if observed_at is not None:
+            flags |= FLAG_OBSERVED
+            observed = (observed_at - UTC_EPOCH) // MICROSECOND
+            observed_offset = int(observed_at.utcoffset().total_seconds())
+
+        # 型が合わない値で途中の列だけに追加されないよう、失敗したら行を取り消す
+        rows = len(self)
+        numeric = self._numeric
+        try:
+            numeric['temperature'].append(temperature)
+            numeric['feels_like'].append(feels_like)
+            numeric['humidity'].append(humidity)
+            numeric['pressure'].append(pressure)
+            numeric['wind_speed'].append(wind_speed)
+            numeric['wind_direction'].append(wind_direction)
+            numeric['visibility'].append(visibility)
+            self._append_string('city_name', city_name)
+            self._append_string('country', country)
+            self._append_string('description', description)
+            self._append_string('description_en', description_en)
+            self._timestamps.append((timestamp - EPOCH) // MICROSECOND)
+            self._utc_offsets.append(utc_offset)
+            self._observed.append(observed)
+            self._observed_offsets.append(observed_offset)
+            self._flags.append(flags)
+        except BaseException:
+            self._truncate(rows)
+            raise
+
+    def append(self, weather_data: WeatherData) -> None:
+        """
+        天気データを1件追加
+
+        Args:
+            weather_data: 天気データ（バッチと同じ単位系）
+        """
+        self._append_row(
+            weather_data.city_name, weather_data.country, weather_data.temperature,
+            weather_data.feels_like, weather_data.humidity, weather_data.pressure,
+            weather_data.description, weather_data.description_en, weather_data.wind_speed,
+            weather_data.wind_direction, weather_data.visibility, weather_data.timestamp,
+            weather_data.is_stale, weather_data.observed_at, weather_data.stale_reason
+        )
+
+    def extend(self, items: Iterable[WeatherData]) -> None:
+        """
+        天気データをまとめて追加
+
+        Args:
+            items: 天気データ（バッチと同じ単位系）
+        """
+        for weather_data in items:
+            self.append(weather_data)
+
+    def append_response(self, entry: Dict[str, Any], timestamp: Optional[datetime] = None) -> None:
+        """
+        /weather 形式の応答を1件追加（WeatherAPI._parse_weather_data と同じ変換）
+
+        Args:
+            entry: /weather の応答、または /group の 'list' の要素
+            timestamp: データ取得時刻（省略時は現在時刻）
+
+        Raises:
+            APIResponseError: 応答データが不完全・型が不正な場合（バッチは変更されない）
+        """
+        try:
+            main = entry['main']
+            weather = entry['weather'][0]
+            wind = entry.get('wind', {})
+            observed_at = observation_time(entry.get('dt'), entry.get('timezone'))
+            self._append_row(
+                entry['name'], entry['sys']['country'], round(main['temp'], 1),
+                round(main['feels_like'], 1), main['humidity'], main['pressure'],
+                weather['description'], weather['main'], wind.get('speed'), wind.get('deg'),
+                entry.get('visibility'), timestamp or datetime.now(), False, observed_at
+            )
+        except (KeyError, IndexError, TypeError, ValueError, OverflowError) as e:
+            raise APIResponseError(200, f"API応答データが不完全です: {e}")
+
+    def extend_response(self, data: Dict[str, Any], timestamp: Optional[datetime] = None) -> int:
+        """
+        group（一括取得）エンドポイントの応答をまとめて追加
+
+        不完全な要素は1件ずつ読み飛ばし、残りの要素は追加します。
+
+        Args:
+            data: /group の応答
+            timestamp: データ取得時刻（省略時は現在時刻）
+
+        Returns:
+            int: 読み飛ばした要素の数
+        """
+        timestamp = timestamp or datetime.now()
+        skipped = 0
+        for entry in data.get('list', []):
+            try:
+                self.append_response(entry, timestamp)
+            except APIResponseError:
+                skipped += 1
+        return skipped
+
+    # ------------------------------------------------------------------
+    # 参照・変換
+    # ------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._flags)
+
+    def _timestamp(self, row: int) -> datetime:
+        """row 行目の時刻を復元"""
+        timestamp = EPOCH + timedelta(microseconds=self._timestamps[row])
+        if self._flags[row] & FLAG_AWARE:
+            timestamp = timestamp.replace(tzinfo=timezone(timedelta(seconds=self._utc_offsets[row])))
+        return timestamp
+
+    def _observed_at(self, row: int) -> Optional[datetime]:
+        """row 行目の観測時刻を復元"""
+        if not self._flags[row] & FLAG_OBSERVED:
+            return None
+        observed = UTC_EPOCH + timedelta(microseconds=self._observed[row])
+        return observed.astimezone(timezone(timedelta(seconds=self._observed_offsets[row])))
+
+    def __getitem__(self, row: int) -> WeatherData:
+        """row 行目を WeatherData として取得"""
+        if row < 0:
+            row += len(self)
+        if not 0 <= row < len(self):
+            raise IndexError("WeatherBatch の範囲外です")
+        numeric = self._numeric
+        flags = self._flags[row]
+        string = {name: self._values[name][self._codes[name][row]] for name in STRING_COLUMNS}
+        return WeatherData(
+            city_name=string['city_name'],
+            country=string['country'],
+            temperature=numeric['temperature'][row],
+            feels_like=numeric['feels_like'][row],
+            humidity=numeric['humidity'][row],
+            pressure=numeric['pressure'][row],
+            description=string['description'],
+            description_en=string['description_en'],
+            wind_speed=None if flags & FLAG_NO_WIND_SPEED else numeric['wind_speed'][row],
+            wind_direction=None if flags & FLAG_NO_WIND_DIRECTION else numeric['wind_direction'][row],
+            visibility=None if flags & FLAG_NO_VISIBILITY else numeric['visibility'][row],
+            timestamp=self._timestamp(row),
+            is_stale=bool(flags & FLAG_STALE),
+            observed_at=self._observed_at(row),
+            stale_reason=stale_reason_from_flags(flags)
+        )
+
+    def __iter__(self) -> Iterator[WeatherData]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def to_list(self) -> List[WeatherData]:
+        """
+        WeatherData のリストに変換
+
+        Returns:
+            List[WeatherData]: 天気データ（行の順序どおり）
+        """
+        return list(self)
+
+    def column(self, name: str) -> Union[array, List[Optional[str]], List[Any]]:
+        """
+        列を取得
+
+        数値の列は array のコピー（値が無い行は 0）、文字列の列は文字列のリストを返します。
+        値が無い行を None にしたい場合は values() を使用してください。
+
+        Args:
+            name: 列名（WeatherData のフィールド名）
+
+        Returns:
+            列の値
+        """
+        if name in NUMERIC_COLUMNS:
+            return array(NUMERIC_COLUMNS[name], self._numeric[name])
+        if name in STRING_COLUMNS:
+            values = self._values[name]
+            return [values[code] for code in self._codes[name]]
+        if name == 'timestamp':
+            return [self._timestamp(row) for row in range(len(self))]
+        if name == 'observed_at':
+            return [self._observed_at(row) for row in range(len(self))]
+        if name == 'is_stale':
+            return [bool(flags & FLAG_STALE) for flags in self._flags]
+        if name == 'stale_reason':
+            return [stale_reason_from_flags(flags) for flags in self._flags]
+        raise KeyError(f"未知の列です: {name}")
+
+    def values(self, name: str) -> List[Any]:
+        """
+        値が無い行を None にした列の値を取得
+
+        Args:
+            name: 列名
+
+        Returns:
+            List[Any]: 列の値
+        """
+        column = self.column(name)
+        missing = MISSING_FLAGS.get(name)
+        if missing is None:
+            return list(column)
+        return [None if flags & missing else value for value, flags in zip(column, self._flags)]
+
+    # ------------------------------------------------------------------
+    # 絞り込み・並べ替え
+    # ------------------------------------------------------------------
+
+    def mask(self, name: str, op: str, value: Any) -> List[bool]:
+        """
+        列と値の比較結果を行ごとに計算
+
+        文字列の列は辞書の値ごとに1回だけ比較し、行ごとにはコードを参照するだけです。
+        値が無い行は常に False になります。
+
+        Args:
+            name: 列名
+            op: 比較演算子（<, <=, >, >=, ==, !=）
+            value: 比較する値
+
+        Returns:
+            List[bool]: 行ごとの比較結果（filter() に渡す）
+        """
+        compare = COMPARISONS.get(op)
+        if compare is None:
+            raise ValueError(f"未対応の比較演算子です: {op}")
+        if name in STRING_COLUMNS:
+            matches = [compare(item, value) for item in self._values[name]]
+            return [matches[code] for code in self._codes[name]]
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"比較できない列です: {name}")
+        column = self._numeric[name]
+        missing = MISSING_FLAGS.get(name)
+        if missing is None:
+            return [compare(item, value) for item in column]
+        return [not flags & missing and compare(item, value) for item, flags in zip(column, self._flags)]
+
+    def isin(self, name: str, values: Iterable[str]) -> List[bool]:
+        """
+        文字列の列が values のいずれかと一致するかを行ごとに計算
+
+        Args:
+            name: 文字列の列名
+            values: 一致させる値
+
+        Returns:
+            List[bool]: 行ごとの結果（filter() に渡す）
+        """
+        if name not in STRING_COLUMNS:
+            raise KeyError(f"文字列の列ではありません: {name}")
+        wanted = set(values)
+        matches = [item in wanted for item in self._values[name]]
+        return [matches[code] for code in self._codes[name]]
+
+    def take(self, rows: Iterable[int]) -> "WeatherBatch":
+        """
+        指定した行だけを持つ新しいバッチを作成
+
+        Args:
+            rows: 行番号（この順序で並ぶ）
+
+        Returns:
+            WeatherBatch: 新しいバッチ
+        """
+        rows = list(rows)
+        batch = WeatherBatch(self.units)
+        for name, column in self._numeric.items():
+            batch._numeric[name] = array(column.typecode, [column[row] for row in rows])
+        for name, codes in self._codes.items():
+            batch._codes[name] = array('I', [codes[row] for row in rows])
+            batch._values[name] = list(self._values[name])
+            batch._index[name] = dict(self._index[name])
+        batch._timestamps = array('q', [self._timestamps[row] for row in rows])
+        batch._utc_offsets = array('i', [self._utc_offsets[row] for row in rows])
+        batch._observed = array('q', [self._observed[row] for row in rows])
+        batch._observed_offsets = array('i', [self._observed_offsets[row] for row in rows])
+        batch._flags = array('B', [self._flags[row] for row in rows])
+        return batch
+
+    def filter(self, mask: Sequence[bool]) -> "WeatherBatch":
+        """
+        mask が True の行だけを持つ新しいバッチを作成
+
+        Args:
+            mask: 行ごとの真偽値（mask()・isin() の結果を and/or で組み合わせ可能）
+
+        Returns:
+            WeatherBatch: 絞り込んだバッチ
+        """
+        if len(mask) != len(self):
+            raise ValueError("mask の長さがバッチの行数と一致しません")
+        return self.take(row for row, keep in enumerate(mask) if keep)
+
+    def sort_by(self, name: str, reverse: bool = False) -> "WeatherBatch":
+        """
+        列の値で並べ替えた新しいバッチを作成
+
+        値が無い行は昇順・降順とも末尾に並びます。文字列の列は辞書の値ごとに
+        順位を計算してからコードで並べ替えます。
+
+        Args:
+            name: 列名
+            reverse: 降順にする場合は True
+
+        Returns:
+            WeatherBatch: 並べ替えたバッチ
+        """
+        rows = range(len(self))
+        if name in STRING_COLUMNS:
+            values = self._values[name]
+            order = sorted(range(len(values)), key=values.__getitem__)
+            rank = [0] * len(values)
+            for position, code in enumerate(order):
+                rank[code] = position
+            codes = self._codes[name]
+            return self.take(sorted(rows, key=lambda row: rank[codes[row]], reverse=reverse))
+        if name == 'timestamp':
+            return self.take(sorted(rows, key=self._timestamp, reverse=reverse))
+        if name == 'observed_at':
+            present = [row for row in rows if self._flags[row] & FLAG_OBSERVED]
+            absent = [row for row in rows if not self._flags[row] & FLAG_OBSERVED]
+            return self.take(sorted(present, key=self._observed.__getitem__, reverse=reverse) + absent)
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"並べ替えできない列です: {name}")
+
+        column = self._numeric[name]
+        missing = MISSING_FLAGS.get(name, 0)
+        present = [row for row in rows if not self._flags[row] & missing]
+        absent = [row for row in rows if self._flags[row] & missing]
+        return self.take(sorted(present, key=column.__getitem__, reverse=reverse) + absent)
+
+    # ------------------------------------------------------------------
+    # 集計
+    # ------------------------------------------------------------------
+
+    def _present(self, name: str) -> Union[array, List[Any]]:
+        """値がある行だけの数値の列"""
+        if name not in NUMERIC_COLUMNS:
+            raise KeyError(f"集計できない列です: {name}")
+        column = self._numeric[name]
+        missing = MISSING_FLAGS.get(name)
+        if missing is None:
+            return column
+        return [item for item, flags in zip(column, self._flags) if not flags & missing]
+
+    def min(self, name: str) -> Optional[float]:
+        """列の最小値（値が無い場合は None）"""
+        column = self._present(name)
+        return min(column) if len(column) else None
+
+    def max(self, name: str) -> Optional[float]:
+        """列の最大値（値が無い場合は None）"""
+        column = self._present(name)
+        return max(column) if len(column) else None
+
+    def mean(self, name: str) -> Optional[float]:
+        """列の平均値（値が無い場合は None）"""
+        column = self._present(name)
+        return math.fsum(column) / len(column) if len(column) else None
+
+    # ------------------------------------------------------------------
+    # 単位変換
+    # ------------------------------------------------------------------
+
+    def convert_units(self, units: str) -> "WeatherBatch":
+        """
+        温度・風速を別の単位系に変換した新しいバッチを作成
+
+        温度は摂氏（metric）・華氏（imperial）・ケルビン（standard）、
+        風速は m/s（metric, standard）・mph（imperial）です。
+        温度は API 応答の解析と同じく小数第1位に丸めます。
+
+        Args:
+            units: 変換先の単位系（metric, imperial, standard）
+
+        Returns:
+            WeatherBatch: 変換したバッチ
+        """
+        if units not in UNITS:
+            raise ValueError(f"未対応の単位系です: {units}")
+        batch = self.take(range(len(self)))
+        batch.units = units
+        if units == self.units:
+            return batch
+
+        source = self.units
+        for name in ('temperature', 'feels_like'):
+            batch._numeric[name] = array('d', [
+                round(_from_celsius(_to_celsius(value, source), units), 1)
+                for value in self._numeric[name]
+            ])
+        if (source == 'imperial') != (units == 'imperial'):
+            factor = MPH if source == 'imperial' else 1 / MPH
+            batch._numeric['wind_speed'] = array('d', [
+                round(value * factor, 2) for value in self._numeric['wind_speed']
+            ])
+        return batch
@@ -5,6 +5,7 @@ Weather CLI - 天気情報取得コマンドラインアプリ
 """
 
 import sys
+import sqlite3
 import argparse
 import logging
 from typing import Optional, List
@@ -15,11 +16,15 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src import create_weather_client, setup_logging
+from src.utils import load_config
+from src.disk_cache import SQLiteCache
+from src.models import STALE_REVALIDATING
 from src.exceptions import (
     CityNotFoundError,
     APIKeyError,
     APIConnectionError,
     APIResponseError,
+    RateLimitExceededError,
     WeatherAPIError
 )
 from src.cli_utils import (
@@ -39,14 +44,19 @@ from src.cli_utils import (
 class WeatherCLI:
     """天気情報CLI アプリケーション"""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", disk_cache: bool = False,
+                 disk_cache_path: Optional[str] = None):
         """
         CLI初期化
         
         Args:
             config_path: 設定ファイルパス
+            disk_cache: ディスクキャッシュを使用するかどうか（False の場合は cache.disk.enabled に従う）
+            disk_cache_path: ディスクキャッシュのパス（指定時はディスクキャッシュを使用、省略時は cache.disk.path）
         """
         self.config_path = config_path
+        self.disk_cache = disk_cache or disk_cache_path is not None
+        self.disk_cache_path = disk_cache_path
         self.logger = logging.getLogger(__name__)
         self.weather_client = None
         
@@ -58,7 +68,7 @@ class WeatherCLI:
             bool: 初期化成功フラグ
         """
         try:
-            self.weather_client = create_weather_client(self.config_path)
+            self.weather_client = create_weather_client(self.config_path, cache=self._create_disk_cache())
             return True
         except FileNotFoundError as e:
             print_error(f"設定ファイルが見つかりません: {e}")
@@ -68,6 +78,26 @@ class WeatherCLI:
             print_error(f"初期化エラー: {e}")
             return False
     
+    def _create_disk_cache(self) -> Optional[SQLiteCache]:
+        """
+        ディスクキャッシュを作成（--disk-cache・--disk-cache-path または cache.disk.enabled の場合）
+        
+        Returns:
+            Optional[SQLiteCache]: ディスクキャッシュ（無効または作成できない場合は None）
+        """
+        cache_config = load_config(self.config_path).get('cache') or {}
+        disk_config = cache_config.get('disk') or {}
+        if not self.disk_cache and not disk_config.get('enabled', False):
+            return None
+        
+        try:
+            cache = SQLiteCache.from_config(cache_config, path=self.disk_cache_path)
+        except (OSError, sqlite3.Error) as e:
+            print_warning(f"ディスクキャッシュを使用できません: {e}")
+            return None
+        self.logger.debug(f"ディスクキャッシュ: {cache.path}")
+        return cache
+    
     def validate_setup(self) -> bool:
         """
         セットアップの検証（APIキーなど）
@@ -118,6 +148,11 @@ class WeatherCLI:
             
             # 天気情報表示
             print(format_weather_display(weather_data))
+            if weather_data.is_stale is True:
+                if weather_data.stale_reason == STALE_REVALIDATING:
+                    print_info("キャッシュの情報です（最新の情報を取得中です）")
+                else:
+                    print_warning("最新の天気情報を取得できなかったため、前回取得したデータを表示しています")
             
             # 詳細情報表示（オプション）
             if show_detailed:
@@ -146,6 +181,12 @@ class WeatherCLI:
                 print_warning("API使用制限に達している可能性があります。しばらく待ってから再試行してください。")
             return False
             
+        except RateLimitExceededError as e:
+            print_error(f"レート制限: {e}")
+            if e.retry_after is not None:
+                print_warning(f"{e.retry_after:.0f}秒ほど待ってから再試行してください。")
+            return False
+            
         except WeatherAPIError as e:
             print_error(f"天気API例外: {e}")
             return False
@@ -303,6 +344,8 @@ def create_parser() -> argparse.ArgumentParser:
   %(prog)s Tokyo London        # 複数都市の天気を一括取得
   %(prog)s --interactive       # 対話モードを明示的に開始
   %(prog)s Tokyo --detailed    # 詳細情報付きで表示
+  %(prog)s Tokyo --disk-cache  # 結果をディスクにキャッシュ（cron等の繰り返し実行向け）
+  %(prog)s Tokyo --disk-cache-path /var/tmp/weather.db  # 保存先を指定してディスクにキャッシュ
         """
     )
     
@@ -330,6 +373,18 @@ def create_parser() -> argparse.ArgumentParser:
         help='設定ファイルパス（デフォルト: config.yaml）'
     )
     
+    parser.add_argument(
+        '--disk-cache',
+        action='store_true',
+        help='取得結果をディスクにキャッシュしてプロセス間で共有（保存先は設定ファイルの cache.disk.path）'
+    )
+    
+    parser.add_argument(
+        '--disk-cache-path',
+        metavar='PATH',
+        help='ディスクキャッシュの保存先（指定すると --disk-cache も有効）'
+    )
+    
     parser.add_argument(
         '-v', '--verbose',
         action='store_true',
@@ -359,7 +414,7 @@ def main() -> int:
         Colors.is_supported = lambda: False
     
     # CLI アプリケーション初期化
-    cli = WeatherCLI(args.config)
+    cli = WeatherCLI(args.config, disk_cache=args.disk_cache, disk_cache_path=args.disk_cache_path)
     
     # クライアント初期化
     if not cli.initialize_client():
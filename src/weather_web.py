@@ -6,7 +6,10 @@ CLI版で作成したAPIクライアントを活用したユーザーフレン
 
 import os
 import sys
+import hmac
+import math
 import logging
+import threading
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, Any, Optional
@@ -18,11 +21,14 @@ project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
 from src import create_weather_client, setup_logging
+from src.circuit_breaker import CircuitBreaker
+from src.warmup import CacheWarmer
 from src.exceptions import (
     CityNotFoundError,
     APIKeyError,
     APIConnectionError,
     APIResponseError,
+    RateLimitExceededError,
     WeatherAPIError
 )
 
@@ -41,6 +47,11 @@ class WeatherWebApp:
         self.logger = logging.getLogger(__name__)
         self.weather_client = None
         self.flask_app = None
+        self.warmup_results: Optional[Dict[str, str]] = None
+        self.warmup_thread: Optional[threading.Thread] = None
+        
+        # キャッシュ管理用トークン（未設定の場合は管理エンドポイントを無効化）
+        self.admin_token = os.environ.get('WEATHER_ADMIN_TOKEN')
         
         # Flask アプリケーション設定
         self._setup_flask_app()
@@ -48,6 +59,9 @@ class WeatherWebApp:
         
         # 天気APIクライアント初期化
         self._initialize_weather_client()
+        
+        # キャッシュのウォームアップ（起動を待たせないよう裏で実行）
+        self._start_warm_up()
     
     def _setup_flask_app(self) -> None:
         """Flask アプリケーションの設定"""
@@ -88,6 +102,90 @@ class WeatherWebApp:
             self.logger.error(f"天気APIクライアント初期化失敗: {e}")
             self.weather_client = None
     
+    def _start_warm_up(self) -> None:
+        """ウォームアップ用のスレッドを開始（キャッシュが無い場合は何もしない）"""
+        if not self.weather_client or getattr(self.weather_client, 'cache', None) is None:
+            return
+        self.warmup_thread = threading.Thread(target=self._warm_up_cache, name='warmup', daemon=True)
+        self.warmup_thread.start()
+    
+    def _warm_up_cache(self) -> None:
+        """デフォルト都市・人気都市をキャッシュに載せる"""
+        if not self.weather_client or getattr(self.weather_client, 'cache', None) is None:
+            return
+        try:
+            config = self.weather_client.config
+            warmer = CacheWarmer.from_config(
+                config.get('web', {}).get('warmup'),
+                config.get('defaults', {}).get('city')
+            )
+            if warmer is not None:
+                self.warmup_results = warmer.run(self.weather_client)
+        except Exception as e:
+            self.logger.warning(f"キャッシュのウォームアップに失敗しました: {e}")
+    
+    def _weather_response(self, weather_data):
+        """
+        天気情報APIの成功レスポンス
+        
+        WeatherData が保持する JSON のバイト列（to_json()）をそのまま本文に書き込み、
+        キャッシュヒットでは辞書の作成・JSONエンコードを行いません。
+        
+        Args:
+            weather_data: 天気情報データ
+            
+        Returns:
+            成功レスポンス（{"status": "success", "data": {...}}）
+        """
+        body = b'{"status":"success","data":' + weather_data.to_json() + b'}'
+        return self.flask_app.response_class(body, mimetype='application/json')
+    
+    def _check_admin_token(self):
+        """
+        管理エンドポイントの認証
+        
+        Returns:
+            認証エラー時のレスポンス（認証成功時は None）
+        """
+        if not self.admin_token:
+            return jsonify({
+                'error': '管理エンドポイントは無効です（WEATHER_ADMIN_TOKEN が未設定）',
+                'status': 'error',
+                'error_type': 'admin_disabled'
+            }), 403
+        
+        header = request.headers.get('Authorization', '')
+        token = header[len('Bearer '):] if header.startswith('Bearer ') else ''
+        if not hmac.compare_digest(token.encode('utf-8'), self.admin_token.encode('utf-8')):
+            return jsonify({
+                'error': '認証に失敗しました',
+                'status': 'error',
+                'error_type': 'unauthorized'
+            }), 401
+        return None
+    
+    def _cache_target(self):
+        """
+        管理エンドポイントのリクエストから対象キーを取得
+        
+        JSON の key（完全一致）、prefix（前方一致）、city（都市名、lang で言語も指定可）の
+        いずれかで指定します。
+        
+        Returns:
+            Tuple[str, bool]: キーまたは前方一致パターンと、前方一致かどうか
+            
+        Raises:
+            ValueError: 対象が指定されていない場合
+        """
+        body = request.get_json(silent=True) or {}
+        if body.get('key'):
+            return str(body['key']), False
+        if 'prefix' in body:
+            return str(body['prefix']), True
+        if body.get('city'):
+            return self.weather_client.city_key_prefix(str(body['city']), body.get('lang')), True
+        raise ValueError("key・prefix・city のいずれかを指定してください")
+    
     def _register_routes(self) -> None:
         """ルート登録"""
         
@@ -145,6 +243,11 @@ class WeatherWebApp:
                 flash(error_msg, 'error')
                 self.logger.error(f"API応答エラー: {e}")
                 
+            except RateLimitExceededError as e:
+                error_msg = "アクセスが集中しています。しばらく時間をおいて再試行してください。"
+                flash(error_msg, 'error')
+                self.logger.warning(f"レート制限: {e}")
+                
             except WeatherAPIError as e:
                 error_msg = f"天気情報の取得でエラーが発生しました: {e}"
                 flash(error_msg, 'error')
@@ -169,10 +272,7 @@ class WeatherWebApp:
                 
                 weather_data = self.weather_client.get_current_weather(city_name)
                 
-                return jsonify({
-                    'status': 'success',
-                    'data': weather_data.to_dict()
-                })
+                return self._weather_response(weather_data)
                 
             except CityNotFoundError as e:
                 return jsonify({
@@ -203,6 +303,16 @@ class WeatherWebApp:
                     'status_code': e.status_code
                 }), 502
                 
+            except RateLimitExceededError as e:
+                response = jsonify({
+                    'error': 'API呼び出しのレート制限に達しました',
+                    'status': 'error',
+                    'error_type': 'rate_limited'
+                })
+                if e.retry_after is not None:
+                    response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+                return response, 429
+                
             except Exception as e:
                 self.logger.exception(f"API endpoint error: {e}")
                 return jsonify({
@@ -211,6 +321,122 @@ class WeatherWebApp:
                     'error_type': 'unexpected_error'
                 }), 500
         
+        @self.flask_app.route('/api/weather/coords')
+        def api_weather_by_coords():
+            """座標から天気情報API（JSON形式）"""
+            lat = request.args.get('lat', type=float)
+            lon = request.args.get('lon', type=float)
+            if lat is None or lon is None:
+                return jsonify({
+                    'error': 'lat と lon を数値で指定してください',
+                    'status': 'error',
+                    'error_type': 'invalid_request'
+                }), 400
+            
+            if not self.weather_client:
+                return jsonify({
+                    'error': 'APIクライアントが初期化されていません',
+                    'status': 'error'
+                }), 500
+            
+            try:
+                weather_data = self.weather_client.get_current_weather_by_coords(lat, lon)
+            except ValueError as e:
+                return jsonify({'error': str(e), 'status': 'error', 'error_type': 'invalid_request'}), 400
+            except CityNotFoundError:
+                return jsonify({
+                    'error': f'座標 ({lat}, {lon}) の地点が見つかりません',
+                    'status': 'error',
+                    'error_type': 'city_not_found'
+                }), 404
+            except APIKeyError:
+                return jsonify({
+                    'error': 'APIキーが無効です',
+                    'status': 'error',
+                    'error_type': 'api_key_error'
+                }), 401
+            except APIConnectionError:
+                return jsonify({
+                    'error': '天気情報サーバーに接続できません',
+                    'status': 'error',
+                    'error_type': 'connection_error'
+                }), 503
+            except RateLimitExceededError as e:
+                response = jsonify({
+                    'error': 'API呼び出しのレート制限に達しました',
+                    'status': 'error',
+                    'error_type': 'rate_limited'
+                })
+                if e.retry_after is not None:
+                    response.headers['Retry-After'] = str(math.ceil(e.retry_after))
+                return response, 429
+            except WeatherAPIError as e:
+                return jsonify({
+                    'error': f'API応答エラー: {e}',
+                    'status': 'error',
+                    'error_type': 'api_response_error'
+                }), 502
+            
+            return self._weather_response(weather_data)
+        
+        @self.flask_app.route('/api/cache/stats')
+        def api_cache_stats():
+            """キャッシュの統計情報（要認証。人気キーに座標検索の格子点＝利用者のおおよその位置が含まれる）"""
+            error = self._check_admin_token()
+            if error is not None:
+                return error
+            if not self.weather_client:
+                return jsonify({
+                    'error': 'APIクライアントが初期化されていません',
+                    'status': 'error'
+                }), 500
+            
+            limit = request.args.get('limit', 10, type=int)
+            return jsonify({
+                'status': 'success',
+                'data': self.weather_client.get_cache_stats(hot_keys=max(0, min(limit, 100)))
+            })
+        
+        @self.flask_app.route('/api/cache/purge', methods=['POST'])
+        def api_cache_purge():
+            """キャッシュの削除（要認証）"""
+            error = self._check_admin_token()
+            if error is not None:
+                return error
+            if not self.weather_client:
+                return jsonify({
+                    'error': 'APIクライアントが初期化されていません',
+                    'status': 'error'
+                }), 500
+            
+            try:
+                pattern, prefix = self._cache_target()
+                purged = self.weather_client.purge_cache(pattern, prefix=prefix)
+            except ValueError as e:
+                return jsonify({'error': str(e), 'status': 'error', 'error_type': 'invalid_request'}), 400
+            
+            return jsonify({'status': 'success', 'purged': purged})
+        
+        @self.flask_app.route('/api/cache/refresh', methods=['POST'])
+        def api_cache_refresh():
+            """キャッシュの再取得（要認証）"""
+            error = self._check_admin_token()
+            if error is not None:
+                return error
+            if not self.weather_client:
+                return jsonify({
+                    'error': 'APIクライアントが初期化されていません',
+                    'status': 'error'
+                }), 500
+            
+            try:
+                pattern, prefix = self._cache_target()
+                results = self.weather_client.refresh_cache(pattern, prefix=prefix)
+            except ValueError as e:
+                return jsonify({'error': str(e), 'status': 'error', 'error_type': 'invalid_request'}), 400
+            
+            return jsonify({'status': 'success', 'refreshed': results})
+        
         @self.flask_app.route('/api-test')
         def api_test():
             """API テストページ"""
@@ -223,23 +449,53 @@ class WeatherWebApp:
                 # APIクライアント状態確認
                 client_status = "OK" if self.weather_client else "ERROR"
                 
+                # サーキットブレーカー状態
+                breaker = getattr(self.weather_client, 'circuit_breaker', None)
+                if isinstance(breaker, CircuitBreaker):
+                    breaker_status = breaker.state
+                else:
+                    breaker_status = "N/A"
+                
                 # APIキー検証（軽量テスト）
                 api_key_status = "OK"
-                if self.weather_client:
+                if not self.weather_client:
+                    api_key_status = "N/A"
+                elif breaker_status == CircuitBreaker.OPEN:
+                    # 障害中の上流へは問い合わせない
+                    api_key_status = "UNKNOWN"
+                else:
                     try:
                         # 軽量なAPIキー検証
                         self.weather_client.validate_api_key()
                     except:
                         api_key_status = "ERROR"
+                
+                # キャッシュのウォームアップ結果（全都市がキャッシュ済みなら OK）
+                if self.warmup_thread is not None and self.warmup_thread.is_alive():
+                    warmup_status = "IN_PROGRESS"
+                elif self.warmup_results is None:
+                    warmup_status = "N/A"
+                elif all(status in (CacheWarmer.WARMED, CacheWarmer.CACHED)
+                         for status in self.warmup_results.values()):
+                    warmup_status = "OK"
                 else:
-                    api_key_status = "N/A"
+                    warmup_status = "PARTIAL"
+                
+                if client_status != "OK" or api_key_status in ("ERROR", "N/A"):
+                    status = 'unhealthy'
+                elif breaker_status in (CircuitBreaker.OPEN, CircuitBreaker.HALF_OPEN):
+                    status = 'degraded'
+                else:
+                    status = 'healthy'
                 
                 return jsonify({
-                    'status': 'healthy' if client_status == "OK" and api_key_status == "OK" else 'unhealthy',
+                    'status': status,
                     'timestamp': datetime.now().isoformat(),
                     'components': {
                         'weather_client': client_status,
-                        'api_key': api_key_status
+                        'api_key': api_key_status,
+                        'circuit_breaker': breaker_status,
+                        'cache_warmup': warmup_status
                     }
                 })
                 
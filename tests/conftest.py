@@ -144,8 +144,8 @@ def mock_env_vars():
 
 @pytest.fixture
 def mock_requests_get():
-    """requests.getをモック化"""
-    with patch('requests.get') as mock_get:
+    """HTTPセッションのgetをモック化"""
+    with patch('requests.Session.get') as mock_get:
         yield mock_get
 
 
@@ -0,0 +1,351 @@
+"""
+AsyncWeatherAPIクラス（async_weather_api.py）の単体テスト
+"""
+
+import asyncio
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import patch
+from urllib.parse import urlparse
+
+from src.async_weather_api import AiohttpTransport, AsyncWeatherAPI
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
+from src.models import WeatherData
+from src.exceptions import (
+    APIResponseError, CityNotFoundError, RateLimitExceededError, WeatherAPIError
+)
+
+
+async def _collect(async_iter):
+    """非同期イテレータの結果をリストに集める"""
+    return [item async for item in async_iter]
+
+
+class TestAsyncWeatherAPIGetCurrentWeather:
+    """get_current_weather コルーチンのテスト（aiohttp 未インストール時の経路）"""
+
+    @pytest.fixture(autouse=True)
+    def without_aiohttp(self):
+        """aiohttp が無い環境を再現し、同期クライアント経由で実行する"""
+        with patch('src.async_weather_api.aiohttp', None):
+            yield
+
+    @pytest.mark.unit
+    def test_get_current_weather_success(self, test_config_file, mock_env_vars,
+                                         mock_successful_api_response, suppress_logging):
+        """正常な非同期天気情報取得テスト"""
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await api.get_current_weather("Tokyo")
+
+        weather_data = asyncio.run(run())
+
+        assert isinstance(weather_data, WeatherData)
+        assert weather_data.city_name == "Tokyo"
+        assert weather_data.temperature == 25.5
+
+    @pytest.mark.unit
+    def test_get_current_weather_city_not_found(self, test_config_file, mock_env_vars,
+                                                mock_404_api_response, suppress_logging):
+        """同期版と同じ例外が送出されることを確認"""
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await api.get_current_weather("NonexistentCity")
+
+        with pytest.raises(CityNotFoundError) as exc_info:
+            asyncio.run(run())
+
+        assert exc_info.value.city_name == "NonexistentCity"
+
+
+class _StubResponse:
+    """aiohttp.ClientResponse の代わり"""
+
+    def __init__(self, status, headers, body):
+        self.status = status
+        self.headers = headers
+        self._body = body
+
+    async def read(self):
+        return self._body
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        return None
+
+
+class _StubSession:
+    """aiohttp.ClientSession の代わり（FakeOpenWeatherMap または固定の本文で応答）"""
+
+    def __init__(self, server, body=None):
+        self.server = server
+        self.body = body
+        self.closed = False
+
+    def get(self, url, params=None, timeout=None):
+        if self.body is not None:
+            self.server.request_count += 1
+            return _StubResponse(200, {}, self.body)
+        query = {key: str(value) for key, value in (params or {}).items()}
+        return _StubResponse(*self.server.handle(urlparse(url).path, query))
+
+    async def close(self):
+        self.closed = True
+
+
+def _stub_aiohttp(server, body=None):
+    """FakeOpenWeatherMap に接続するスタブの aiohttp モジュールを作成"""
+    class ClientError(Exception):
+        pass
+
+    class ClientConnectionError(ClientError):
+        pass
+
+    return SimpleNamespace(
+        ClientTimeout=lambda total=None: total,
+        TCPConnector=lambda limit_per_host=0: None,
+        ClientSession=lambda connector=None: _StubSession(server, body),
+        ClientError=ClientError,
+        ClientConnectionError=ClientConnectionError,
+    )
+
+
+class TestAsyncWeatherAPIAiohttp:
+    """aiohttp 経由の get_current_weather のテスト（同期版と同じキャッシュ・制御を通ること）"""
+
+    @pytest.fixture
+    def aiohttp_config_file(self, tmp_path):
+        """キャッシュとレート制限を有効にした設定ファイル"""
+        config_file = tmp_path / "aiohttp_config.yaml"
+        config_file.write_text("""
+api:
+  base_url: "https://api.openweathermap.org/data/2.5/"
+  timeout: 10
+  retry:
+    max_attempts: 1
+  rate_limit:
+    calls_per_minute: 1
+    burst: 2
+    mode: "reject"
+
+cache:
+  ttl: 600
+  negative:
+    ttl: 300
+
+logging:
+  level: "ERROR"
+""".strip())
+        return str(config_file)
+
+    @pytest.fixture
+    def isolated_api_key(self):
+        """共有レートリミッターが他のテストと混ざらないようにAPIキーを分ける"""
+        with patch.dict('os.environ', {'OPENWEATHER_API_KEY': f'aiohttp_test_key_{id(self)}'}):
+            yield
+
+    def _run(self, config_file, server, coro_factory, body=None):
+        with patch('src.async_weather_api.aiohttp', _stub_aiohttp(server, body)):
+            async def run():
+                async with AsyncWeatherAPI(config_file) as api:
+                    assert isinstance(api.sync_client.transport, AiohttpTransport)
+                    return await coro_factory(api)
+
+            return asyncio.run(run())
+
+    @pytest.mark.unit
+    def test_uses_cache(self, aiohttp_config_file, isolated_api_key, suppress_logging):
+        """2回目の取得はキャッシュから返し、上流へ送信しない"""
+        server = FakeOpenWeatherMap()
+
+        async def fetch_twice(api):
+            first = await api.get_current_weather("Tokyo")
+            second = await api.get_current_weather("Tokyo")
+            return first, second
+
+        first, second = self._run(aiohttp_config_file, server, fetch_twice)
+
+        assert first.city_name == second.city_name
+        assert first.temperature == second.temperature
+        assert server.request_count == 1
+
+    @pytest.mark.unit
+    def test_not_found_uses_negative_cache(self, aiohttp_config_file, isolated_api_key,
+                                          suppress_logging):
+        """見つからない都市はネガティブキャッシュに入り、2回目は送信しない"""
+        server = FakeOpenWeatherMap(not_found=["Atlantis"])
+
+        async def fetch_twice(api):
+            for _ in range(2):
+                with pytest.raises(CityNotFoundError):
+                    await api.get_current_weather("Atlantis")
+
+        self._run(aiohttp_config_file, server, fetch_twice)
+
+        assert server.request_count == 1
+
+    @pytest.mark.unit
+    def test_invalid_json_raises_api_response_error(self, aiohttp_config_file, isolated_api_key,
+                                                    suppress_logging):
+        """JSONとして解釈できない応答は APIResponseError になる"""
+        server = FakeOpenWeatherMap()
+
+        async def fetch(api):
+            return await api.get_current_weather("Tokyo")
+
+        with pytest.raises(APIResponseError):
+            self._run(aiohttp_config_file, server, fetch, body=b"<html>oops</html>")
+
+    @pytest.mark.unit
+    def test_shares_rate_limiter(self, aiohttp_config_file, isolated_api_key, suppress_logging):
+        """同期版と同じレートリミッターで送信回数が制限される"""
+        server = FakeOpenWeatherMap()
+
+        async def fetch_three(api):
+            results = []
+            for city in ("Tokyo", "Osaka", "London"):
+                try:
+                    results.append(await api.get_current_weather(city))
+                except RateLimitExceededError as e:
+                    results.append(e)
+            return results
+
+        results = self._run(aiohttp_config_file, server, fetch_three)
+
+        assert [isinstance(r, WeatherData) for r in results] == [True, True, False]
+        assert server.request_count == 2
+
+    @pytest.mark.unit
+    def test_close_closes_session(self, aiohttp_config_file, isolated_api_key, suppress_logging):
+        """close() で aiohttp セッションを閉じる"""
+        server = FakeOpenWeatherMap()
+
+        async def fetch(api):
+            await api.get_current_weather("Tokyo")
+            return api.transport._session
+
+        with patch('src.async_weather_api.aiohttp', _stub_aiohttp(server)):
+            async def run():
+                api = AsyncWeatherAPI(aiohttp_config_file)
+                session = await fetch(api)
+                await api.close()
+                return session
+
+            session = asyncio.run(run())
+
+        assert session.closed
+
+
+class TestAsyncWeatherAPIFetchMany:
+    """fetch_many コルーチンのテスト"""
+
+    @pytest.mark.unit
+    def test_fetch_many_returns_all_results(self, test_config_file, mock_env_vars,
+                                            sample_weather_data, suppress_logging):
+        """全都市の結果が返り、失敗は例外オブジェクトで返ることを確認"""
+        async def fake_get(self, city_name, lang=None):
+            if city_name == "Nowhere":
+                raise CityNotFoundError(city_name)
+            return sample_weather_data
+
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await _collect(api.fetch_many(["Tokyo", "Nowhere", "Osaka"], concurrency=2))
+
+        with patch.object(AsyncWeatherAPI, 'get_current_weather', fake_get):
+            results = dict(asyncio.run(run()))
+
+        assert set(results) == {"Tokyo", "Nowhere", "Osaka"}
+        assert results["Tokyo"] is sample_weather_data
+        assert isinstance(results["Nowhere"], CityNotFoundError)
+        assert isinstance(results["Nowhere"], WeatherAPIError)
+
+    @pytest.mark.unit
+    def test_fetch_many_streams_in_completion_order(self, test_config_file, mock_env_vars,
+                                                    sample_weather_data, suppress_logging):
+        """完了した順に結果が返ることを確認"""
+        delays = {"Slow": 0.05, "Fast": 0.0}
+
+        async def fake_get(self, city_name, lang=None):
+            await asyncio.sleep(delays[city_name])
+            return sample_weather_data
+
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await _collect(api.fetch_many(["Slow", "Fast"], concurrency=2))
+
+        with patch.object(AsyncWeatherAPI, 'get_current_weather', fake_get):
+            results = asyncio.run(run())
+
+        assert [city for city, _ in results] == ["Fast", "Slow"]
+
+    @pytest.mark.unit
+    def test_fetch_many_respects_concurrency(self, test_config_file, mock_env_vars,
+                                             sample_weather_data, suppress_logging):
+        """同時実行数が concurrency を超えないことを確認"""
+        state = {'active': 0, 'peak': 0}
+
+        async def fake_get(self, city_name, lang=None):
+            state['active'] += 1
+            state['peak'] = max(state['peak'], state['active'])
+            await asyncio.sleep(0.01)
+            state['active'] -= 1
+            return sample_weather_data
+
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await _collect(api.fetch_many([f"City{i}" for i in range(10)], concurrency=3))
+
+        with patch.object(AsyncWeatherAPI, 'get_current_weather', fake_get):
+            results = asyncio.run(run())
+
+        assert len(results) == 10
+        assert state['peak'] == 3
+
+    @pytest.mark.unit
+    def test_fetch_many_not_capped_by_default_executor(self, test_config_file, mock_env_vars,
+                                                       suppress_logging):
+        """同時実行数がイベントループ既定のスレッドプールの上限（CPU数+4）で頭打ちにならないことを確認"""
+        latency = 0.2
+        cities = [f"City{i}" for i in range(100)]
+        state = {'active': 0, 'peak': 0}
+        lock = threading.Lock()
+
+        class SlowTransport(InProcessTransport):
+            def get(self, url, params, timeout):
+                with lock:
+                    state['active'] += 1
+                    state['peak'] = max(state['peak'], state['active'])
+                time.sleep(latency)
+                with lock:
+                    state['active'] -= 1
+                return super().get(url, params, timeout)
+
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                api.sync_client.transport = SlowTransport(FakeOpenWeatherMap())
+                started = time.perf_counter()
+                results = await _collect(api.fetch_many(cities, concurrency=len(cities)))
+                return results, time.perf_counter() - started
+
+        with patch('src.async_weather_api.aiohttp', None):
+            results, elapsed = asyncio.run(run())
+
+        assert len(results) == len(cities)
+        assert all(isinstance(weather, WeatherData) for _, weather in results)
+        assert state['peak'] == len(cities)
+        assert elapsed < latency * 3
+
+    @pytest.mark.unit
+    def test_fetch_many_invalid_concurrency(self, test_config_file, mock_env_vars, suppress_logging):
+        """concurrency が1未満の場合は ValueError"""
+        async def run():
+            async with AsyncWeatherAPI(test_config_file) as api:
+                return await _collect(api.fetch_many(["Tokyo"], concurrency=0))
+
+        with pytest.raises(ValueError):
+            asyncio.run(run())
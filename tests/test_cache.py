@@ -0,0 +1,546 @@
+"""
+天気データキャッシュ（cache.py）の単体テスト
+"""
+
+import threading
+import pytest
+from dataclasses import fields
+import requests
+
+from src.cache import TTLCache, HitCounter, estimate_size, format_key
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
+from src.models import STALE_REVALIDATING, STALE_UPSTREAM_ERROR
+from src.weather_api import WeatherAPI
+from src.exceptions import CityNotFoundError, APIConnectionError
+
+
+@pytest.fixture
+def clock(mocker):
+    """time.monotonic を手動で進められる時計"""
+    now = [1000.0]
+    mocker.patch('src.cache.time.monotonic', side_effect=lambda: now[0])
+    return now
+
+
+class TestTTLCache:
+    """TTLCacheクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_get_and_set(self):
+        """格納した値を取得できることを確認"""
+        cache = TTLCache()
+        cache.set('Tokyo', 'sunny')
+
+        assert cache.get('Tokyo') == 'sunny'
+        assert cache.get('Osaka') is None
+        assert cache.stats()['hits'] == 1
+        assert cache.stats()['misses'] == 1
+
+    @pytest.mark.unit
+    def test_entry_expires_after_ttl(self, clock):
+        """TTL経過後は取得できないことを確認"""
+        cache = TTLCache(ttl=60)
+        cache.set('Tokyo', 'sunny')
+
+        clock[0] += 59
+        assert cache.get('Tokyo') == 'sunny'
+        clock[0] += 1
+        assert cache.get('Tokyo') is None
+        assert cache.stats()['expirations'] == 1
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_per_entry_ttl(self, clock):
+        """エントリごとのTTLが優先されることを確認"""
+        cache = TTLCache(ttl=60)
+        cache.set('Tokyo', 'sunny', ttl=10)
+
+        clock[0] += 10
+        assert cache.get('Tokyo') is None
+
+    @pytest.mark.unit
+    def test_lru_eviction_by_entries(self):
+        """エントリ数の上限を超えると最も使われていないものが削除されることを確認"""
+        cache = TTLCache(max_entries=2)
+        cache.set('Tokyo', 1)
+        cache.set('Osaka', 2)
+        cache.get('Tokyo')
+        cache.set('London', 3)
+
+        assert 'Osaka' not in cache
+        assert 'Tokyo' in cache
+        assert 'London' in cache
+        assert cache.stats()['evictions'] == 1
+
+    @pytest.mark.unit
+    def test_lru_eviction_by_bytes(self):
+        """概算サイズの上限を超えると古いものから削除されることを確認"""
+        value_size = estimate_size('x' * 100)
+        cache = TTLCache(max_bytes=value_size * 2)
+        cache.set('a', 'x' * 100)
+        cache.set('b', 'y' * 100)
+        cache.set('c', 'z' * 100)
+
+        assert 'a' not in cache
+        assert len(cache) == 2
+        assert cache.stats()['bytes'] <= value_size * 2
+
+    @pytest.mark.unit
+    def test_oversized_value_not_stored(self):
+        """上限より大きい値は格納しないことを確認"""
+        cache = TTLCache(max_bytes=10)
+        cache.set('Tokyo', 'x' * 100)
+
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_overwrite_updates_size(self):
+        """同じキーへの上書きでサイズが二重計上されないことを確認"""
+        cache = TTLCache()
+        cache.set('Tokyo', 'x' * 100)
+        cache.set('Tokyo', 'x' * 100)
+
+        assert cache.stats()['bytes'] == estimate_size('x' * 100)
+
+    @pytest.mark.unit
+    def test_delete_and_clear(self):
+        """削除と全削除を確認"""
+        cache = TTLCache()
+        cache.set('Tokyo', 1)
+        cache.set('Osaka', 2)
+
+        assert cache.delete('Tokyo') is True
+        assert cache.delete('Tokyo') is False
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.stats()['bytes'] == 0
+
+    @pytest.mark.unit
+    def test_estimate_size_weather_data(self, sample_weather_data):
+        """WeatherData のサイズが属性を含めて計算されることを確認"""
+        attributes = sum(estimate_size(getattr(sample_weather_data, field.name))
+                         for field in fields(sample_weather_data))
+
+        assert estimate_size(sample_weather_data) > attributes
+
+    @pytest.mark.unit
+    def test_thread_safety(self):
+        """複数スレッドから同時に操作しても上限が守られることを確認"""
+        cache = TTLCache(max_entries=50)
+
+        def worker(offset):
+            for i in range(500):
+                cache.set((offset, i % 80), i)
+                cache.get((offset, (i * 7) % 80))
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(cache) == 50
+
+    @pytest.mark.unit
+    def test_from_config(self):
+        """設定辞書から作成できることを確認"""
+        cache = TTLCache.from_config({'ttl': 300, 'max_entries': 10, 'max_bytes': 2048})
+
+        assert cache.ttl == 300
+        assert cache.max_entries == 10
+        assert cache.max_bytes == 2048
+        assert TTLCache.from_config(None) is None
+        assert TTLCache.from_config({'enabled': False}) is None
+
+
+class TestWeatherAPICache:
+    """WeatherAPIのキャッシュ利用のテスト"""
+
+    @pytest.fixture
+    def cached_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  units: \"metric\"\n"
+            "cache:\n"
+            "  ttl: 600\n"
+            "  max_entries: 10\n"
+        )
+        return str(config_file)
+
+    @pytest.mark.unit
+    def test_repeated_lookup_served_from_cache(self, cached_config_file, mock_env_vars, mock_requests_get,
+                                               mock_successful_api_response, suppress_logging):
+        """同じ都市・言語の2回目の取得では通信しないことを確認"""
+        api = WeatherAPI(cached_config_file)
+
+        first = api.get_current_weather("Tokyo")
+        second = api.get_current_weather("Tokyo")
+
+        assert second is first
+        assert mock_requests_get.call_count == 1
+        assert api.get_metrics()['cache']['hits'] == 1
+
+    @pytest.mark.unit
+    def test_cache_key_includes_lang(self, cached_config_file, mock_env_vars, mock_requests_get,
+                                     mock_successful_api_response, suppress_logging):
+        """言語が異なる場合は別のエントリになることを確認"""
+        api = WeatherAPI(cached_config_file)
+
+        api.get_current_weather("Tokyo", lang="ja")
+        api.get_current_weather("Tokyo", lang="en")
+
+        assert mock_requests_get.call_count == 2
+
+    @pytest.mark.unit
+    def test_serialized_json_counted_in_entry_size(self, cached_config_file, mock_env_vars,
+                                                   mock_requests_get, mock_successful_api_response,
+                                                   suppress_logging):
+        """応答用の JSON は格納時に作成し、エントリのサイズに含めることを確認"""
+        api = WeatherAPI(cached_config_file)
+
+        weather_data = api.get_current_weather("Tokyo")
+        size = api.cache.stats()['bytes']
+        body = weather_data.to_json()
+
+        assert weather_data._json is body
+        assert size == estimate_size(weather_data)
+        assert size > estimate_size(body)
+
+    @pytest.mark.unit
+    def test_errors_not_cached(self, cached_config_file, mock_env_vars, mock_requests_get,
+                               mock_404_api_response, suppress_logging):
+        """エラー応答はキャッシュされないことを確認"""
+        api = WeatherAPI(cached_config_file)
+
+        for _ in range(2):
+            with pytest.raises(CityNotFoundError):
+                api.get_current_weather("Atlantis")
+
+        assert mock_requests_get.call_count == 2
+
+    @pytest.mark.unit
+    def test_cache_disabled_without_section(self, test_config_file, mock_env_vars, suppress_logging):
+        """cache セクションが無い場合はキャッシュしないことを確認"""
+        api = WeatherAPI(test_config_file)
+
+        assert api.cache is None
+        assert api.get_metrics()['cache'] is None
+
+
+class TestStaleServing:
+    """stale-while-revalidate・stale-if-error のテスト"""
+
+    @pytest.fixture
+    def stale_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  units: \"metric\"\n"
+            "cache:\n"
+            "  ttl: 600\n"
+            "  stale_while_revalidate: 60\n"
+            "  stale_if_error: 3600\n"
+        )
+        return str(config_file)
+
+    @staticmethod
+    def _wait_for_refresh(api):
+        for thread in list(api._refreshing.values()):
+            thread.join(timeout=5)
+
+    @pytest.mark.unit
+    def test_lookup_states(self, clock):
+        """期限切れ後の経過時間に応じて状態が変わることを確認"""
+        cache = TTLCache(ttl=60, stale_while_revalidate=30, stale_if_error=120)
+        cache.set('Tokyo', 'sunny')
+
+        assert cache.lookup('Tokyo') == ('sunny', TTLCache.FRESH)
+        clock[0] += 70
+        assert cache.lookup('Tokyo') == ('sunny', TTLCache.STALE)
+        assert cache.get('Tokyo') is None
+        clock[0] += 30
+        assert cache.lookup('Tokyo') == (None, TTLCache.MISS)
+        assert cache.get_stale_if_error('Tokyo') == 'sunny'
+        clock[0] += 100
+        assert cache.get_stale_if_error('Tokyo') is None
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_stale_served_while_revalidating(self, stale_config_file, mock_env_vars, mock_requests_get,
+                                              mock_successful_api_response, suppress_logging, clock):
+        """期限切れ直後は古い値を返し、裏で再取得することを確認"""
+        api = WeatherAPI(stale_config_file)
+        api.get_current_weather("Tokyo")
+
+        clock[0] += 610
+        stale = api.get_current_weather("Tokyo")
+        self._wait_for_refresh(api)
+
+        assert stale.is_stale is True
+        assert stale.stale_reason == STALE_REVALIDATING
+        assert mock_requests_get.call_count == 2
+        fresh = api.get_current_weather("Tokyo")
+        assert fresh.is_stale is False
+        assert fresh.stale_reason is None
+        assert mock_requests_get.call_count == 2
+        assert api.get_metrics()['cache']['stale_hits'] == 1
+
+    @pytest.mark.unit
+    def test_cached_value_not_marked(self, stale_config_file, mock_env_vars,
+                                     mock_successful_api_response, suppress_logging, clock):
+        """古い値の印はコピーに付き、キャッシュ内の値は変更されないことを確認"""
+        api = WeatherAPI(stale_config_file)
+        original = api.get_current_weather("Tokyo")
+
+        clock[0] += 610
+        stale = api.get_current_weather("Tokyo")
+        self._wait_for_refresh(api)
+
+        assert stale is not original
+        assert original.is_stale is False
+
+    @pytest.mark.unit
+    def test_stale_if_error(self, stale_config_file, mock_env_vars, mock_requests_get,
+                            mock_successful_api_response, suppress_logging, clock):
+        """上流エラー時に猶予期間内の古い値を返すことを確認"""
+        api = WeatherAPI(stale_config_file)
+        api.get_current_weather("Tokyo")
+
+        mock_requests_get.side_effect = requests.exceptions.ConnectionError("down")
+        clock[0] += 1200
+        weather = api.get_current_weather("Tokyo")
+
+        assert weather.is_stale is True
+        assert weather.stale_reason == STALE_UPSTREAM_ERROR
+        assert weather.city_name == "Tokyo"
+        assert api.get_metrics()['cache']['stale_if_error_hits'] == 1
+
+    @pytest.mark.unit
+    def test_stale_if_error_window_exceeded(self, stale_config_file, mock_env_vars, mock_requests_get,
+                                            mock_successful_api_response, suppress_logging, clock):
+        """猶予期間を過ぎた場合はエラーを送出することを確認"""
+        api = WeatherAPI(stale_config_file)
+        api.get_current_weather("Tokyo")
+
+        mock_requests_get.side_effect = requests.exceptions.ConnectionError("down")
+        clock[0] += 600 + 3600
+
+        with pytest.raises(APIConnectionError):
+            api.get_current_weather("Tokyo")
+
+    @pytest.mark.unit
+    def test_not_found_not_masked(self, stale_config_file, mock_env_vars, mock_requests_get,
+                                  mock_successful_api_response, suppress_logging, clock):
+        """404 は古い値で隠さずにそのまま送出することを確認"""
+        api = WeatherAPI(stale_config_file)
+        api.get_current_weather("Tokyo")
+
+        not_found = mock_requests_get.return_value
+        not_found.status_code = 404
+        clock[0] += 1200
+
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Tokyo")
+
+
+class TestNegativeCache:
+    """見つからなかった都市のキャッシュのテスト"""
+
+    @pytest.fixture
+    def negative_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  units: \"metric\"\n"
+            "cache:\n"
+            "  ttl: 600\n"
+            "  max_entries: 2\n"
+            "  negative:\n"
+            "    ttl: 60\n"
+            "    max_entries: 3\n"
+        )
+        return str(config_file)
+
+    @pytest.mark.unit
+    def test_repeat_miss_short_circuited(self, negative_config_file, mock_env_vars, mock_requests_get,
+                                         mock_404_api_response, suppress_logging):
+        """同じ都市の2回目以降の404は通信せずに返すことを確認"""
+        api = WeatherAPI(negative_config_file)
+
+        for _ in range(3):
+            with pytest.raises(CityNotFoundError) as exc_info:
+                api.get_current_weather("Atlantis")
+
+        assert exc_info.value.city_name == "Atlantis"
+        assert mock_requests_get.call_count == 1
+        assert api.get_metrics()['negative_cache']['hits'] == 2
+
+    @pytest.mark.unit
+    def test_negative_entry_expires(self, negative_config_file, mock_env_vars, mock_requests_get,
+                                    mock_404_api_response, suppress_logging, clock):
+        """ネガティブキャッシュのTTL経過後は再度問い合わせることを確認"""
+        api = WeatherAPI(negative_config_file)
+
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Atlantis")
+        clock[0] += 61
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Atlantis")
+
+        assert mock_requests_get.call_count == 2
+
+    @pytest.mark.unit
+    def test_misses_do_not_evict_positive_entries(self, negative_config_file, mock_env_vars,
+                                                  mock_requests_get, mock_successful_api_response,
+                                                  suppress_logging):
+        """大量の404が正のキャッシュを追い出さないことを確認"""
+        api = WeatherAPI(negative_config_file)
+        api.get_current_weather("Tokyo")
+
+        mock_successful_api_response.status_code = 404
+        for i in range(10):
+            with pytest.raises(CityNotFoundError):
+                api.get_current_weather(f"bot-{i}")
+
+        assert len(api.negative_cache) == 3
+        assert api.get_current_weather("Tokyo").city_name == "Tokyo"
+        assert api.get_metrics()['cache']['evictions'] == 0
+
+    @pytest.mark.unit
+    def test_other_errors_not_negatively_cached(self, negative_config_file, mock_env_vars,
+                                                mock_requests_get, suppress_logging):
+        """404以外のエラーはネガティブキャッシュに入らないことを確認"""
+        mock_requests_get.side_effect = requests.exceptions.ConnectionError("down")
+        api = WeatherAPI(negative_config_file)
+
+        with pytest.raises(APIConnectionError):
+            api.get_current_weather("Tokyo")
+
+        assert len(api.negative_cache) == 0
+
+
+class TestCacheIntrospection:
+    """キャッシュの統計・管理操作のテスト"""
+
+    @pytest.fixture
+    def fake(self):
+        return FakeOpenWeatherMap(seed=1, not_found=["atlantis"])
+
+    @pytest.fixture
+    def api(self, tmp_path, fake, mock_env_vars, suppress_logging):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "cache:\n"
+            "  ttl: 600\n"
+            "  negative:\n"
+            "    ttl: 60\n"
+        )
+        return WeatherAPI(str(config_file), transport=InProcessTransport(fake))
+
+    @pytest.mark.unit
+    def test_format_key(self):
+        """キーを前方一致しやすい文字列に変換することを確認"""
+        assert format_key((('id', 1850144), 'ja', 'metric')) == "id:1850144/ja/metric"
+        assert format_key(('q', 'atlantis')) == "q:atlantis"
+        assert format_key('Tokyo') == "Tokyo"
+
+    @pytest.mark.unit
+    def test_hot_keys(self):
+        """ヒット数の多い順にキーを返すことを確認"""
+        cache = TTLCache()
+        for key, hits in (('Tokyo', 3), ('Osaka', 1), ('London', 2)):
+            cache.set(key, 'sunny')
+            for _ in range(hits):
+                cache.get(key)
+
+        assert cache.hot_keys(2) == [('Tokyo', 3), ('London', 2)]
+
+    @pytest.mark.unit
+    def test_hit_counter_bounded(self):
+        """数えるキーが上限を超えるとヒット数の少ないものを捨てることを確認"""
+        counter = HitCounter(max_keys=4)
+        for _ in range(3):
+            counter.hit('Tokyo')
+        for i in range(10):
+            counter.hit(f"city-{i}")
+
+        assert len(counter._counts) <= 4
+        assert counter.top(1, ['Tokyo']) == [('Tokyo', 3)]
+
+    @pytest.mark.unit
+    def test_cache_stats(self, api):
+        """統計に人気キーとネガティブキャッシュが含まれることを確認"""
+        for _ in range(3):
+            api.get_current_weather("Tokyo")
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Atlantis")
+
+        stats = api.get_cache_stats()
+
+        assert stats['cache']['hits'] == 2
+        assert stats['cache']['bytes'] > 0
+        assert stats['hot_keys'] == [{'key': "id:1850144/ja/metric", 'hits': 2}]
+        assert stats['negative_cache']['entries'] == 1
+
+    @pytest.mark.unit
+    def test_purge_single_key_and_prefix(self, api):
+        """完全一致と前方一致で削除できることを確認"""
+        api.get_current_weather("Tokyo", lang="ja")
+        api.get_current_weather("Tokyo", lang="en")
+        api.get_current_weather("Osaka")
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Atlantis")
+
+        assert api.purge_cache("id:1850144/en/metric") == 1
+        assert api.purge_cache(api.city_key_prefix("東京")) == 0
+        assert api.purge_cache(api.city_key_prefix("東京"), prefix=True) == 1
+        assert api.purge_cache("q:atlantis", prefix=True) == 1
+        assert len(api.cache) == 1
+        assert len(api.negative_cache) == 0
+
+    @pytest.mark.unit
+    def test_purge_city_does_not_match_longer_names(self, api):
+        """都市単位の削除が同じ文字列で始まる別の都市に一致しないことを確認"""
+        api.cache.set((('q', 'york'), 'ja', 'metric'), 'sunny')
+        api.cache.set((('q', 'yorkshire'), 'ja', 'metric'), 'sunny')
+        api.negative_cache.set(('q', 'york'), True)
+        api.negative_cache.set(('q', 'yorkshire'), True)
+
+        assert api.city_key_prefix("York") == "q:york/"
+        assert api.purge_cache(api.city_key_prefix("York"), prefix=True) == 2
+        assert [format_key(key) for key in api.cache.keys()] == ["q:yorkshire/ja/metric"]
+        assert [format_key(key) for key in api.negative_cache.keys()] == ["q:yorkshire"]
+
+    @pytest.mark.unit
+    def test_purge_rejects_empty_prefix(self, api):
+        """空の前方一致で全エントリを削除しないことを確認"""
+        api.get_current_weather("Tokyo")
+
+        with pytest.raises(ValueError):
+            api.purge_cache("", prefix=True)
+        assert len(api.cache) == 1
+
+    @pytest.mark.unit
+    def test_refresh_rejects_empty_prefix(self, api, fake):
+        """空の前方一致で全エントリを再取得しないことを確認"""
+        api.get_current_weather("Tokyo")
+
+        with pytest.raises(ValueError):
+            api.refresh_cache("", prefix=True)
+        assert fake.request_count == 1
+
+    @pytest.mark.unit
+    def test_refresh_prefix(self, api, fake):
+        """前方一致したエントリを上流から再取得することを確認"""
+        api.get_current_weather("Tokyo", lang="ja")
+        api.get_current_weather("Tokyo", lang="en")
+        api.get_current_weather("Osaka")
+
+        results = api.refresh_cache(api.city_key_prefix("Tokyo"), prefix=True)
+
+        assert results == {
+            "id:1850144/ja/metric": 'refreshed',
+            "id:1850144/en/metric": 'refreshed'
+        }
+        assert fake.request_count == 5
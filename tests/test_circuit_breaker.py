@@ -0,0 +1,162 @@
+"""
+サーキットブレーカー（circuit_breaker.py）の単体テスト
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from src.circuit_breaker import CircuitBreaker
+from src.weather_api import WeatherAPI
+from src.exceptions import (
+    CityNotFoundError,
+    APIConnectionError,
+    APIResponseError,
+    RateLimitExceededError,
+    CircuitOpenError
+)
+
+
+def _fail(breaker, error=None):
+    """ブレーカー経由で失敗する呼び出しを行う"""
+    with pytest.raises(type(error or APIConnectionError())):
+        breaker.call(Mock(side_effect=error or APIConnectionError()))
+
+
+def _expire_open(breaker):
+    """OPEN の待機時間を経過させる"""
+    breaker._opened_at -= breaker.open_timeout
+
+
+class TestCircuitBreaker:
+    """CircuitBreakerクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_opens_after_failure_rate_exceeded(self, suppress_logging):
+        """失敗率が閾値以上で OPEN になることを確認"""
+        breaker = CircuitBreaker(failure_rate_threshold=0.5, window_size=4, minimum_calls=4)
+
+        breaker.call(lambda: "ok")
+        breaker.call(lambda: "ok")
+        _fail(breaker)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+        _fail(breaker)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @pytest.mark.unit
+    def test_open_breaker_fails_fast(self, suppress_logging):
+        """OPEN 中は関数を呼ばずに CircuitOpenError となることを確認"""
+        breaker = CircuitBreaker(minimum_calls=1, open_timeout=30)
+        _fail(breaker)
+        func = Mock()
+
+        with pytest.raises(APIConnectionError) as exc_info:
+            breaker.call(func)
+
+        assert isinstance(exc_info.value, CircuitOpenError)
+        assert 0 < exc_info.value.retry_after <= 30
+        func.assert_not_called()
+        assert breaker.stats()['rejected'] == 1
+
+    @pytest.mark.unit
+    def test_half_open_success_closes(self, suppress_logging):
+        """HALF_OPEN の試行が成功すると CLOSED に戻ることを確認"""
+        breaker = CircuitBreaker(minimum_calls=1, open_timeout=30)
+        _fail(breaker)
+        _expire_open(breaker)
+
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        assert breaker.call(lambda: "ok") == "ok"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.unit
+    def test_half_open_failure_reopens(self, suppress_logging):
+        """HALF_OPEN の試行が失敗すると再び OPEN になることを確認"""
+        breaker = CircuitBreaker(minimum_calls=1, open_timeout=30)
+        _fail(breaker)
+        _expire_open(breaker)
+
+        _fail(breaker)
+
+        assert breaker.state == CircuitBreaker.OPEN
+        assert breaker.stats()['opened_count'] == 2
+
+    @pytest.mark.unit
+    def test_half_open_limits_trial_calls(self, suppress_logging):
+        """HALF_OPEN では試行数を超える同時呼び出しを拒否することを確認"""
+        breaker = CircuitBreaker(minimum_calls=1, open_timeout=30, half_open_max_calls=1)
+        _fail(breaker)
+        _expire_open(breaker)
+
+        def trial():
+            # 試行中に別の呼び出しが来た場合
+            with pytest.raises(CircuitOpenError):
+                breaker.call(lambda: "second")
+            return "first"
+
+        assert breaker.call(trial) == "first"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.unit
+    def test_error_classification(self):
+        """上流の障害とそれ以外のエラーの判定を確認"""
+        assert CircuitBreaker.is_failure(APIConnectionError()) is True
+        assert CircuitBreaker.is_failure(APIResponseError(503)) is True
+        assert CircuitBreaker.is_failure(APIResponseError(429)) is True
+        assert CircuitBreaker.is_failure(APIResponseError(400)) is False
+        assert CircuitBreaker.is_failure(CityNotFoundError("Nowhere")) is False
+        assert CircuitBreaker.is_failure(RateLimitExceededError()) is None
+
+    @pytest.mark.unit
+    def test_city_not_found_does_not_open(self, suppress_logging):
+        """都市が見つからないエラーでは OPEN にならないことを確認"""
+        breaker = CircuitBreaker(minimum_calls=1)
+
+        _fail(breaker, CityNotFoundError("Nowhere"))
+
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    @pytest.mark.unit
+    def test_from_config(self):
+        """設定からの作成と無効化を確認"""
+        assert CircuitBreaker.from_config(None) is None
+        assert CircuitBreaker.from_config({'enabled': False}) is None
+
+        breaker = CircuitBreaker.from_config({'open_timeout': 5, 'minimum_calls': 3})
+        assert breaker.open_timeout == 5
+        assert breaker.minimum_calls == 3
+
+
+class TestWeatherAPICircuitBreaker:
+    """WeatherAPIのサーキットブレーカー統合テスト"""
+
+    @pytest.mark.unit
+    def test_open_breaker_skips_network(self, tmp_path, mock_env_vars, mock_requests_get,
+                                        suppress_logging):
+        """OPEN 後は上流へリクエストせずに失敗することを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  circuit_breaker:\n"
+            "    minimum_calls: 2\n"
+            "    window_size: 2\n"
+            "    open_timeout: 30\n"
+        )
+        mock_requests_get.return_value = Mock(status_code=503, headers={})
+        api = WeatherAPI(str(config_file))
+
+        for _ in range(2):
+            with pytest.raises(APIResponseError):
+                api.get_current_weather("Tokyo")
+        with pytest.raises(CircuitOpenError):
+            api.get_current_weather("Tokyo")
+
+        assert mock_requests_get.call_count == 2
+        assert api.get_metrics()['circuit_breaker']['state'] == 'open'
+
+    @pytest.mark.unit
+    def test_breaker_disabled_without_config(self, test_config_file, mock_env_vars, suppress_logging):
+        """circuit_breaker 設定が無い場合は無効であることを確認"""
+        api = WeatherAPI(test_config_file)
+
+        assert api.circuit_breaker is None
@@ -0,0 +1,188 @@
+"""
+都市名の正規化（city_resolver.py）の単体テスト
+"""
+
+import pytest
+
+from src.city_resolver import CityResolver, normalize_query
+from src.exceptions import CityNotFoundError
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
+from src.weather_api import WeatherAPI
+
+
+class TestNormalizeQuery:
+    """normalize_query関数のテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("query", ["Tokyo", "tokyo", "  TOKYO ", "ＴＯＫＹＯ", "Tōkyō"])
+    def test_latin_variants(self, query):
+        """大文字小文字・空白・全角・発音記号の違いを吸収することを確認"""
+        assert normalize_query(query) == ("tokyo", None)
+
+    @pytest.mark.unit
+    def test_kana_variants(self):
+        """カタカナ・半角カナをひらがなに揃え、濁点は残すことを確認"""
+        assert normalize_query("ロンドン") == normalize_query("ﾛﾝﾄﾞﾝ") == ("ろんどん", None)
+
+    @pytest.mark.unit
+    def test_country_suffix(self):
+        """国コードを分離することを確認"""
+        assert normalize_query("New  York, us") == ("new york", "US")
+        assert normalize_query("大阪，ＪＰ") == ("大阪", "JP")
+
+
+class TestCityResolver:
+    """CityResolverクラスのテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("query", ["Tokyo", "東京", "東京都", "とうきょう", "トウキョウ", "Tokyo,JP", "tokyo, jp"])
+    def test_aliases_share_key(self, query):
+        """別名・国コード付きが同じ都市IDのキーになり、英語名で問い合わせることを確認"""
+        city = CityResolver().canonicalize(query)
+
+        assert city.key == ('id', 1850144)
+        assert city.query == "Tokyo"
+        assert city.use_id is False
+
+    @pytest.mark.unit
+    def test_country_mismatch(self):
+        """国コードが異なる同名都市は別の都市として扱うことを確認"""
+        resolver = CityResolver()
+
+        assert resolver.resolve("Paris,FR") == 2988507
+        assert resolver.resolve("Paris,US") is None
+        assert resolver.canonicalize("Paris, US").key == ('q', 'paris,us')
+
+    @pytest.mark.unit
+    def test_unknown_city(self):
+        """未知の都市は正規化した表記をキーにすることを確認"""
+        resolver = CityResolver()
+        a = resolver.canonicalize("  Springfield ")
+        b = resolver.canonicalize("SPRINGFIELD")
+
+        assert a.key == b.key == ('q', 'springfield')
+        assert a.query == "Springfield"
+        assert a.city_id is None
+
+    @pytest.mark.unit
+    def test_learned_city_uses_id(self):
+        """応答から学習した都市は都市IDで問い合わせることを確認"""
+        resolver = CityResolver()
+        resolver.learn("springfield", 4409896, "Springfield", "US")
+
+        city = resolver.canonicalize("Springfield")
+        assert city.key == ('id', 4409896)
+        assert city.use_id is True
+        assert resolver.resolve("Springfield,US") == 4409896
+        assert resolver.resolve("Springfield,GB") is None
+
+    @pytest.mark.unit
+    def test_country_qualified_learning_keeps_seeded_alias(self):
+        """国コード付きの学習結果で国コード無しの別名表の都市が置き換わらないことを確認"""
+        resolver = CityResolver()
+        resolver.learn("Paris,US", 4717560, "Paris", "US")
+        resolver.learn("London,CA", 6058560, "London", "CA")
+
+        assert resolver.resolve("Paris") == 2988507
+        assert resolver.resolve("London") == 2643743
+        assert resolver.canonicalize("Paris").key == ('id', 2988507)
+        assert resolver.resolve("Paris,US") == 4717560
+        assert resolver.resolve("London,CA") == 6058560
+        assert resolver.resolve("Paris,FR") == 2988507
+
+    @pytest.mark.unit
+    def test_country_qualified_learning_not_used_for_bare_name(self):
+        """別名表に無い都市でも国コード付きの学習結果を国コード無しの名前に使わないことを確認"""
+        resolver = CityResolver()
+        resolver.learn("Springfield,US", 4409896, "Springfield", "US")
+
+        assert resolver.resolve("Springfield,US") == 4409896
+        assert resolver.resolve("Springfield") is None
+
+    @pytest.mark.unit
+    def test_learned_names_evicted_lru(self):
+        """学習結果が上限を超えると最も長く使われていないものから削除されることを確認"""
+        resolver = CityResolver(max_learned=2)
+        resolver.learn("Springfield", 4409896)
+        resolver.learn("Shelbyville", 4409897)
+        assert resolver.resolve("Springfield") == 4409896
+
+        resolver.learn("Ogdenville", 4409898)
+
+        assert resolver.resolve("Shelbyville") is None
+        assert resolver.resolve("Springfield") == 4409896
+        assert resolver.resolve("Ogdenville") == 4409898
+        assert resolver.stats()['learned'] == 2
+        assert resolver.stats()['learned_evictions'] == 1
+        assert resolver.resolve("Tokyo") == 1850144
+        with pytest.raises(ValueError):
+            CityResolver(max_learned=0)
+
+    @pytest.mark.unit
+    def test_extra_aliases(self):
+        """設定の別名表を追加できることを確認"""
+        resolver = CityResolver({1850144: ["Edo"], "1234": ["Somewhere"]})
+
+        assert resolver.resolve("edo") == 1850144
+        assert resolver.resolve("SOMEWHERE") == 1234
+
+
+class TestCanonicalizedRequests:
+    """WeatherAPIでの都市名の正規化のテスト"""
+
+    @pytest.fixture
+    def fake(self):
+        return FakeOpenWeatherMap(seed=1)
+
+    @pytest.fixture
+    def api(self, tmp_path, fake, mock_env_vars, suppress_logging):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "cache:\n"
+            "  ttl: 600\n"
+            "  negative:\n"
+            "    ttl: 60\n"
+        )
+        return WeatherAPI(str(config_file), transport=InProcessTransport(fake))
+
+    @pytest.mark.unit
+    def test_aliases_share_cache_entry(self, api, fake):
+        """表記の異なる同じ都市は1回の通信と1つのキャッシュエントリを共有することを確認"""
+        results = [api.get_current_weather(q) for q in ["Tokyo", "東京", " tokyo ", "Tokyo,JP", "ﾄｳｷｮｳ"]]
+
+        assert fake.request_count == 1
+        assert len(api.cache) == 1
+        assert all(weather.city_name == "Tokyo" for weather in results)
+
+    @pytest.mark.unit
+    def test_unknown_city_learned_after_first_fetch(self, api, fake):
+        """未知の都市も初回取得後は表記ゆれを同じエントリにまとめることを確認"""
+        api.get_current_weather("Springfield")
+        api.get_current_weather("springfield")
+        api.get_current_weather("ＳＰＲＩＮＧＦＩＥＬＤ")
+
+        assert fake.request_count == 1
+        assert api.city_resolver.resolve("Springfield") == fake.city_id("Springfield")
+
+    @pytest.mark.unit
+    def test_learned_city_requested_by_id(self, api, fake, mocker):
+        """学習済みの都市はキャッシュ切れ後に id で問い合わせることを確認"""
+        api.get_current_weather("Springfield")
+        api.cache.clear()
+        spy = mocker.spy(fake, 'handle')
+
+        weather = api.get_current_weather("springfield")
+
+        assert spy.call_args[0][1]['id'] == str(fake.city_id("Springfield"))
+        assert 'q' not in spy.call_args[0][1]
+        assert weather.city_name == "Springfield"
+
+    @pytest.mark.unit
+    def test_negative_cache_shared_by_variants(self, api, fake):
+        """見つからない都市のネガティブキャッシュも表記ゆれで共有されることを確認"""
+        fake.not_found = {"atlantis"}
+        for query in ["Atlantis", "ATLANTIS", " atlantis "]:
+            with pytest.raises(CityNotFoundError):
+                api.get_current_weather(query)
+
+        assert fake.request_count == 1
@@ -0,0 +1,287 @@
+"""
+ディスクキャッシュ（disk_cache.py）の単体テスト
+"""
+
+import sqlite3
+import threading
+import pytest
+from unittest.mock import Mock
+
+from src.disk_cache import SQLiteCache
+from src.weather_api import WeatherAPI
+from src.weather_cli import WeatherCLI
+
+
+@pytest.fixture
+def clock(mocker):
+    """time.time を手動で進められる時計"""
+    now = [1_700_000_000.0]
+    mocker.patch('src.disk_cache.time.time', side_effect=lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache_path(tmp_path):
+    return str(tmp_path / "cache" / "weather.sqlite3")
+
+
+class TestSQLiteCache:
+    """SQLiteCacheクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_round_trip(self, cache_path, sample_weather_data):
+        """格納した WeatherData を復元できることを確認"""
+        cache = SQLiteCache(cache_path)
+        cache.set(('Tokyo', 'ja', 'metric'), sample_weather_data)
+
+        restored = cache.get(('Tokyo', 'ja', 'metric'))
+
+        assert restored == sample_weather_data
+        assert cache.get(('Tokyo', 'en', 'metric')) is None
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_wal_mode(self, cache_path):
+        """WALモードで作成されることを確認"""
+        SQLiteCache(cache_path)
+
+        conn = sqlite3.connect(cache_path)
+        assert conn.execute("PRAGMA journal_mode").fetchone()[0] == 'wal'
+        conn.close()
+
+    @pytest.mark.unit
+    def test_shared_between_instances(self, cache_path, sample_weather_data):
+        """同じファイルを開いた別インスタンス（別プロセス相当）と共有されることを確認"""
+        SQLiteCache(cache_path).set('Tokyo', sample_weather_data)
+
+        assert SQLiteCache(cache_path).get('Tokyo') == sample_weather_data
+
+    @pytest.mark.unit
+    def test_ttl_and_stale_if_error(self, cache_path, sample_weather_data, clock):
+        """TTL経過後は取得できず、stale_if_error の範囲内ではエラー時用に取得できることを確認"""
+        cache = SQLiteCache(cache_path, ttl=60, stale_if_error=120)
+        cache.set('Tokyo', sample_weather_data)
+
+        clock[0] += 61
+        assert cache.lookup('Tokyo') == (None, SQLiteCache.MISS)
+        assert cache.get_stale_if_error('Tokyo') == sample_weather_data
+        clock[0] += 120
+        assert cache.get_stale_if_error('Tokyo') is None
+
+    @pytest.mark.unit
+    def test_prune_by_entries(self, cache_path, sample_weather_data, clock):
+        """エントリ数の上限を超えると最終アクセスの古いものから削除されることを確認"""
+        cache = SQLiteCache(cache_path, max_entries=2, touch_interval=1)
+        cache.set('Tokyo', sample_weather_data)
+        clock[0] += 1
+        cache.set('Osaka', sample_weather_data)
+        clock[0] += 1
+        cache.get('Tokyo')
+        clock[0] += 1
+        cache.set('London', sample_weather_data)
+
+        assert 'Osaka' not in cache
+        assert 'Tokyo' in cache
+        assert len(cache) == 2
+        assert cache.stats()['evictions'] == 1
+
+    @pytest.mark.unit
+    def test_access_time_updated_at_most_once_per_interval(self, cache_path, sample_weather_data, clock):
+        """ヒットのたびには最終アクセス時刻を書き込まず、touch_interval 経過後に更新することを確認"""
+        cache = SQLiteCache(cache_path, touch_interval=60)
+        cache.set('Tokyo', sample_weather_data)
+        stored_at = clock[0]
+
+        def accessed_at():
+            conn = sqlite3.connect(cache_path)
+            try:
+                return conn.execute("SELECT accessed_at FROM weather_cache").fetchone()[0]
+            finally:
+                conn.close()
+
+        clock[0] += 30
+        cache.get('Tokyo')
+        assert accessed_at() == stored_at
+        clock[0] += 30
+        cache.get('Tokyo')
+        assert accessed_at() == clock[0]
+
+    @pytest.mark.unit
+    def test_sqlite_errors_treated_as_miss(self, cache_path, sample_weather_data, suppress_logging):
+        """SQLite のエラー（database is locked など）はキャッシュミスとして扱うことを確認"""
+        cache = SQLiteCache(cache_path)
+        cache.set('Tokyo', sample_weather_data)
+        cache._conn.close()
+        cache._conn = Mock(execute=Mock(side_effect=sqlite3.OperationalError("database is locked")))
+
+        assert cache.lookup('Tokyo') == (None, SQLiteCache.MISS)
+        assert cache.get_stale_if_error('Tokyo') is None
+        assert 'Tokyo' not in cache
+        cache.set('Osaka', sample_weather_data)
+        assert cache._errors == 4
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("value", [b"garbage", b"WX\xff\xff" + bytes(64), '{"city_name": "Tokyo"}'])
+    def test_unreadable_record_treated_as_miss(self, cache_path, sample_weather_data, clock,
+                                               value, suppress_logging):
+        """壊れたレコード・新しいバージョンのレコードはキャッシュミスとし、行を削除することを確認"""
+        cache = SQLiteCache(cache_path, stale_if_error=300)
+        cache.set('Tokyo', sample_weather_data)
+        cache.set('Osaka', sample_weather_data)
+        cache._conn.execute("UPDATE weather_cache SET value = ?", (value,))
+
+        assert cache.lookup('Tokyo') == (None, SQLiteCache.MISS)
+        assert 'Tokyo' not in cache.keys()
+        clock[0] += 600
+        assert cache.get_stale_if_error('Osaka') is None
+        assert len(cache) == 0
+        assert cache.stats()['errors'] == 2
+
+    @pytest.mark.unit
+    def test_access_time_update_failure_still_hits(self, cache_path, sample_weather_data,
+                                                   clock, suppress_logging):
+        """最終アクセス時刻の更新に失敗しても読めた値はヒットとして返すことを確認"""
+        cache = SQLiteCache(cache_path, touch_interval=1)
+        cache.set('Tokyo', sample_weather_data)
+        clock[0] += 2
+        conn = cache._conn
+
+        def execute(sql, *args):
+            if sql.startswith("UPDATE"):
+                raise sqlite3.OperationalError("database is locked")
+            return conn.execute(sql, *args)
+
+        cache._conn = Mock(execute=execute)
+
+        assert cache.get('Tokyo') == sample_weather_data
+        assert cache.stats()['hits'] == 1
+
+    @pytest.mark.unit
+    def test_prune_by_bytes(self, cache_path, sample_weather_data, clock):
+        """合計サイズの上限を超えると古いものから削除されることを確認"""
+        cache = SQLiteCache(cache_path)
+        cache.set('probe', sample_weather_data)
+        entry_size = cache.stats()['bytes']
+        cache.clear()
+
+        cache = SQLiteCache(cache_path, max_bytes=entry_size * 2)
+        for city in ('a', 'b', 'c'):
+            clock[0] += 1
+            cache.set(city, sample_weather_data)
+
+        assert 'a' not in cache
+        assert cache.stats()['bytes'] <= entry_size * 2
+
+    @pytest.mark.unit
+    def test_expired_entries_pruned(self, cache_path, sample_weather_data, clock):
+        """保持期間を過ぎたエントリが書き込み時に削除されることを確認"""
+        cache = SQLiteCache(cache_path, ttl=60)
+        cache.set('Tokyo', sample_weather_data)
+
+        clock[0] += 61
+        cache.set('Osaka', sample_weather_data)
+
+        assert len(cache) == 1
+
+    @pytest.mark.unit
+    def test_concurrent_writers(self, cache_path, sample_weather_data):
+        """複数の接続から同時に書き込んでもエラーにならないことを確認"""
+        errors = []
+
+        def worker(n):
+            try:
+                cache = SQLiteCache(cache_path)
+                for i in range(30):
+                    cache.set(f"{n}-{i}", sample_weather_data)
+                    cache.get(f"{n}-{i // 2}")
+                cache.close()
+            except sqlite3.Error as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+        assert len(SQLiteCache(cache_path)) == 120
+
+    @pytest.mark.unit
+    def test_keys_and_hot_keys(self, cache_path, sample_weather_data):
+        """保持中のキーをタプルに戻して列挙し、ヒット数の多い順に返すことを確認"""
+        cache = SQLiteCache(cache_path)
+        cache.set((('id', 1850144), 'ja', 'metric'), sample_weather_data)
+        cache.set((('q', 'springfield'), 'ja', 'metric'), sample_weather_data)
+        cache.get((('q', 'springfield'), 'ja', 'metric'))
+        cache.get((('q', 'springfield'), 'ja', 'metric'))
+
+        assert len(cache.keys()) == 2
+        assert cache.hot_keys(5) == [((('q', 'springfield'), 'ja', 'metric'), 2)]
+        cache.delete((('q', 'springfield'), 'ja', 'metric'))
+        assert cache.hot_keys(5) == []
+
+    @pytest.mark.unit
+    def test_from_config(self, cache_path):
+        """cache セクションのTTLと cache.disk セクションの上限を使うことを確認"""
+        cache = SQLiteCache.from_config({
+            'ttl': 300,
+            'stale_while_revalidate': 60,
+            'stale_if_error': 900,
+            'disk': {'path': cache_path, 'max_entries': 50, 'max_bytes': 4096}
+        })
+
+        assert cache.path == cache_path
+        assert cache.ttl == 300
+        assert cache.stale_while_revalidate == 0
+        assert cache.stale_if_error == 900
+        assert cache.max_entries == 50
+        assert cache.max_bytes == 4096
+
+
+class TestDiskCacheIntegration:
+    """WeatherAPI・CLIからのディスクキャッシュ利用のテスト"""
+
+    @pytest.mark.unit
+    def test_second_client_uses_disk_cache(self, test_config_file, cache_path, mock_env_vars,
+                                           mock_requests_get, mock_successful_api_response,
+                                           suppress_logging):
+        """別のクライアント（別プロセス相当）が通信せずにキャッシュを使うことを確認"""
+        WeatherAPI(test_config_file, cache=SQLiteCache(cache_path)).get_current_weather("Tokyo")
+        weather = WeatherAPI(test_config_file, cache=SQLiteCache(cache_path)).get_current_weather("Tokyo")
+
+        assert weather.city_name == "Tokyo"
+        assert mock_requests_get.call_count == 1
+
+    @pytest.mark.cli
+    def test_cli_disk_cache_flag(self, test_config_file, cache_path, mock_env_vars, suppress_logging):
+        """--disk-cache-path 指定時にディスクキャッシュ付きで初期化されることを確認"""
+        cli = WeatherCLI(test_config_file, disk_cache_path=cache_path)
+
+        assert cli.initialize_client() is True
+        assert isinstance(cli.weather_client.cache, SQLiteCache)
+        assert cli.weather_client.cache.path == cache_path
+
+    @pytest.mark.cli
+    def test_cli_disk_cache_from_config(self, tmp_path, cache_path, mock_env_vars, suppress_logging):
+        """cache.disk.enabled が true の場合に有効になることを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "cache:\n"
+            "  ttl: 600\n"
+            "  disk:\n"
+            "    enabled: true\n"
+            f"    path: \"{cache_path}\"\n"
+        )
+        cli = WeatherCLI(str(config_file))
+
+        assert cli.initialize_client() is True
+        assert isinstance(cli.weather_client.cache, SQLiteCache)
+
+    @pytest.mark.cli
+    def test_cli_without_disk_cache(self, test_config_file, mock_env_vars, suppress_logging):
+        """指定が無い場合はディスクキャッシュを使わないことを確認"""
+        cli = WeatherCLI(test_config_file)
+
+        assert cli.initialize_client() is True
+        assert not isinstance(cli.weather_client.cache, SQLiteCache)
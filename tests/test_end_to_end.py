@@ -216,7 +216,7 @@ class TestEndToEndDataTransformation:
         mock_response.status_code = 200
         mock_response.json.return_value = sample_api_response
         
-        with patch('requests.get', return_value=mock_response):
+        with patch('requests.Session.get', return_value=mock_response):
             # 2. APIクライアントでのデータ取得・変換
             client = create_weather_client(test_config_file)
             weather_data = client.get_current_weather("Tokyo")
@@ -169,6 +169,15 @@ class TestAPIResponseError:
             error = APIResponseError(status_code, description)
             assert error.status_code == status_code
             assert str(error) == description
+    
+    @pytest.mark.unit
+    def test_api_response_error_retry_after(self):
+        """Retry-After 秒数の保持テスト"""
+        assert APIResponseError(500).retry_after is None
+        
+        error = APIResponseError(429, retry_after=30.0)
+        assert error.retry_after == 30.0
+        assert str(error) == "APIエラー (ステータスコード: 429)"
 
 
 class TestExceptionHierarchy:
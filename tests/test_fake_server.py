@@ -0,0 +1,130 @@
+"""
+フェイク OpenWeatherMap サーバー（fake_server.py）の単体テスト
+"""
+
+import json
+import pytest
+import requests
+
+from src.fake_server import FakeOpenWeatherMap, start_fake_server
+
+
+class TestFakeOpenWeatherMap:
+    """FakeOpenWeatherMapクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_weather_response_shape(self, sample_api_response):
+        """/weather の応答が実APIと同じキーを持つことを確認"""
+        status, headers, body = FakeOpenWeatherMap().handle(
+            '/data/2.5/weather', {'q': 'Tokyo', 'units': 'metric', 'lang': 'ja'}
+        )
+        data = json.loads(body)
+
+        assert status == 200
+        assert headers['Content-Type'].startswith('application/json')
+        assert set(sample_api_response) <= set(data)
+        assert data['id'] == 1850144
+        assert data['sys']['country'] == 'JP'
+
+    @pytest.mark.unit
+    def test_deterministic_within_interval(self):
+        """同じ更新間隔内では同じ天気を返すことを確認"""
+        fake = FakeOpenWeatherMap(update_interval=3600)
+
+        first = fake.current_weather('Osaka', 'metric', 'ja')
+        second = fake.current_weather('Osaka', 'metric', 'ja')
+
+        assert first == second
+        assert first['dt'] % 3600 == 0
+
+    @pytest.mark.unit
+    def test_units_conversion(self):
+        """単位系に応じて温度が変換されることを確認"""
+        fake = FakeOpenWeatherMap(update_interval=3600)
+
+        celsius = fake.current_weather('Paris', 'metric')['main']['temp']
+        kelvin = fake.current_weather('Paris', 'standard')['main']['temp']
+        fahrenheit = fake.current_weather('Paris', 'imperial')['main']['temp']
+
+        assert kelvin == pytest.approx(celsius + 273.15, abs=0.02)
+        assert fahrenheit == pytest.approx(celsius * 9 / 5 + 32, abs=0.02)
+
+    @pytest.mark.unit
+    def test_group_endpoint(self):
+        """/group が都市IDごとの天気を返すことを確認"""
+        fake = FakeOpenWeatherMap()
+        unknown_id = fake.city_id('Springfield')
+
+        status, _, body = fake.handle('/data/2.5/group', {'id': f'1850144,2643743,{unknown_id}'})
+        data = json.loads(body)
+
+        assert status == 200
+        assert [entry['name'] for entry in data['list']] == ['Tokyo', 'London', 'Springfield']
+
+    @pytest.mark.unit
+    def test_weather_by_id_and_coords(self):
+        """/weather が id・lat/lon でも応答することを確認"""
+        fake = FakeOpenWeatherMap()
+
+        _, _, by_id = fake.handle('/data/2.5/weather', {'id': '1853909'})
+        _, _, by_coords = fake.handle('/data/2.5/weather', {'lat': '51.5', 'lon': '-0.1'})
+        status, _, _ = fake.handle('/data/2.5/weather', {'id': '42'})
+
+        assert json.loads(by_id)['name'] == 'Osaka'
+        assert json.loads(by_coords)['name'] == 'London'
+        assert status == 404
+
+    @pytest.mark.unit
+    def test_not_found(self):
+        """not_found に指定した都市で 404 を返すことを確認"""
+        status, _, body = FakeOpenWeatherMap(not_found=['Atlantis']).handle(
+            '/data/2.5/weather', {'q': 'atlantis'}
+        )
+
+        assert status == 404
+        assert json.loads(body)['message'] == 'city not found'
+
+    @pytest.mark.unit
+    def test_invalid_api_key(self):
+        """api_keys 指定時に不正なキーで 401 を返すことを確認"""
+        fake = FakeOpenWeatherMap(api_keys=['valid'])
+
+        assert fake.handle('/data/2.5/weather', {'q': 'Tokyo', 'appid': 'bad'})[0] == 401
+        assert fake.handle('/data/2.5/weather', {'q': 'Tokyo', 'appid': 'valid'})[0] == 200
+
+    @pytest.mark.unit
+    def test_error_injection(self):
+        """エラー率・レート制限率に応じて 500 / 429 を返すことを確認"""
+        assert FakeOpenWeatherMap(error_rate=1.0).handle('/data/2.5/weather', {'q': 'Tokyo'})[0] == 500
+
+        status, headers, _ = FakeOpenWeatherMap(rate_limit_rate=1.0, retry_after=7).handle(
+            '/data/2.5/weather', {'q': 'Tokyo'}
+        )
+        assert status == 429
+        assert headers['Retry-After'] == '7'
+
+    @pytest.mark.unit
+    def test_from_config(self):
+        """設定辞書から作成できることを確認"""
+        fake = FakeOpenWeatherMap.from_config({'latency_ms': 20, 'error_rate': 0.1, 'not_found': ['X']})
+
+        assert fake.latency_ms == 20
+        assert fake.error_rate == 0.1
+        assert fake.not_found == {'x'}
+
+
+class TestFakeServerHTTP:
+    """HTTPサーバーとしての動作テスト"""
+
+    @pytest.mark.integration
+    def test_serves_over_http(self):
+        """ローカルのHTTPサーバーとして応答することを確認"""
+        server, base_url = start_fake_server()
+        try:
+            response = requests.get(f"{base_url}weather", params={'q': 'London', 'lang': 'ja'}, timeout=5)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        assert response.status_code == 200
+        assert response.json()['name'] == 'London'
@@ -0,0 +1,276 @@
+"""
+ヘッジリクエスト（hedging.py）の単体テスト
+"""
+
+import threading
+import pytest
+from unittest.mock import Mock
+
+from src.hedging import HedgingPolicy
+from src.rate_limiter import TokenBucketRateLimiter
+from src.weather_api import WeatherAPI
+from src.models import WeatherData
+from src.exceptions import APIConnectionError
+
+
+@pytest.fixture
+def policy():
+    """ヘッジ遅延を短くしたポリシー（ヘッジ率上限なし）"""
+    hedging = HedgingPolicy(initial_delay=0.02, min_delay=0.01, max_hedge_ratio=1.0, max_workers=4)
+    yield hedging
+    hedging.close()
+
+
+def _slow_then_fast():
+    """1回目は遅く、2回目は即座に応答する関数を作成"""
+    release = threading.Event()
+    calls = []
+
+    def func():
+        calls.append(1)
+        if len(calls) == 1:
+            release.wait(timeout=5)
+            return "primary"
+        return "hedge"
+
+    return func, release, calls
+
+
+class TestHedgingPolicy:
+    """HedgingPolicyクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_fast_response_is_not_hedged(self, policy):
+        """遅延内に応答すればヘッジを送信しないことを確認"""
+        func = Mock(return_value="ok")
+
+        assert policy.call(func) == "ok"
+        assert func.call_count == 1
+        assert policy.stats()['hedges_sent'] == 0
+
+    @pytest.mark.unit
+    def test_primary_not_queued_behind_busy_pool(self, policy):
+        """ヘッジ用のスレッドプールが埋まっていても最初のリクエストはすぐに送信することを確認"""
+        release = threading.Event()
+        for _ in range(4):
+            policy._executor.submit(release.wait, 5)
+        try:
+            func = Mock(return_value="ok")
+
+            assert policy.call(func) == "ok"
+            assert func.call_count == 1
+            assert policy.stats()['hedges_sent'] == 0
+        finally:
+            release.set()
+
+    @pytest.mark.unit
+    def test_primary_threads_are_reused(self, policy):
+        """最初のリクエスト用のスレッドを呼び出しごとに作らないことを確認"""
+        threads = set()
+
+        def func():
+            threads.add(threading.current_thread().ident)
+            return "ok"
+
+        for _ in range(20):
+            assert policy.call(func) == "ok"
+
+        assert len(threads) == 1
+
+    @pytest.mark.unit
+    def test_busy_primary_pool_sends_inline(self, suppress_logging):
+        """最初のリクエスト用のプールが埋まっている場合は呼び出し元でヘッジなしに送信することを確認"""
+        hedging = HedgingPolicy(initial_delay=0.01, min_delay=0.01, max_hedge_ratio=1.0,
+                                max_primary_workers=1)
+        started = threading.Event()
+        release = threading.Event()
+
+        def occupy():
+            started.set()
+            return release.wait(5)
+
+        busy = threading.Thread(target=hedging.call, args=(occupy,), kwargs={'allow_hedge': lambda: False})
+        busy.start()
+        try:
+            assert started.wait(5)
+            caller = threading.current_thread().ident
+
+            assert hedging.call(lambda: threading.current_thread().ident) == caller
+            assert hedging.stats()['skipped_busy'] == 1
+        finally:
+            release.set()
+            busy.join(timeout=5)
+            hedging.close()
+
+    @pytest.mark.unit
+    def test_cancelled_hedge_refunds_token(self, suppress_logging):
+        """開始前にキャンセルされたヘッジのトークンを戻すことを確認"""
+        hedging = HedgingPolicy(initial_delay=0.01, min_delay=0.01, max_hedge_ratio=1.0, max_workers=1)
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=2)
+        blocker = threading.Event()
+        hedging._executor.submit(blocker.wait, 5)
+        release = threading.Event()
+        threading.Timer(0.05, release.set).start()
+        try:
+            assert hedging.call(lambda: release.wait(5) and "primary",
+                                allow_hedge=limiter.try_acquire, refund_hedge=limiter.refund) == "primary"
+        finally:
+            blocker.set()
+            hedging.close()
+
+        assert hedging.stats()['hedges_sent'] == 1
+        assert hedging.stats()['hedges_refunded'] == 1
+        assert limiter.stats()['acquired'] == 0
+        assert limiter.available() == pytest.approx(2.0)
+
+    @pytest.mark.unit
+    def test_slow_response_is_hedged(self, policy, suppress_logging):
+        """遅い応答にはヘッジを送信し、先に返った方を採用することを確認"""
+        func, release, calls = _slow_then_fast()
+        try:
+            assert policy.call(func) == "hedge"
+        finally:
+            release.set()
+
+        stats = policy.stats()
+        assert len(calls) == 2
+        assert stats['hedges_sent'] == 1
+        assert stats['hedge_wins'] == 1
+        assert stats['hit_rate'] == 1.0
+
+    @pytest.mark.unit
+    def test_hedge_respects_allow_hedge(self, policy, suppress_logging):
+        """allow_hedge が False の場合はヘッジを送信しないことを確認"""
+        func, release, calls = _slow_then_fast()
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+
+        assert policy.call(func, allow_hedge=lambda: False) == "primary"
+        assert len(calls) == 1
+        assert policy.stats()['skipped_rate_limit'] == 1
+
+    @pytest.mark.unit
+    def test_hedge_ratio_cap(self, suppress_logging):
+        """ヘッジ率の上限を超えてヘッジしないことを確認"""
+        hedging = HedgingPolicy(initial_delay=0.01, min_delay=0.01, max_hedge_ratio=0.0)
+        func, release, calls = _slow_then_fast()
+        timer = threading.Timer(0.05, release.set)
+        timer.start()
+        try:
+            assert hedging.call(func) == "primary"
+        finally:
+            hedging.close()
+
+        assert hedging.stats()['skipped_ratio'] == 1
+
+    @pytest.mark.unit
+    def test_failed_hedge_falls_back_to_primary(self, policy, suppress_logging):
+        """ヘッジが失敗した場合は最初のリクエストの結果を待つことを確認"""
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(timeout=5)
+                return "primary"
+            release.set()
+            raise APIConnectionError()
+
+        assert policy.call(func) == "primary"
+        assert policy.stats()['hedge_wins'] == 0
+
+    @pytest.mark.unit
+    def test_both_fail_raises_primary_error(self, policy, suppress_logging):
+        """両方失敗した場合は最初のリクエストの例外を送出することを確認"""
+        release = threading.Event()
+        calls = []
+
+        def func():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(timeout=5)
+                raise APIConnectionError("primary failed")
+            release.set()
+            raise APIConnectionError("hedge failed")
+
+        with pytest.raises(APIConnectionError) as exc_info:
+            policy.call(func)
+
+        assert "primary failed" in str(exc_info.value)
+
+    @pytest.mark.unit
+    def test_delay_follows_percentile(self):
+        """ヘッジ遅延が応答時間のパーセンタイルに従うことを確認"""
+        hedging = HedgingPolicy(percentile=90, min_samples=10, min_delay=0.0, max_delay=10.0)
+        for i in range(1, 101):
+            hedging.record_latency(i / 100)
+
+        assert hedging.hedge_delay() == pytest.approx(0.90)
+        hedging.close()
+
+    @pytest.mark.unit
+    def test_delay_is_clamped(self):
+        """ヘッジ遅延が上下限に収まることを確認"""
+        hedging = HedgingPolicy(min_samples=1, min_delay=0.1, max_delay=1.0)
+        hedging.record_latency(5.0)
+
+        assert hedging.hedge_delay() == 1.0
+        hedging.close()
+
+    @pytest.mark.unit
+    def test_disabled_by_default(self):
+        """enabled でなければ作成されないことを確認"""
+        assert HedgingPolicy.from_config(None) is None
+        assert HedgingPolicy.from_config({'percentile': 99}) is None
+
+
+class TestWeatherAPIHedging:
+    """WeatherAPIのヘッジ統合テスト"""
+
+    @pytest.mark.unit
+    def test_hedging_enabled_from_config(self, tmp_path, mock_env_vars, mock_requests_get,
+                                       mock_successful_api_response, suppress_logging):
+        """ヘッジ有効時も取得でき、統計が報告されることを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  hedging:\n"
+            "    enabled: true\n"
+            "    initial_delay: 1.0\n"
+        )
+        api = WeatherAPI(str(config_file))
+        try:
+            weather_data = api.get_current_weather("Tokyo")
+        finally:
+            api.close()
+
+        assert isinstance(weather_data, WeatherData)
+        assert api.get_metrics()['hedging']['requests'] == 1
+        assert api.get_metrics()['hedging']['hedges_sent'] == 0
+
+    @pytest.mark.unit
+    def test_hedge_consumes_rate_limit_token(self, test_config_file, mock_env_vars,
+                                             mock_requests_get, sample_api_response,
+                                             suppress_logging):
+        """ヘッジ送信にもレート制限のトークンが必要であることを確認"""
+        release = threading.Event()
+        response = Mock(status_code=200)
+        response.json.return_value = sample_api_response
+
+        def slow_get(*args, **kwargs):
+            threading.Timer(0.05, release.set).start()
+            release.wait(timeout=5)
+            return response
+
+        mock_requests_get.side_effect = slow_get
+        api = WeatherAPI(test_config_file)
+        api.rate_limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=1, mode='reject')
+        api.hedging = HedgingPolicy(initial_delay=0.01, min_delay=0.01, max_hedge_ratio=1.0)
+        try:
+            api.get_current_weather("Tokyo")
+        finally:
+            api.close()
+
+        assert mock_requests_get.call_count == 1
+        assert api.get_metrics()['hedging']['skipped_rate_limit'] == 1
@@ -0,0 +1,112 @@
+"""
+HTTPセッションプール（http_session.py）の単体テスト
+"""
+
+import threading
+import pytest
+
+from src.http_session import SessionPool
+from src.weather_api import WeatherAPI
+
+
+class TestSessionPool:
+    """SessionPoolクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_same_session_within_thread(self):
+        """同一スレッドではセッションが再利用されることを確認"""
+        pool = SessionPool()
+
+        assert pool.get_session() is pool.get_session()
+
+    @pytest.mark.unit
+    def test_sessions_share_adapter_across_threads(self):
+        """スレッドごとにセッションは別だが接続プールは共有されることを確認"""
+        pool = SessionPool(pool_connections=4, pool_maxsize=8)
+        sessions = []
+
+        def worker():
+            sessions.append(pool.get_session())
+
+        threads = [threading.Thread(target=worker) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len({id(s) for s in sessions}) == 3
+        adapters = {id(s.get_adapter('https://api.openweathermap.org/')) for s in sessions}
+        assert len(adapters) == 1
+
+    @pytest.mark.unit
+    def test_pool_size_configuration(self):
+        """プールサイズ設定がアダプタに反映されることを確認"""
+        pool = SessionPool(pool_connections=3, pool_maxsize=7)
+        adapter = pool.get_session().get_adapter('https://api.openweathermap.org/')
+
+        assert adapter._pool_connections == 3
+        assert adapter._pool_maxsize == 7
+
+    @pytest.mark.unit
+    def test_pool_recreated_after_fork(self):
+        """fork検出時に接続プールが作り直されることを確認"""
+        pool = SessionPool()
+        session = pool.get_session()
+
+        # 別プロセスで実行されている状態を再現
+        pool._pid = -1
+
+        assert pool.get_session() is not session
+
+    @pytest.mark.unit
+    def test_pool_recycled_after_keepalive_timeout(self):
+        """keep-alive期限切れ後に接続プールが作り直されることを確認"""
+        pool = SessionPool(keepalive_timeout=30)
+        session = pool.get_session()
+
+        pool._last_used -= 31
+
+        assert pool.get_session() is not session
+
+    @pytest.mark.unit
+    def test_pool_kept_without_keepalive_timeout(self):
+        """keepalive_timeoutがNoneの場合はプールを維持することを確認"""
+        pool = SessionPool(keepalive_timeout=None)
+        session = pool.get_session()
+
+        pool._last_used -= 3600
+
+        assert pool.get_session() is session
+
+
+class TestWeatherAPISessionPool:
+    """WeatherAPIの接続プール利用のテスト"""
+
+    @pytest.mark.unit
+    def test_connections_reused_across_cities(self, test_config_file, mock_env_vars,
+                                               mock_successful_api_response, suppress_logging):
+        """複数都市の取得で同じセッションが使われることを確認"""
+        api = WeatherAPI(test_config_file)
+        session = api.session_pool.get_session()
+
+        api.get_current_weather("Tokyo")
+        api.get_current_weather("Osaka")
+
+        assert api.session_pool.get_session() is session
+
+    @pytest.mark.unit
+    def test_pool_settings_from_config(self, tmp_path, mock_env_vars, suppress_logging):
+        """config.yamlのapiセクションからプール設定を読み込むことを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  pool_connections: 2\n"
+            "  pool_maxsize: 5\n"
+            "  keepalive_timeout: 15\n"
+        )
+
+        api = WeatherAPI(str(config_file))
+
+        assert api.session_pool.pool_connections == 2
+        assert api.session_pool.pool_maxsize == 5
+        assert api.session_pool.keepalive_timeout == 15
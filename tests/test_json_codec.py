@@ -0,0 +1,92 @@
+"""
+JSONエンコード・デコード（json_codec.py）の単体テスト
+"""
+
+import pytest
+from unittest.mock import Mock
+
+from src import json_codec
+from src.transport import TransportResponse
+from src.weather_api import WeatherAPI
+from src.exceptions import APIResponseError
+
+
+BODY = '{"name": "東京", "main": {"temp": 25.5}}'.encode('utf-8')
+
+
+class TestDumps:
+    """dumps関数のテスト"""
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_dumps_round_trip(self, monkeypatch, use_orjson):
+        """UTF-8 のバイト列にエンコードし、loads で元に戻せることを確認"""
+        if not use_orjson:
+            monkeypatch.setattr(json_codec, 'orjson', None)
+        value = {'name': '東京', 'main': {'temp': 25.5}, 'wind': None, 'stale': False}
+
+        body = json_codec.dumps(value)
+
+        assert isinstance(body, bytes)
+        assert '東京'.encode('utf-8') in body
+        assert json_codec.loads(body) == value
+
+
+class TestLoads:
+    """loads関数のテスト"""
+
+    @pytest.mark.unit
+    def test_loads_bytes(self):
+        """UTF-8 のバイト列を解析できることを確認"""
+        assert json_codec.loads(BODY) == {'name': '東京', 'main': {'temp': 25.5}}
+
+    @pytest.mark.unit
+    def test_stdlib_fallback(self, monkeypatch):
+        """orjson が無い場合も標準ライブラリで解析できることを確認"""
+        monkeypatch.setattr(json_codec, 'orjson', None)
+
+        assert json_codec.loads(BODY)['name'] == '東京'
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_invalid_json_raises_value_error(self, monkeypatch, use_orjson):
+        """不正なJSONで ValueError になることを確認"""
+        if not use_orjson:
+            monkeypatch.setattr(json_codec, 'orjson', None)
+
+        with pytest.raises(ValueError):
+            json_codec.loads(b'{"name": ')
+
+
+class TestDecodeResponse:
+    """decode_response関数のテスト"""
+
+    @pytest.mark.unit
+    def test_decodes_content_bytes(self):
+        """本文のバイト列を直接解析し、json() を呼ばないことを確認"""
+        response = Mock(content=BODY)
+
+        assert json_codec.decode_response(response)['name'] == '東京'
+        response.json.assert_not_called()
+
+    @pytest.mark.unit
+    def test_falls_back_to_json_method(self):
+        """本文がバイト列でない場合は json() を使うことを確認"""
+        response = Mock()
+        response.json.return_value = {'name': 'Tokyo'}
+
+        assert json_codec.decode_response(response) == {'name': 'Tokyo'}
+
+
+class TestWeatherAPIDecode:
+    """WeatherAPIの応答デコードのテスト"""
+
+    @pytest.mark.unit
+    def test_invalid_json_is_api_response_error(self, test_config_file, mock_env_vars, suppress_logging):
+        """不正なJSON応答が APIResponseError になることを確認"""
+        transport = Mock()
+        transport.get.return_value = TransportResponse(200, b'<html>maintenance</html>')
+        api = WeatherAPI(test_config_file, transport=transport)
+
+        with pytest.raises(APIResponseError, match="JSON"):
+            api.get_current_weather("Tokyo")
@@ -2,10 +2,12 @@
 モデルクラス（models.py）の単体テスト
 """
 
+import json
 import pytest
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 
-from src.models import WeatherData
+from src.models import WeatherData, observation_time
 
 
 class TestWeatherData:
@@ -56,6 +58,7 @@ class TestWeatherData:
         assert data_dict['wind_speed'] == 3.5
         assert data_dict['wind_direction'] == 180
         assert data_dict['visibility'] == 10000
+        assert data_dict['is_stale'] is False
         
         # timestampがISO形式の文字列になっていることを確認
         assert isinstance(data_dict['timestamp'], str)
@@ -174,4 +177,71 @@ class TestWeatherData:
         
         # 小数点以下の精度が保持されることを確認
         assert weather_data.temperature == 25.123456
-        assert weather_data.feels_like == 26.987654
\ No newline at end of file
+        assert weather_data.feels_like == 26.987654
+    
+    @pytest.mark.unit
+    def test_weather_data_has_no_instance_dict(self, sample_weather_data):
+        """__slots__ によりインスタンスごとの __dict__ を持たないことを確認"""
+        assert not hasattr(sample_weather_data, '__dict__')
+        with pytest.raises(AttributeError):
+            sample_weather_data.extra = 1
+    
+    @pytest.mark.unit
+    def test_weather_data_interns_repeated_strings(self, sample_weather_data):
+        """別々に作成した同じ文字列が1つのオブジェクトに共有されることを確認"""
+        def fresh(value):
+            return value.encode('utf-8').decode('utf-8')
+        
+        other = replace(
+            sample_weather_data,
+            city_name=fresh("Tokyo"),
+            country=fresh("JP"),
+            description=fresh("晴れ"),
+            description_en=fresh("Clear")
+        )
+        
+        assert other == sample_weather_data
+        assert other.city_name is sample_weather_data.city_name
+        assert other.country is sample_weather_data.country
+        assert other.description is sample_weather_data.description
+        assert other.description_en is sample_weather_data.description_en
+    
+    @pytest.mark.unit
+    def test_weather_data_observation_time(self, sample_weather_data):
+        """観測時刻が取得時刻とは別に辞書形式で往復できることを確認"""
+        observed = observation_time(1749095343, 32400)
+        weather_data = replace(sample_weather_data, observed_at=observed)
+        
+        data_dict = weather_data.to_dict()
+        
+        assert observed.utcoffset() == timedelta(hours=9)
+        assert observed == datetime(2025, 6, 5, 3, 49, 3, tzinfo=timezone.utc)
+        assert data_dict['observed_at'] == "2025-06-05T12:49:03+09:00"
+        assert WeatherData.from_dict(data_dict) == weather_data
+        assert observation_time(None, 32400) is None
+    
+    @pytest.mark.unit
+    def test_weather_data_from_dict_without_observation_time(self, sample_weather_data):
+        """観測時刻を持たない以前の辞書からも復元できることを確認"""
+        data_dict = sample_weather_data.to_dict()
+        del data_dict['observed_at']
+        
+        assert WeatherData.from_dict(data_dict).observed_at is None
+    
+    @pytest.mark.unit
+    def test_weather_data_to_json(self, sample_weather_data):
+        """to_json() が to_dict() の JSON を返し、2回目以降は保持したバイト列を返すことを確認"""
+        body = sample_weather_data.to_json()
+        assert json.loads(body) == sample_weather_data.to_dict()
+        assert sample_weather_data.to_json() is body
+        assert "_json" not in repr(sample_weather_data)
+    
+    @pytest.mark.unit
+    def test_weather_data_to_json_not_shared_by_copies(self, sample_weather_data):
+        """replace() で作成したインスタンスは自身の値で JSON を作成することを確認"""
+        sample_weather_data.to_json()
+        stale = replace(sample_weather_data, is_stale=True)
+        assert stale == replace(sample_weather_data, is_stale=True)
+        assert json.loads(stale.to_json())['is_stale'] is True
+        assert json.loads(sample_weather_data.to_json())['is_stale'] is False
+
@@ -0,0 +1,161 @@
+"""
+レートリミッター（rate_limiter.py）の単体テスト
+"""
+
+import pytest
+from unittest.mock import patch
+
+from src.rate_limiter import TokenBucketRateLimiter, get_shared_rate_limiter
+from src.weather_api import WeatherAPI
+from src.exceptions import RateLimitExceededError, WeatherAPIError
+
+
+class TestTokenBucketRateLimiter:
+    """TokenBucketRateLimiterクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_burst_allows_immediate_calls(self):
+        """burst 分は待機なしで取得できることを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=3, mode='reject')
+
+        assert [limiter.acquire() for _ in range(3)] == [0.0, 0.0, 0.0]
+        assert limiter.stats()['acquired'] == 3
+
+    @pytest.mark.unit
+    def test_reject_mode_raises_when_empty(self):
+        """reject モードではトークン切れで即座に例外となることを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=1, mode='reject')
+        limiter.acquire()
+
+        with pytest.raises(RateLimitExceededError) as exc_info:
+            limiter.acquire()
+
+        assert isinstance(exc_info.value, WeatherAPIError)
+        assert 0 < exc_info.value.retry_after <= 1.0
+        assert limiter.stats()['rejected'] == 1
+
+    @pytest.mark.unit
+    def test_wait_mode_sleeps_until_token(self):
+        """wait モードではトークン補充まで待機することを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=1, mode='wait', max_wait=5)
+        limiter.acquire()
+
+        with patch('src.rate_limiter.time.sleep') as mock_sleep:
+            waited = limiter.acquire()
+
+        assert 0 < waited <= 1.0
+        mock_sleep.assert_called_once_with(waited)
+        assert limiter.stats()['waited'] == 1
+
+    @pytest.mark.unit
+    def test_wait_mode_reservations_queue_up(self):
+        """待機中の予約が積み重なり、待機時間が伸びることを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=1, mode='wait', max_wait=5)
+        limiter.acquire()
+
+        with patch('src.rate_limiter.time.sleep'):
+            first = limiter.acquire()
+            second = limiter.acquire()
+
+        assert second > first
+
+    @pytest.mark.unit
+    def test_wait_mode_rejects_beyond_deadline(self):
+        """待機時間が max_wait を超える場合は例外となることを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=6, burst=1, mode='wait', max_wait=2)
+        limiter.acquire()
+
+        with pytest.raises(RateLimitExceededError):
+            limiter.acquire()
+
+    @pytest.mark.unit
+    def test_try_acquire_does_not_wait(self):
+        """try_acquire は待機せずに結果を返すことを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=60, burst=1)
+
+        assert limiter.try_acquire() is True
+        assert limiter.try_acquire() is False
+
+    @pytest.mark.unit
+    def test_try_acquire_keeps_reserve(self):
+        """reserve 分のトークンを残せない場合は取得しないことを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=3, mode='reject')
+
+        assert limiter.try_acquire(reserve=2) is True
+        assert limiter.try_acquire(reserve=2) is False
+        assert limiter.try_acquire() is True
+
+    @pytest.mark.unit
+    def test_prepaid_token_used_by_next_acquire(self):
+        """取得済みのトークンを次の acquire() に充て、使われなければ戻すことを確認"""
+        limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=2, mode='reject')
+
+        assert limiter.try_acquire() is True
+        with limiter.prepaid():
+            limiter.acquire()
+        assert limiter.stats()['acquired'] == 1
+        assert limiter.available() == pytest.approx(1.0, abs=0.01)
+
+        assert limiter.try_acquire() is True
+        with limiter.prepaid():
+            pass
+        assert limiter.stats()['acquired'] == 1
+        assert limiter.available() == pytest.approx(1.0, abs=0.01)
+
+    @pytest.mark.unit
+    def test_invalid_settings(self):
+        """不正な設定値で ValueError となることを確認"""
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(calls_per_minute=0)
+        with pytest.raises(ValueError):
+            TokenBucketRateLimiter(calls_per_minute=60, mode='drop')
+
+
+class TestSharedRateLimiter:
+    """get_shared_rate_limiter 関数のテスト"""
+
+    @pytest.mark.unit
+    def test_same_limiter_for_same_key(self):
+        """同じキー・設定では同じリミッターが返ることを確認"""
+        config = {'calls_per_minute': 30, 'burst': 5}
+
+        first = get_shared_rate_limiter("shared-test-key", config)
+        second = get_shared_rate_limiter("shared-test-key", dict(config))
+
+        assert first is second
+
+    @pytest.mark.unit
+    def test_disabled_without_calls_per_minute(self):
+        """calls_per_minute 未設定の場合は None"""
+        assert get_shared_rate_limiter("any-key", {}) is None
+
+
+class TestWeatherAPIRateLimit:
+    """WeatherAPIのレート制限統合テスト"""
+
+    @pytest.mark.unit
+    def test_rejected_before_network_io(self, test_config_file, mock_env_vars, mock_requests_get,
+                                        mock_successful_api_response, suppress_logging):
+        """レート制限超過時は上流へリクエストしないことを確認"""
+        api = WeatherAPI(test_config_file)
+        # 他のテストと共有されないよう専用のリミッターを使う
+        api.rate_limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=1, mode='reject')
+
+        api.get_current_weather("Tokyo")
+        with pytest.raises(RateLimitExceededError):
+            api.get_current_weather("Osaka")
+
+        assert mock_requests_get.call_count == 1
+        assert api.get_metrics()['rate_limit']['rejected'] == 1
+
+    @pytest.mark.unit
+    def test_limiter_shared_between_clients(self, tmp_path, mock_env_vars, suppress_logging):
+        """同じAPIキーのクライアント間でリミッターが共有されることを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("api:\n  rate_limit:\n    calls_per_minute: 42\n")
+
+        first = WeatherAPI(str(config_file))
+        second = WeatherAPI(str(config_file))
+
+        assert first.rate_limiter is not None
+        assert first.rate_limiter is second.rate_limiter
@@ -0,0 +1,142 @@
+"""
+天気データのバイナリエンコード（record_codec.py）の単体テスト
+"""
+
+import json
+import sqlite3
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from src import record_codec
+from src.models import STALE_REVALIDATING, STALE_UPSTREAM_ERROR
+from src.disk_cache import SQLiteCache
+
+
+class TestRecordCodec:
+    """encode・decode関数のテスト"""
+
+    @pytest.mark.unit
+    def test_round_trip(self, sample_weather_data):
+        """エンコードしたレコードから同じ WeatherData を復元できることを確認"""
+        data = record_codec.encode(sample_weather_data)
+
+        assert record_codec.decode(data) == sample_weather_data
+        assert data[:2] == record_codec.MAGIC
+        assert data[2] == record_codec.VERSION
+
+    @pytest.mark.unit
+    def test_smaller_than_json(self, sample_weather_data):
+        """JSON よりも小さいことを確認"""
+        encoded = record_codec.encode(sample_weather_data)
+        as_json = json.dumps(sample_weather_data.to_dict(), ensure_ascii=False).encode('utf-8')
+
+        assert len(encoded) * 3 < len(as_json)
+
+    @pytest.mark.unit
+    def test_dictionary_and_inline_strings(self, sample_weather_data):
+        """辞書にある文字列はコード、無い文字列はそのまま保存されることを確認"""
+        known = record_codec.encode(sample_weather_data)
+        unknown = replace(sample_weather_data, city_name="Springfield", description="ところにより晴れ")
+        encoded = record_codec.encode(unknown)
+
+        assert len(known) == record_codec.RECORD.size + record_codec.OBSERVED.size + 4 * record_codec.CODE.size
+        assert "ところにより晴れ".encode('utf-8') in encoded
+        assert record_codec.decode(encoded) == unknown
+
+    @pytest.mark.unit
+    def test_optional_fields_and_flags(self, sample_weather_data):
+        """None の項目・is_stale が保たれることを確認"""
+        weather = replace(sample_weather_data, wind_speed=None, wind_direction=None,
+                          visibility=None, is_stale=True)
+
+        restored = record_codec.decode(record_codec.encode(weather))
+
+        assert restored == weather
+        assert restored.visibility is None
+        assert restored.is_stale is True
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("reason", [None, STALE_REVALIDATING, STALE_UPSTREAM_ERROR])
+    def test_stale_reason(self, sample_weather_data, reason):
+        """stale_reason が保たれることを確認"""
+        weather = replace(sample_weather_data, is_stale=reason is not None, stale_reason=reason)
+
+        assert record_codec.decode(record_codec.encode(weather)).stale_reason == reason
+
+    @pytest.mark.unit
+    def test_aware_timestamp(self, sample_weather_data):
+        """タイムゾーン付きの時刻が現地時刻とUTCオフセットごと保たれることを確認"""
+        jst = timezone(timedelta(hours=9))
+        weather = replace(sample_weather_data, timestamp=datetime(2025, 6, 5, 21, 0, 0, 123456, tzinfo=jst))
+
+        restored = record_codec.decode(record_codec.encode(weather))
+
+        assert restored.timestamp == weather.timestamp
+        assert restored.timestamp.utcoffset() == timedelta(hours=9)
+
+    @pytest.mark.unit
+    def test_observation_time(self, sample_weather_data):
+        """観測時刻が都市のUTCオフセットごと保たれることを確認"""
+        observed = datetime(2025, 6, 5, 21, 0, tzinfo=timezone(timedelta(hours=-5)))
+        weather = replace(sample_weather_data, observed_at=observed)
+
+        restored = record_codec.decode(record_codec.encode(weather))
+
+        assert restored.observed_at == observed
+        assert restored.observed_at.utcoffset() == timedelta(hours=-5)
+        assert record_codec.decode(record_codec.encode(sample_weather_data)).observed_at is None
+
+    @pytest.mark.unit
+    def test_reads_version_1_records(self, sample_weather_data):
+        """観測時刻を持たないバージョン1のレコードも読めることを確認"""
+        current = record_codec.encode(sample_weather_data)
+        fixed = bytearray(current[:record_codec.RECORD.size])
+        fixed[2] = 1
+        legacy = bytes(fixed) + current[record_codec.RECORD.size + record_codec.OBSERVED.size:]
+
+        assert record_codec.decode(legacy) == sample_weather_data
+
+    @pytest.mark.unit
+    def test_invalid_records(self, sample_weather_data):
+        """マジック違い・新しいバージョン・途中で切れたレコードで ValueError になることを確認"""
+        data = record_codec.encode(replace(sample_weather_data, city_name="Springfield"))
+
+        with pytest.raises(ValueError):
+            record_codec.decode(b'XX' + data[2:])
+        with pytest.raises(ValueError):
+            record_codec.decode(data[:2] + bytes([record_codec.VERSION + 1]) + data[3:])
+        with pytest.raises(ValueError):
+            record_codec.decode(data[:-3])
+        with pytest.raises(ValueError):
+            record_codec.decode(data[:10])
+
+
+class TestDiskCacheEncoding:
+    """ディスクキャッシュでのバイナリ形式の利用のテスト"""
+
+    @pytest.mark.unit
+    def test_stored_as_binary(self, tmp_path, sample_weather_data):
+        """値がバイナリ形式で保存されることを確認"""
+        path = str(tmp_path / "weather.sqlite3")
+        SQLiteCache(path).set('Tokyo', sample_weather_data)
+
+        conn = sqlite3.connect(path)
+        value, size = conn.execute("SELECT value, size FROM weather_cache").fetchone()
+        conn.close()
+
+        assert value == record_codec.encode(sample_weather_data)
+        assert size == len(value)
+
+    @pytest.mark.unit
+    def test_reads_legacy_json_rows(self, tmp_path, sample_weather_data):
+        """以前の JSON 形式で保存された行も読めることを確認"""
+        path = str(tmp_path / "weather.sqlite3")
+        cache = SQLiteCache(path)
+        cache.set('Tokyo', sample_weather_data)
+        cache._conn.execute(
+            "UPDATE weather_cache SET value = ?",
+            (json.dumps(sample_weather_data.to_dict(), ensure_ascii=False),)
+        )
+
+        assert cache.get('Tokyo') == sample_weather_data
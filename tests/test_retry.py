@@ -0,0 +1,220 @@
+"""
+リトライ制御（retry.py）の単体テスト
+"""
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+
+from src.retry import RetryPolicy, RetryBudget, parse_retry_after
+from src.weather_api import WeatherAPI
+from src.models import WeatherData
+from src.exceptions import (
+    CityNotFoundError,
+    APIConnectionError,
+    APIResponseError
+)
+
+
+@pytest.fixture
+def no_sleep():
+    """リトライ待機をスキップし、待機秒数を記録する"""
+    with patch('src.retry.time.sleep') as mock_sleep:
+        yield mock_sleep
+
+
+class TestParseRetryAfter:
+    """parse_retry_after 関数のテスト"""
+
+    @pytest.mark.unit
+    def test_parse_seconds(self):
+        """秒数形式の解析テスト"""
+        assert parse_retry_after("7") == 7.0
+
+    @pytest.mark.unit
+    def test_parse_http_date(self):
+        """HTTP日付形式の解析テスト"""
+        retry_at = datetime.now(timezone.utc) + timedelta(seconds=30)
+        seconds = parse_retry_after(format_datetime(retry_at, usegmt=True))
+
+        assert 25 <= seconds <= 30
+
+    @pytest.mark.unit
+    def test_parse_invalid_values(self):
+        """解釈できない値は None になることを確認"""
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("") is None
+        assert parse_retry_after("soon") is None
+        assert parse_retry_after(Mock()) is None
+
+
+class TestRetryBudget:
+    """RetryBudgetクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_budget_limits_retries(self):
+        """トークンを使い切るとリトライできないことを確認"""
+        budget = RetryBudget(ratio=0.5, max_tokens=2)
+
+        assert budget.try_withdraw() is True
+        assert budget.try_withdraw() is True
+        assert budget.try_withdraw() is False
+
+        budget.deposit()
+        budget.deposit()
+        assert budget.try_withdraw() is True
+
+    @pytest.mark.unit
+    def test_budget_capped_at_max_tokens(self):
+        """トークンが上限を超えないことを確認"""
+        budget = RetryBudget(ratio=1.0, max_tokens=3)
+        for _ in range(10):
+            budget.deposit()
+
+        assert budget.tokens == 3
+
+
+class TestRetryPolicy:
+    """RetryPolicyクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_retries_until_success(self, no_sleep, suppress_logging):
+        """一時的なエラーの後に成功することを確認"""
+        policy = RetryPolicy(max_attempts=3)
+        func = Mock(side_effect=[APIConnectionError(), APIResponseError(503), "ok"])
+
+        assert policy.call(func, "Tokyo") == "ok"
+        assert func.call_count == 3
+        assert no_sleep.call_count == 2
+        assert policy.stats()['retries'] == 2
+
+    @pytest.mark.unit
+    def test_gives_up_after_max_attempts(self, no_sleep, suppress_logging):
+        """最大試行回数で諦め、最後の例外を送出することを確認"""
+        policy = RetryPolicy(max_attempts=2)
+        func = Mock(side_effect=APIResponseError(500))
+
+        with pytest.raises(APIResponseError):
+            policy.call(func)
+
+        assert func.call_count == 2
+        assert policy.stats()['gave_up'] == 1
+
+    @pytest.mark.unit
+    def test_non_retryable_errors_raise_immediately(self, no_sleep, suppress_logging):
+        """再試行対象外のエラーは即座に送出されることを確認"""
+        policy = RetryPolicy(max_attempts=5)
+
+        for error in (CityNotFoundError("Nowhere"), APIResponseError(400)):
+            func = Mock(side_effect=error)
+            with pytest.raises(type(error)):
+                policy.call(func)
+            assert func.call_count == 1
+
+        no_sleep.assert_not_called()
+
+    @pytest.mark.unit
+    def test_backoff_is_bounded_and_jittered(self):
+        """バックオフが指数的な上限内に収まることを確認"""
+        policy = RetryPolicy(backoff_base=1.0, backoff_max=4.0)
+
+        for attempt, ceiling in [(1, 1.0), (2, 2.0), (3, 4.0), (6, 4.0)]:
+            for _ in range(50):
+                assert 0 <= policy.compute_delay(attempt) <= ceiling
+
+    @pytest.mark.unit
+    def test_retry_after_is_honored(self, no_sleep, suppress_logging):
+        """429 の Retry-After 秒数だけ待機することを確認"""
+        policy = RetryPolicy(max_attempts=2, backoff_base=0.1)
+        func = Mock(side_effect=[APIResponseError(429, retry_after=3.0), "ok"])
+
+        assert policy.call(func) == "ok"
+        assert no_sleep.call_args[0][0] >= 3.0
+
+    @pytest.mark.unit
+    def test_retry_after_over_limit_is_not_retried(self, no_sleep, suppress_logging):
+        """Retry-After が上限を超える場合はリトライしないことを確認"""
+        policy = RetryPolicy(max_attempts=3, max_retry_after=5.0)
+        func = Mock(side_effect=APIResponseError(429, retry_after=60.0))
+
+        with pytest.raises(APIResponseError):
+            policy.call(func)
+
+        assert func.call_count == 1
+
+    @pytest.mark.unit
+    def test_budget_exhaustion_stops_retries(self, no_sleep, suppress_logging):
+        """リトライ予算を使い切るとリトライしないことを確認"""
+        policy = RetryPolicy(max_attempts=3, budget=RetryBudget(ratio=0.0, max_tokens=1))
+        func = Mock(side_effect=APIConnectionError())
+
+        with pytest.raises(APIConnectionError):
+            policy.call(func)
+
+        assert func.call_count == 2
+        assert policy.stats()['budget_exhausted'] == 1
+
+
+class TestWeatherAPIRetry:
+    """WeatherAPIのリトライ統合テスト"""
+
+    @pytest.fixture
+    def retry_config_file(self, tmp_path):
+        """リトライを有効にした設定ファイル"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  base_url: \"https://api.openweathermap.org/data/2.5/\"\n"
+            "  retry:\n"
+            "    max_attempts: 3\n"
+            "    backoff_base: 0.1\n"
+        )
+        return str(config_file)
+
+    @pytest.mark.unit
+    def test_transient_errors_are_retried(self, retry_config_file, mock_env_vars,
+                                          mock_requests_get, sample_api_response,
+                                          no_sleep, suppress_logging):
+        """タイムアウトと503の後に成功することを確認"""
+        unavailable = Mock(status_code=503, headers={})
+        success = Mock(status_code=200)
+        success.json.return_value = sample_api_response
+        mock_requests_get.side_effect = [
+            requests.exceptions.Timeout("timeout"), unavailable, success
+        ]
+
+        api = WeatherAPI(retry_config_file)
+        weather_data = api.get_current_weather("Tokyo")
+
+        assert isinstance(weather_data, WeatherData)
+        assert mock_requests_get.call_count == 3
+        assert api.get_metrics()['retry']['retries'] == 2
+
+    @pytest.mark.unit
+    def test_retry_after_header_is_used(self, retry_config_file, mock_env_vars,
+                                        mock_requests_get, sample_api_response,
+                                        no_sleep, suppress_logging):
+        """429 応答の Retry-After ヘッダーに従うことを確認"""
+        limited = Mock(status_code=429, headers={'Retry-After': '2'})
+        success = Mock(status_code=200)
+        success.json.return_value = sample_api_response
+        mock_requests_get.side_effect = [limited, success]
+
+        api = WeatherAPI(retry_config_file)
+        api.get_current_weather("Tokyo")
+
+        assert no_sleep.call_args[0][0] >= 2.0
+
+    @pytest.mark.unit
+    def test_retry_disabled_by_default(self, test_config_file, mock_env_vars,
+                                       mock_requests_get, no_sleep, suppress_logging):
+        """retry 設定が無い場合はリトライしないことを確認"""
+        mock_requests_get.return_value = Mock(status_code=503, headers={})
+
+        api = WeatherAPI(test_config_file)
+        with pytest.raises(APIResponseError):
+            api.get_current_weather("Tokyo")
+
+        assert mock_requests_get.call_count == 1
@@ -0,0 +1,285 @@
+"""
+ワーカー間共有キャッシュ（shared_cache.py）の単体テスト
+"""
+
+import os
+import sys
+import threading
+import multiprocessing
+import pytest
+
+from src.cache import TTLCache, create_cache
+from src.shared_cache import SEQ, SharedMemoryCache, default_path
+from src.weather_api import WeatherAPI
+
+
+pytestmark = pytest.mark.skipif(sys.platform == 'win32', reason="fcntl が必要")
+
+
+@pytest.fixture
+def clock(mocker):
+    """time.time を手動で進められる時計"""
+    now = [1_700_000_000.0]
+    mocker.patch('src.shared_cache.time.time', side_effect=lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def shared_path(tmp_path):
+    return str(tmp_path / "weather-cache.bin")
+
+
+def _worker_set(path, sample):
+    """別プロセスから書き込む"""
+    SharedMemoryCache(path, slots=64).set(('Tokyo', 'ja', 'metric'), sample)
+
+
+class TestSharedMemoryCache:
+    """SharedMemoryCacheクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_round_trip(self, shared_path, sample_weather_data):
+        """格納した WeatherData を復元できることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set(('Tokyo', 'ja', 'metric'), sample_weather_data)
+
+        assert cache.get(('Tokyo', 'ja', 'metric')) == sample_weather_data
+        assert cache.get(('Tokyo', 'en', 'metric')) is None
+        assert ('Tokyo', 'ja', 'metric') in cache
+
+    @pytest.mark.unit
+    def test_visible_to_other_process(self, shared_path, sample_weather_data):
+        """別プロセスで書き込んだ値を読めることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        ctx = multiprocessing.get_context('fork')
+        process = ctx.Process(target=_worker_set, args=(shared_path, sample_weather_data))
+        process.start()
+        process.join(timeout=10)
+
+        assert process.exitcode == 0
+        assert cache.get(('Tokyo', 'ja', 'metric')) == sample_weather_data
+
+    @pytest.mark.unit
+    def test_overwrite_same_key(self, shared_path, sample_weather_data):
+        """同じキーへの書き込みは同じスロットを上書きすることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set('Tokyo', sample_weather_data)
+        sample_weather_data.temperature = 30.0
+        cache.set('Tokyo', sample_weather_data)
+
+        assert len(cache) == 1
+        assert cache.get('Tokyo').temperature == 30.0
+
+    @pytest.mark.unit
+    def test_ttl_and_stale_states(self, shared_path, sample_weather_data, clock):
+        """期限切れ後の経過時間に応じて状態が変わることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64, ttl=60,
+                                  stale_while_revalidate=30, stale_if_error=120)
+        cache.set('Tokyo', sample_weather_data)
+
+        assert cache.lookup('Tokyo')[1] == SharedMemoryCache.FRESH
+        clock[0] += 70
+        assert cache.lookup('Tokyo')[1] == SharedMemoryCache.STALE
+        clock[0] += 30
+        assert cache.lookup('Tokyo') == (None, SharedMemoryCache.MISS)
+        assert cache.get_stale_if_error('Tokyo') == sample_weather_data
+        clock[0] += 100
+        assert cache.get_stale_if_error('Tokyo') is None
+
+    @pytest.mark.unit
+    def test_eviction_within_probe_window(self, shared_path, sample_weather_data, clock):
+        """スロットが埋まると最も古いエントリを上書きすることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=4, probe=4)
+        for i in range(5):
+            clock[0] += 1
+            cache.set(f"city-{i}", sample_weather_data)
+
+        assert len(cache) == 4
+        assert 'city-0' not in cache
+        assert 'city-4' in cache
+        assert cache.stats()['evictions'] == 1
+
+    @pytest.mark.unit
+    def test_oversized_value_skipped(self, shared_path, sample_weather_data):
+        """スロットに収まらない値は格納しないことを確認"""
+        cache = SharedMemoryCache(shared_path, slots=4, slot_size=64)
+        cache.set('Tokyo', sample_weather_data)
+
+        assert len(cache) == 0
+        assert cache.stats()['oversized'] == 1
+
+    @pytest.mark.unit
+    def test_keys_and_hot_keys(self, shared_path, sample_weather_data):
+        """保持中のキーをタプルに戻して列挙し、ヒット数の多い順に返すことを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set((('id', 1850144), 'ja', 'metric'), sample_weather_data)
+        cache.set((('id', 1853909), 'ja', 'metric'), sample_weather_data)
+        cache.get((('id', 1853909), 'ja', 'metric'))
+
+        assert sorted(cache.keys()) == [(('id', 1850144), 'ja', 'metric'), (('id', 1853909), 'ja', 'metric')]
+        assert cache.hot_keys(1) == [((('id', 1853909), 'ja', 'metric'), 1)]
+
+    @pytest.mark.unit
+    def test_delete_and_clear(self, shared_path, sample_weather_data):
+        """削除と全削除を確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set('Tokyo', sample_weather_data)
+        cache.set('Osaka', sample_weather_data)
+
+        assert cache.delete('Tokyo') is True
+        assert cache.delete('Tokyo') is False
+        cache.clear()
+        assert len(cache) == 0
+
+    @pytest.mark.unit
+    def test_layout_mismatch_refused(self, shared_path, sample_weather_data):
+        """スロット設定が異なるワーカーは使用中のファイルを作り直さずにエラーにすることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set('Tokyo', sample_weather_data)
+
+        with pytest.raises(ValueError, match="レイアウト"):
+            SharedMemoryCache(shared_path, slots=128)
+        with pytest.raises(ValueError, match="レイアウト"):
+            SharedMemoryCache(shared_path, slots=64, slot_size=1024)
+
+        assert cache.get('Tokyo') == sample_weather_data
+        assert SharedMemoryCache(shared_path, slots=64).get('Tokyo') == sample_weather_data
+
+    @pytest.mark.unit
+    def test_default_path_is_per_user(self, tmp_path, monkeypatch):
+        """既定のパスは共有の /tmp ではなくユーザーごとのディレクトリになることを確認"""
+        monkeypatch.setenv('XDG_RUNTIME_DIR', str(tmp_path))
+        assert default_path() == str(tmp_path / "weather-app" / "shared-cache.bin")
+
+        cache = SharedMemoryCache.from_config({'shared': {'slots': 16}})
+        assert cache.path == default_path()
+        assert os.stat(tmp_path / "weather-app").st_mode & 0o777 == 0o700
+        assert os.stat(cache.path).st_mode & 0o777 == 0o600
+        monkeypatch.delenv('XDG_RUNTIME_DIR')
+        assert not default_path().startswith('/tmp/')
+
+    @pytest.mark.unit
+    def test_unsafe_file_refused(self, tmp_path, shared_path, mocker):
+        """シンボリックリンク・他のユーザーのファイル・他のユーザーが書き込めるファイルを使わないことを確認"""
+        target = tmp_path / "target.bin"
+        target.write_bytes(b"")
+        link = tmp_path / "link.bin"
+        link.symlink_to(target)
+        with pytest.raises(ValueError, match="シンボリックリンク"):
+            SharedMemoryCache(str(link), slots=16)
+
+        SharedMemoryCache(shared_path, slots=16).close()
+        os.chmod(shared_path, 0o666)
+        with pytest.raises(ValueError, match="読み書き"):
+            SharedMemoryCache(shared_path, slots=16)
+
+        os.chmod(shared_path, 0o600)
+        mocker.patch('src.shared_cache.os.getuid', return_value=os.getuid() + 1)
+        with pytest.raises(ValueError, match="所有"):
+            SharedMemoryCache(shared_path, slots=16)
+
+    @pytest.mark.unit
+    def test_counters_thread_safe(self, shared_path, sample_weather_data):
+        """複数スレッドからの参照でもヒット数・ミス数を取りこぼさないことを確認"""
+        cache = SharedMemoryCache(shared_path, slots=64)
+        cache.set('Tokyo', sample_weather_data)
+
+        def worker():
+            for _ in range(200):
+                cache.get('Tokyo')
+                cache.get('Osaka')
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = cache.stats()
+        assert stats['hits'] == 800
+        assert stats['misses'] == 800
+
+    @pytest.mark.unit
+    def test_recovers_from_interrupted_write(self, shared_path, sample_weather_data):
+        """書き込み途中で停止したワーカーが奇数のシーケンス番号を残しても、次の書き込みで読めることを確認"""
+        cache = SharedMemoryCache(shared_path, slots=1, probe=1)
+        cache.set('Tokyo', sample_weather_data)
+        offset = cache._offset(0)
+        seq = SEQ.unpack_from(cache._mm, offset)[0]
+        SEQ.pack_into(cache._mm, offset, seq + 1)
+
+        assert cache.get('Tokyo') is None
+        cache.set('Tokyo', sample_weather_data)
+
+        assert SEQ.unpack_from(cache._mm, offset)[0] % 2 == 0
+        assert cache.get('Tokyo') == sample_weather_data
+        cache.set('Osaka', sample_weather_data)
+        assert cache.get('Osaka') == sample_weather_data
+
+    @pytest.mark.unit
+    def test_concurrent_readers_and_writer(self, shared_path, sample_weather_data):
+        """書き込み中に読み込んでも壊れた値を返さないことを確認"""
+        cache = SharedMemoryCache(shared_path, slots=16)
+        cache.set('Tokyo', sample_weather_data)
+        errors = []
+        stop = threading.Event()
+
+        def reader():
+            while not stop.is_set():
+                try:
+                    value = cache.get('Tokyo')
+                    assert value is None or value.city_name == 'Tokyo'
+                except Exception as e:
+                    errors.append(e)
+                    return
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for i in range(300):
+            sample_weather_data.temperature = float(i)
+            cache.set('Tokyo', sample_weather_data)
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        assert errors == []
+
+
+class TestCreateCache:
+    """create_cache関数のテスト"""
+
+    @pytest.mark.unit
+    def test_backends(self, shared_path):
+        """backend の設定に応じたキャッシュを作成することを確認"""
+        assert isinstance(create_cache({'ttl': 60}), TTLCache)
+        shared = create_cache({'backend': 'shared', 'ttl': 60, 'shared': {'path': shared_path, 'slots': 32}})
+        assert isinstance(shared, SharedMemoryCache)
+        assert shared.slots == 32
+        assert create_cache(None) is None
+        assert create_cache({'enabled': False}) is None
+
+    @pytest.mark.unit
+    def test_unknown_backend(self):
+        """未知の backend で ValueError になることを確認"""
+        with pytest.raises(ValueError):
+            create_cache({'backend': 'memcached'})
+
+    @pytest.mark.unit
+    def test_workers_share_entries(self, tmp_path, shared_path, mock_env_vars, mock_requests_get,
+                                   mock_successful_api_response, suppress_logging):
+        """shared バックエンドでは別のクライアント（別ワーカー相当）が通信せずに値を使うことを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "cache:\n"
+            "  backend: \"shared\"\n"
+            "  shared:\n"
+            f"    path: \"{shared_path}\"\n"
+            "    slots: 64\n"
+        )
+
+        WeatherAPI(str(config_file)).get_current_weather("Tokyo")
+        weather = WeatherAPI(str(config_file)).get_current_weather("Tokyo")
+
+        assert weather.city_name == "Tokyo"
+        assert mock_requests_get.call_count == 1
@@ -0,0 +1,139 @@
+"""
+単一フライト（singleflight.py）の単体テスト
+"""
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+
+from src.singleflight import SingleFlight
+from src.weather_api import WeatherAPI
+from src.exceptions import CityNotFoundError
+
+
+def _run_concurrently(count, target):
+    """target を count 個のスレッドで同時に実行する"""
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads
+
+
+def _wait_for_requests(flight, count):
+    """合流待ちの呼び出しが count 件に達するまで待機する"""
+    deadline = time.monotonic() + 5
+    while flight.stats()['requests'] < count and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+    """SingleFlightクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_sequential_calls_are_not_coalesced(self):
+        """順次呼び出しはそれぞれ実行されることを確認"""
+        flight = SingleFlight()
+        func = Mock(return_value="result")
+
+        assert flight.do("key", func) == "result"
+        assert flight.do("key", func) == "result"
+
+        assert func.call_count == 2
+        assert flight.stats()['coalesced'] == 0
+
+    @pytest.mark.unit
+    def test_concurrent_calls_share_one_execution(self):
+        """同時呼び出しが1回の実行に合流することを確認"""
+        flight = SingleFlight()
+        release = threading.Event()
+        calls = []
+        results = []
+
+        def slow():
+            calls.append(1)
+            release.wait(timeout=5)
+            return "shared"
+
+        threads = _run_concurrently(5, lambda: results.append(flight.do("Tokyo", slow)))
+        # 全スレッドが合流するまで待機
+        _wait_for_requests(flight, 5)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(calls) == 1
+        assert results == ["shared"] * 5
+        stats = flight.stats()
+        assert stats['executions'] == 1
+        assert stats['coalesced'] == 4
+        assert stats['in_flight'] == 0
+
+    @pytest.mark.unit
+    def test_exception_propagates_to_all_waiters(self):
+        """例外が合流した全呼び出しに伝播することを確認"""
+        flight = SingleFlight()
+        release = threading.Event()
+        errors = []
+
+        def failing():
+            release.wait(timeout=5)
+            raise CityNotFoundError("Nowhere")
+
+        def worker():
+            try:
+                flight.do("Nowhere", failing)
+            except CityNotFoundError as e:
+                errors.append(e)
+
+        threads = _run_concurrently(3, worker)
+        _wait_for_requests(flight, 3)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert len(errors) == 3
+        assert all(e.city_name == "Nowhere" for e in errors)
+        assert flight.in_flight() == 0
+
+    @pytest.mark.unit
+    def test_different_keys_are_not_coalesced(self):
+        """異なるキーは合流しないことを確認"""
+        flight = SingleFlight()
+
+        flight.do(("Tokyo", "ja", "metric"), lambda: 1)
+        flight.do(("Tokyo", "en", "metric"), lambda: 2)
+
+        assert flight.stats()['executions'] == 2
+
+
+class TestWeatherAPISingleFlight:
+    """WeatherAPIのリクエスト合流のテスト"""
+
+    @pytest.mark.unit
+    def test_concurrent_lookups_send_one_request(self, test_config_file, mock_env_vars,
+                                                 mock_requests_get, sample_api_response,
+                                                 suppress_logging):
+        """同じ都市の同時取得で上流リクエストが1回になることを確認"""
+        release = threading.Event()
+        response = Mock(status_code=200)
+        response.json.return_value = sample_api_response
+
+        def slow_get(*args, **kwargs):
+            release.wait(timeout=5)
+            return response
+
+        mock_requests_get.side_effect = slow_get
+        api = WeatherAPI(test_config_file)
+        results = []
+
+        threads = _run_concurrently(4, lambda: results.append(api.get_current_weather("Tokyo")))
+        _wait_for_requests(api.single_flight, 4)
+        release.set()
+        for thread in threads:
+            thread.join()
+
+        assert mock_requests_get.call_count == 1
+        assert len(results) == 4
+        assert all(r is results[0] for r in results)
+        assert api.get_metrics()['single_flight']['coalesced'] == 3
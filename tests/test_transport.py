@@ -0,0 +1,123 @@
+"""
+HTTPトランスポート（transport.py）の単体テスト
+"""
+
+import pytest
+import requests
+
+from src.transport import TransportResponse, RequestsTransport, create_transport
+from src.fake_server import InProcessTransport
+from src.http_session import SessionPool
+from src.weather_api import WeatherAPI
+from src.exceptions import APIConnectionError, CityNotFoundError
+
+
+class TestRequestsTransport:
+    """RequestsTransportクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_uses_session_pool(self, mock_requests_get):
+        """SessionPool のセッションでリクエストすることを確認"""
+        transport = RequestsTransport(SessionPool())
+
+        transport.get("https://example.com/weather", params={'q': 'Tokyo'}, timeout=3)
+
+        args, kwargs = mock_requests_get.call_args
+        assert args[0] == "https://example.com/weather"
+        assert kwargs['params'] == {'q': 'Tokyo'}
+        assert kwargs['timeout'] == 3
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("error, message", [
+        (requests.exceptions.Timeout("timeout"), "タイムアウト"),
+        (requests.exceptions.ConnectionError("refused"), "接続できません"),
+        (requests.exceptions.TooManyRedirects("redirects"), "APIリクエストエラー"),
+    ])
+    def test_maps_requests_errors(self, mock_requests_get, suppress_logging, error, message):
+        """requests の例外が APIConnectionError に変換されることを確認"""
+        mock_requests_get.side_effect = error
+        transport = RequestsTransport(SessionPool())
+
+        with pytest.raises(APIConnectionError, match=message):
+            transport.get("https://example.com/weather", params={}, timeout=3)
+
+
+class TestCreateTransport:
+    """create_transport関数のテスト"""
+
+    @pytest.mark.unit
+    def test_requests_transport(self):
+        """requests を指定すると RequestsTransport を返すことを確認"""
+        assert isinstance(create_transport('requests', {}, SessionPool()), RequestsTransport)
+
+    @pytest.mark.unit
+    def test_fake_transport_uses_fake_server_config(self):
+        """fake を指定すると fake_server セクションの設定で作成されることを確認"""
+        transport = create_transport('fake', {'fake_server': {'latency_ms': 5}}, SessionPool())
+
+        assert isinstance(transport, InProcessTransport)
+        assert transport.fake.latency_ms == 5
+
+    @pytest.mark.unit
+    def test_unknown_transport(self):
+        """未知のトランスポート名で ValueError になることを確認"""
+        with pytest.raises(ValueError):
+            create_transport('carrier-pigeon', {}, SessionPool())
+
+
+class TestTransportResponse:
+    """TransportResponseクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_json(self):
+        """本文をJSONとして解析できることを確認"""
+        response = TransportResponse(200, '{"name": "東京"}'.encode('utf-8'), {'Retry-After': '3'})
+
+        assert response.json() == {'name': '東京'}
+        assert response.headers['Retry-After'] == '3'
+
+
+class TestWeatherAPIFakeTransport:
+    """WeatherAPIのフェイクトランスポート利用のテスト"""
+
+    @pytest.fixture
+    def fake_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  units: \"metric\"\n"
+            "  transport: \"fake\"\n"
+            "fake_server:\n"
+            "  not_found: [\"Atlantis\"]\n"
+        )
+        return str(config_file)
+
+    @pytest.mark.unit
+    def test_fetch_without_network(self, fake_config_file, mock_env_vars,
+                                   mock_requests_get, suppress_logging):
+        """フェイクトランスポートでは実際のHTTP通信を行わないことを確認"""
+        api = WeatherAPI(fake_config_file)
+
+        weather = api.get_current_weather("Tokyo")
+
+        assert weather.city_name == "Tokyo"
+        assert weather.country == "JP"
+        mock_requests_get.assert_not_called()
+
+    @pytest.mark.unit
+    def test_fake_not_found(self, fake_config_file, mock_env_vars, suppress_logging):
+        """フェイクサーバーの 404 が CityNotFoundError になることを確認"""
+        api = WeatherAPI(fake_config_file)
+
+        with pytest.raises(CityNotFoundError):
+            api.get_current_weather("Atlantis")
+
+    @pytest.mark.unit
+    def test_explicit_transport(self, test_config_file, mock_env_vars, suppress_logging):
+        """コンストラクタで渡したトランスポートが優先されることを確認"""
+        transport = create_transport('fake', {}, SessionPool())
+
+        api = WeatherAPI(test_config_file, transport=transport)
+
+        assert api.transport is transport
+        assert api.get_current_weather("London").country == "GB"
@@ -0,0 +1,171 @@
+"""
+キャッシュのウォームアップ（warmup.py）の単体テスト
+"""
+
+import json
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
+from src.rate_limiter import TokenBucketRateLimiter
+from src.warmup import CacheWarmer, DEFAULT_WARMUP_CITIES
+from src.weather_api import WeatherAPI
+from src.weather_web import WeatherWebApp
+
+
+CACHE_CONFIG = (
+    "defaults:\n"
+    "  city: \"Sapporo\"\n"
+    "  language: \"ja\"\n"
+    "cache:\n"
+    "  ttl: 600\n"
+)
+
+
+@pytest.fixture
+def fake():
+    return FakeOpenWeatherMap(seed=1)
+
+
+@pytest.fixture
+def config_file(tmp_path):
+    config_file = tmp_path / "config.yaml"
+    config_file.write_text(CACHE_CONFIG)
+    return str(config_file)
+
+
+@pytest.fixture
+def api(config_file, fake, mock_env_vars, suppress_logging):
+    return WeatherAPI(config_file, transport=InProcessTransport(fake))
+
+
+class TestCacheWarmer:
+    """CacheWarmerクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_warms_all_cities(self, api, fake):
+        """全都市を取得してキャッシュに載せることを確認"""
+        results = CacheWarmer(DEFAULT_WARMUP_CITIES).run(api)
+
+        assert results == {city: CacheWarmer.WARMED for city in DEFAULT_WARMUP_CITIES}
+        assert fake.request_count == 5
+        api.get_current_weather("Tokyo")
+        assert fake.request_count == 5
+
+    @pytest.mark.unit
+    def test_cached_cities_not_refetched(self, api, fake):
+        """既にキャッシュにある都市（別ワーカーが載せた場合など）は通信しないことを確認"""
+        api.get_current_weather("東京")
+
+        results = CacheWarmer(["Tokyo", "Osaka"]).run(api)
+
+        assert results == {"Tokyo": CacheWarmer.CACHED, "Osaka": CacheWarmer.WARMED}
+        assert fake.request_count == 2
+
+    @pytest.mark.unit
+    def test_rate_limit_reserve(self, api, fake):
+        """残りトークンが予備を下回る都市はスキップすることを確認"""
+        api.rate_limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=4)
+
+        results = CacheWarmer(DEFAULT_WARMUP_CITIES, max_workers=1, rate_limit_reserve=0.5).run(api)
+
+        assert list(results.values()).count(CacheWarmer.WARMED) == 2
+        assert list(results.values()).count(CacheWarmer.SKIPPED) == 3
+        assert api.rate_limiter.available() >= 2
+        assert api.rate_limiter.stats()['acquired'] == 2
+
+    @pytest.mark.unit
+    def test_rate_limit_reserve_concurrent(self, api, fake):
+        """並行して確認しても予備を下回る数の都市は取得しないことを確認"""
+        api.rate_limiter = TokenBucketRateLimiter(calls_per_minute=1, burst=4)
+
+        results = CacheWarmer(DEFAULT_WARMUP_CITIES, max_workers=5, rate_limit_reserve=0.5).run(api)
+
+        assert list(results.values()).count(CacheWarmer.WARMED) == 2
+        assert fake.request_count == 2
+
+    @pytest.mark.unit
+    def test_failures_reported(self, api, fake):
+        """見つからない都市は failed として報告し、他の都市は続行することを確認"""
+        fake.not_found = {"atlantis"}
+
+        results = CacheWarmer(["Atlantis", "Tokyo"]).run(api)
+
+        assert results == {"Atlantis": CacheWarmer.FAILED, "Tokyo": CacheWarmer.WARMED}
+
+    @pytest.mark.unit
+    def test_from_config(self):
+        """defaults.city を先頭に追加し、重複を除くことを確認"""
+        warmer = CacheWarmer.from_config({'cities': ["Tokyo", "Osaka"], 'max_workers': 2}, "Tokyo")
+
+        assert warmer.cities == ["Tokyo", "Osaka"]
+        assert warmer.max_workers == 2
+        assert CacheWarmer.from_config({}, "Tokyo") is None
+        assert CacheWarmer.from_config({'enabled': False}, "Tokyo") is None
+        assert CacheWarmer.from_config({'enabled': True}, "Sapporo").cities == ["Sapporo"] + DEFAULT_WARMUP_CITIES
+
+    @pytest.mark.unit
+    def test_invalid_settings(self):
+        """不正な設定で ValueError になることを確認"""
+        with pytest.raises(ValueError):
+            CacheWarmer(["Tokyo"], max_workers=0)
+        with pytest.raises(ValueError):
+            CacheWarmer(["Tokyo"], rate_limit_reserve=1.5)
+
+
+class TestWebAppWarmup:
+    """WeatherWebApp起動時のウォームアップのテスト"""
+
+    @pytest.fixture
+    def web_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            CACHE_CONFIG
+            + "api:\n"
+            "  transport: \"fake\"\n"
+            "web:\n"
+            "  warmup:\n"
+            "    cities: [\"Tokyo\", \"Osaka\"]\n"
+        )
+        return str(config_file)
+
+    @pytest.mark.web
+    def test_warmed_in_background(self, web_config_file, mock_env_vars, suppress_logging):
+        """裏のスレッドでデフォルト都市・人気都市がキャッシュに載ることを確認"""
+        app = WeatherWebApp(web_config_file)
+        app.warmup_thread.join(timeout=5)
+
+        assert app.warmup_results == {city: CacheWarmer.WARMED for city in ["Sapporo", "Tokyo", "Osaka"]}
+        data = json.loads(app.flask_app.test_client().get('/health').data)
+        assert data['components']['cache_warmup'] == 'OK'
+
+    @pytest.mark.web
+    def test_startup_not_blocked(self, web_config_file, mock_env_vars, suppress_logging):
+        """ウォームアップの完了を待たずに初期化が終わることを確認"""
+        release = threading.Event()
+
+        def slow_run(warmer, client):
+            release.wait(timeout=5)
+            return {city: CacheWarmer.WARMED for city in warmer.cities}
+
+        with patch.object(CacheWarmer, 'run', slow_run):
+            app = WeatherWebApp(web_config_file)
+            try:
+                assert app.warmup_results is None
+                data = json.loads(app.flask_app.test_client().get('/health').data)
+                assert data['components']['cache_warmup'] == 'IN_PROGRESS'
+                assert data['status'] == 'healthy'
+            finally:
+                release.set()
+                app.warmup_thread.join(timeout=5)
+
+        assert app.warmup_results == {city: CacheWarmer.WARMED for city in ["Sapporo", "Tokyo", "Osaka"]}
+
+    @pytest.mark.web
+    def test_disabled_without_section(self, test_config_file, mock_env_vars, suppress_logging):
+        """web.warmup セクションが無い場合はウォームアップしないことを確認"""
+        app = WeatherWebApp(test_config_file)
+
+        assert app.warmup_results is None
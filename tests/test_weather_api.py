@@ -5,10 +5,12 @@ WeatherAPIクラス（weather_api.py）の単体テスト
 import pytest
 import requests
 from unittest.mock import Mock, patch, MagicMock
-from datetime import datetime
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 
 from src.weather_api import WeatherAPI
 from src.models import WeatherData
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
 from src.exceptions import (
     CityNotFoundError,
     APIKeyError,
@@ -166,6 +168,20 @@ class TestWeatherAPIParseWeatherData:
         assert weather_data.temperature == 25.5
         assert weather_data.feels_like == 27.0
     
+    @pytest.mark.unit
+    def test_parse_weather_data_observation_time(self, test_config_file, mock_env_vars,
+                                                 sample_api_response, suppress_logging):
+        """観測時刻が dt・timezone から取得時刻とは別に設定されることを確認"""
+        api = WeatherAPI(test_config_file)
+        weather_data = api._parse_weather_data(sample_api_response)
+        
+        assert weather_data.observed_at == datetime.fromtimestamp(1749095343, timezone.utc)
+        assert weather_data.observed_at.utcoffset() == timedelta(hours=9)
+        assert weather_data.timestamp > weather_data.observed_at.replace(tzinfo=None)
+        
+        del sample_api_response['dt']
+        assert api._parse_weather_data(sample_api_response).observed_at is None
+    
     @pytest.mark.unit
     def test_parse_weather_data_missing_required_field(self, test_config_file, mock_env_vars, suppress_logging):
         """必須フィールドが欠損している場合のテスト"""
@@ -216,7 +232,7 @@ class TestWeatherAPIValidateApiKey:
     """validate_api_key メソッドのテスト"""
     
     @pytest.mark.unit
-    @patch.object(WeatherAPI, 'get_current_weather')
+    @patch.object(WeatherAPI, '_fetch_current_weather')
     def test_validate_api_key_success(self, mock_get_weather, test_config_file, mock_env_vars, suppress_logging):
         """APIキー検証成功のテスト"""
         # get_current_weather が正常に動作する場合
@@ -226,10 +242,10 @@ class TestWeatherAPIValidateApiKey:
         result = api.validate_api_key()
         
         assert result is True
-        mock_get_weather.assert_called_once_with("London")
+        mock_get_weather.assert_called_once_with("London", "ja")
     
     @pytest.mark.unit
-    @patch.object(WeatherAPI, 'get_current_weather')
+    @patch.object(WeatherAPI, '_fetch_current_weather')
     def test_validate_api_key_invalid_key(self, mock_get_weather, test_config_file, mock_env_vars, suppress_logging):
         """APIキー検証失敗のテスト"""
         # get_current_weather がAPIKeyErrorを発生させる場合
@@ -239,10 +255,10 @@ class TestWeatherAPIValidateApiKey:
         result = api.validate_api_key()
         
         assert result is False
-        mock_get_weather.assert_called_once_with("London")
+        mock_get_weather.assert_called_once_with("London", "ja")
     
     @pytest.mark.unit
-    @patch.object(WeatherAPI, 'get_current_weather')
+    @patch.object(WeatherAPI, '_fetch_current_weather')
     def test_validate_api_key_other_exception(self, mock_get_weather, test_config_file, mock_env_vars, suppress_logging):
         """その他の例外の場合のテスト"""
         # get_current_weather が他の例外を発生させる場合（キーは有効と判断）
@@ -252,7 +268,21 @@ class TestWeatherAPIValidateApiKey:
         result = api.validate_api_key()
         
         assert result is True  # APIキー以外のエラーは有効と判断
-        mock_get_weather.assert_called_once_with("London")
+        mock_get_weather.assert_called_once_with("London", "ja")
+    
+    @pytest.mark.unit
+    def test_validate_api_key_bypasses_cache(self, tmp_path, mock_env_vars,
+                                             sample_api_response, suppress_logging):
+        """キャッシュ済みの結果で失効したキーを有効と誤判定しないテスト"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("cache:\n  ttl: 600\n")
+        api = WeatherAPI(str(config_file))
+        with patch.object(api, '_request', return_value=sample_api_response):
+            api.get_current_weather("London")
+        
+        with patch.object(api, '_request', side_effect=APIKeyError("Invalid API key")) as mock_request:
+            assert api.validate_api_key() is False
+            mock_request.assert_called_once()
 
 
 class TestWeatherAPIRequestParameters:
@@ -348,4 +378,264 @@ class TestWeatherAPIEdgeCases:
         
         # 例外が発生しないことを確認
         weather_data = api.get_current_weather(long_city_name)
-        assert isinstance(weather_data, WeatherData)
\ No newline at end of file
+        assert isinstance(weather_data, WeatherData)
+
+class TestWeatherAPIGetCurrentWeatherMany:
+    """get_current_weather_many メソッドのテスト"""
+    
+    @staticmethod
+    def _group_entry(sample_api_response, city_id, name):
+        """group応答の1件分を作成"""
+        return dict(sample_api_response, id=city_id, name=name)
+    
+    @pytest.mark.unit
+    def test_ids_are_chunked_into_group_requests(self, test_config_file, mock_env_vars,
+                                                 mock_requests_get, sample_api_response,
+                                                 suppress_logging):
+        """都市IDが20件ずつ group リクエストにまとめられることを確認"""
+        def fake_get(url, params=None, timeout=None):
+            ids = [int(i) for i in params['id'].split(',')]
+            response = Mock()
+            response.status_code = 200
+            response.json.return_value = {
+                'cnt': len(ids),
+                'list': [self._group_entry(sample_api_response, i, f"City{i}") for i in ids]
+            }
+            return response
+        
+        mock_requests_get.side_effect = fake_get
+        api = WeatherAPI(test_config_file)
+        
+        results = api.get_current_weather_many(list(range(1, 46)))
+        
+        assert mock_requests_get.call_count == 3
+        for args, kwargs in mock_requests_get.call_args_list:
+            assert args[0] == "https://api.openweathermap.org/data/2.5/group"
+            assert len(kwargs['params']['id'].split(',')) <= 20
+        assert list(results) == list(range(1, 46))
+        assert results[7].city_name == "City7"
+    
+    @pytest.mark.unit
+    def test_names_are_resolved_and_learned(self, test_config_file, mock_env_vars,
+                                            mock_requests_get, sample_api_response,
+                                            suppress_logging):
+        """未知の都市名は個別取得され、学習したIDで次回は group を使うことを確認"""
+        def fake_get(url, params=None, timeout=None):
+            response = Mock()
+            response.status_code = 200
+            if url.endswith('weather'):
+                response.json.return_value = sample_api_response
+            else:
+                response.json.return_value = {
+                    'cnt': 1,
+                    'list': [self._group_entry(sample_api_response, 1850144, "Tokyo")]
+                }
+            return response
+        
+        mock_requests_get.side_effect = fake_get
+        api = WeatherAPI(test_config_file)
+        
+        first = api.get_current_weather_many(["Springfield"])
+        assert mock_requests_get.call_args[0][0].endswith('/weather')
+        assert api.city_resolver.resolve("Springfield") == 1850144
+        
+        second = api.get_current_weather_many(["Springfield", "1850144"])
+        assert mock_requests_get.call_args[0][0].endswith('/group')
+        assert mock_requests_get.call_args[1]['params']['id'] == "1850144"
+        assert first["Springfield"].city_name == "Tokyo"
+        assert second["Springfield"].city_name == "Tokyo"
+        assert second["1850144"].city_name == "Tokyo"
+    
+    @pytest.mark.unit
+    def test_seeded_names_use_group(self, test_config_file, mock_env_vars, mock_requests_get,
+                                    sample_api_response, suppress_logging):
+        """別名表にある都市名は /weather を経由せずに group で取得することを確認"""
+        mock_requests_get.return_value.status_code = 200
+        mock_requests_get.return_value.json.return_value = {
+            'cnt': 1,
+            'list': [self._group_entry(sample_api_response, 1850144, "Tokyo")]
+        }
+        api = WeatherAPI(test_config_file)
+        
+        results = api.get_current_weather_many(["東京", "tokyo"])
+        
+        assert mock_requests_get.call_count == 1
+        assert mock_requests_get.call_args[0][0].endswith('/group')
+        assert mock_requests_get.call_args[1]['params']['id'] == "1850144"
+        assert results["東京"].city_name == "Tokyo"
+    
+    @pytest.mark.unit
+    def test_missing_entries_become_city_not_found(self, test_config_file, mock_env_vars,
+                                                   mock_requests_get, sample_api_response,
+                                                   suppress_logging):
+        """応答に含まれない都市・存在しない都市名は CityNotFoundError になることを確認"""
+        def fake_get(url, params=None, timeout=None):
+            response = Mock()
+            if url.endswith('weather'):
+                response.status_code = 404
+            else:
+                response.status_code = 200
+                response.json.return_value = {
+                    'cnt': 1,
+                    'list': [self._group_entry(sample_api_response, 1, "City1")]
+                }
+            return response
+        
+        mock_requests_get.side_effect = fake_get
+        api = WeatherAPI(test_config_file)
+        
+        results = api.get_current_weather_many([1, 2, "Atlantis"])
+        
+        assert isinstance(results[1], WeatherData)
+        assert isinstance(results[2], CityNotFoundError)
+        assert isinstance(results["Atlantis"], CityNotFoundError)
+        assert results["Atlantis"].city_name == "Atlantis"
+    
+    @pytest.mark.unit
+    def test_group_api_key_error_is_raised(self, test_config_file, mock_env_vars,
+                                           mock_401_api_response, suppress_logging):
+        """group リクエストのAPIキーエラーは例外として送出されることを確認"""
+        api = WeatherAPI(test_config_file)
+        
+        with pytest.raises(APIKeyError):
+            api.get_current_weather_many([1850144])
+
+
+class TestWeatherAPIGetCurrentWeatherByCoords:
+    """座標による天気情報取得のテスト"""
+    
+    @pytest.fixture
+    def coords_config_file(self, tmp_path):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "api:\n"
+            "  units: \"metric\"\n"
+            "cache:\n"
+            "  ttl: 600\n"
+            "  geo_grid: 0.05\n"
+        )
+        return str(config_file)
+    
+    @pytest.mark.unit
+    def test_snap_coords(self, coords_config_file, mock_env_vars, suppress_logging):
+        """座標が格子点に丸められることを確認"""
+        api = WeatherAPI(coords_config_file)
+        
+        assert api.snap_coords(35.6895, 139.6917) == (35.7, 139.7)
+        assert api.snap_coords(35.6701, 139.6749) == (35.65, 139.65)
+        assert api.snap_coords(-0.01, 179.99) == (0.0, -180.0)
+        with pytest.raises(ValueError):
+            api.snap_coords(91, 0)
+    
+    @pytest.mark.unit
+    def test_nearby_requests_share_entry(self, coords_config_file, mock_env_vars, mock_requests_get,
+                                         mock_successful_api_response, suppress_logging):
+        """近くの座標は1回の通信と1つのキャッシュエントリを共有することを確認"""
+        api = WeatherAPI(coords_config_file)
+        
+        first = api.get_current_weather_by_coords(35.6895, 139.6917)
+        second = api.get_current_weather_by_coords(35.6812, 139.7101)
+        
+        assert first == second
+        assert mock_requests_get.call_count == 1
+        params = mock_requests_get.call_args[1]['params']
+        assert (params['lat'], params['lon']) == (35.7, 139.7)
+        assert 'q' not in params
+        assert api.get_cache_stats()['hot_keys'] == [{'key': "geo:35.7,139.7/ja/metric", 'hits': 1}]
+    
+    @pytest.mark.unit
+    def test_grid_resolution_configurable(self, tmp_path, mock_env_vars, mock_requests_get,
+                                          mock_successful_api_response, suppress_logging):
+        """格子を細かくすると近くの座標でも別のエントリになることを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("cache:\n  ttl: 600\n  geo_grid: 0.001\n")
+        api = WeatherAPI(str(config_file))
+        
+        api.get_current_weather_by_coords(35.6895, 139.6917)
+        api.get_current_weather_by_coords(35.6812, 139.7101)
+        
+        assert mock_requests_get.call_count == 2
+        assert mock_requests_get.call_args[1]['params']['lat'] == 35.681
+    
+    @pytest.mark.unit
+    def test_invalid_grid(self, tmp_path, mock_env_vars, suppress_logging):
+        """不正な格子間隔で ValueError になることを確認"""
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("cache:\n  geo_grid: 0\n")
+        
+        with pytest.raises(ValueError):
+            WeatherAPI(str(config_file))
+
+
+class TestWeatherAPIUpdateCadence:
+    """上流の更新間隔に合わせたキャッシュの有効期限のテスト"""
+    
+    @pytest.fixture
+    def api(self, tmp_path, mock_env_vars, suppress_logging):
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text(
+            "cache:\n"
+            "  ttl: 600\n"
+            "  update_interval: 600\n"
+            "  update_recheck: 30\n"
+        )
+        return WeatherAPI(str(config_file))
+    
+    @pytest.mark.unit
+    def test_ttl_until_next_update(self, api, sample_weather_data, mocker):
+        """次の更新予定まで有効、予定を過ぎた場合は遅れに応じた再確認の間隔になることを確認"""
+        observed = datetime(2025, 6, 5, 12, 0, tzinfo=timezone.utc)
+        weather = replace(sample_weather_data, observed_at=observed)
+        clock = mocker.patch('src.weather_api.time.time')
+        
+        clock.return_value = observed.timestamp() + 100
+        assert api._cache_ttl(weather) == pytest.approx(500)
+        clock.return_value = observed.timestamp() + 610
+        assert api._cache_ttl(weather) == 30
+        clock.return_value = observed.timestamp() + 700
+        assert api._cache_ttl(weather) == pytest.approx(100)
+        clock.return_value = observed.timestamp() + 7200
+        assert api._cache_ttl(weather) == 600
+        clock.return_value = observed.timestamp() - 3600
+        assert api._cache_ttl(weather) == 600
+        assert api._cache_ttl(sample_weather_data) is None
+    
+    @pytest.mark.unit
+    def test_cache_expires_with_upstream_cadence(self, api, mock_requests_get,
+                                                 mock_successful_api_response, mocker):
+        """取得した値が観測時刻から計算した有効期限でキャッシュされることを確認"""
+        mocker.patch('src.weather_api.time.time', return_value=1749095343 + 120)
+        spy = mocker.spy(api.cache, 'set')
+        
+        weather = api.get_current_weather("Tokyo")
+        
+        assert spy.call_args[1]['ttl'] == pytest.approx(480)
+        assert weather.observed_at.timestamp() == 1749095343
+    
+    @pytest.mark.unit
+    def test_disabled_without_update_interval(self, test_config_file, mock_env_vars,
+                                              sample_weather_data, suppress_logging):
+        """update_interval 未設定の場合はキャッシュの ttl を使うことを確認"""
+        api = WeatherAPI(test_config_file)
+        weather = replace(sample_weather_data, observed_at=datetime.now(timezone.utc))
+        
+        assert api.update_interval is None
+        assert api._cache_ttl(weather) is None
+    
+    @pytest.mark.unit
+    def test_recheck_backs_off_while_observation_unchanged(self, api, mock_requests_get,
+                                                           mock_successful_api_response, mocker):
+        """再取得しても観測時刻が変わらない間は再確認の間隔が倍々に延びることを確認"""
+        clock = mocker.patch('src.weather_api.time.time', return_value=1749095343 + 630)
+        spy = mocker.spy(api.cache, 'set')
+        
+        ttls = []
+        for _ in range(6):
+            api.cache.clear()
+            api.get_current_weather("Tokyo")
+            ttls.append(spy.call_args[1]['ttl'])
+            clock.return_value += ttls[-1]
+        
+        assert ttls == pytest.approx([30, 60, 120, 240, 480, 600])
+        assert mock_requests_get.call_count == 6
+
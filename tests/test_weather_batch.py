@@ -0,0 +1,191 @@
+"""
+天気データの列指向コンテナ（weather_batch.py）の単体テスト
+"""
+
+import pytest
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
+
+from src.exceptions import APIResponseError
+from src.models import STALE_UPSTREAM_ERROR, observation_time
+from src.fake_server import FakeOpenWeatherMap, InProcessTransport
+from src.weather_api import WeatherAPI
+from src.weather_batch import WeatherBatch
+
+
+@pytest.fixture
+def weather_list(sample_weather_data):
+    """気温・都市・風の有無が異なる天気データ"""
+    return [
+        sample_weather_data,
+        replace(sample_weather_data, city_name="Osaka", temperature=30.0, wind_speed=None),
+        replace(sample_weather_data, city_name="London", country="GB", temperature=12.5,
+                description="曇り", description_en="Clouds", wind_speed=7.5),
+        replace(sample_weather_data, city_name="Sapporo", temperature=18.0, visibility=None,
+                is_stale=True, stale_reason=STALE_UPSTREAM_ERROR),
+    ]
+
+
+class TestWeatherBatch:
+    """WeatherBatchクラスのテスト"""
+
+    @pytest.mark.unit
+    def test_round_trip(self, weather_list):
+        """WeatherData のリストと相互に変換できることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        assert len(batch) == 4
+        assert batch.to_list() == weather_list
+        assert batch[-1] == weather_list[-1]
+        assert batch.column('stale_reason') == [None, None, None, STALE_UPSTREAM_ERROR]
+        with pytest.raises(IndexError):
+            batch[4]
+
+    @pytest.mark.unit
+    def test_aware_timestamp(self, sample_weather_data):
+        """タイムゾーン付きの時刻が保たれることを確認"""
+        jst = timezone(timedelta(hours=9))
+        weather = replace(sample_weather_data, timestamp=datetime(2025, 6, 5, 21, 0, tzinfo=jst))
+
+        assert WeatherBatch.from_weather_list([weather])[0].timestamp == weather.timestamp
+
+    @pytest.mark.unit
+    def test_observation_time(self, weather_list):
+        """観測時刻の有無が保たれ、観測時刻で並べ替えられることを確認"""
+        weather_list[1] = replace(weather_list[1], observed_at=observation_time(1749095343, 32400))
+        weather_list[2] = replace(weather_list[2], observed_at=observation_time(1749094800, 3600))
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        assert batch.to_list() == weather_list
+        assert batch.sort_by('observed_at').column('city_name') == ["London", "Osaka", "Tokyo", "Sapporo"]
+
+    @pytest.mark.unit
+    def test_strings_are_dictionary_encoded(self, weather_list):
+        """文字列の列が重複なしの辞書とコードで保持されることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list * 100)
+
+        assert batch._values['country'] == ["JP", "GB"]
+        assert batch._codes['country'].typecode == 'I'
+        assert batch.column('country')[:4] == ["JP", "JP", "GB", "JP"]
+
+    @pytest.mark.unit
+    def test_filter_by_mask(self, weather_list):
+        """比較結果の組み合わせで絞り込めることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        warm = batch.filter(batch.mask('temperature', '>', 20))
+        japan_windy = batch.filter([
+            a and b for a, b in zip(batch.mask('country', '==', 'JP'), batch.mask('wind_speed', '>=', 0))
+        ])
+
+        assert warm.column('city_name') == ["Tokyo", "Osaka"]
+        assert japan_windy.column('city_name') == ["Tokyo", "Sapporo"]
+        assert batch.filter(batch.isin('city_name', ["London", "Paris"]))[0] == weather_list[2]
+        assert len(batch) == 4
+        with pytest.raises(ValueError):
+            batch.filter([True])
+        with pytest.raises(ValueError):
+            batch.mask('temperature', '~', 0)
+
+    @pytest.mark.unit
+    def test_sort_by(self, weather_list):
+        """数値・文字列の列で並べ替えられ、値が無い行は末尾になることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        assert batch.sort_by('temperature').column('city_name') == ["London", "Sapporo", "Tokyo", "Osaka"]
+        assert batch.sort_by('city_name', reverse=True).column('city_name') == [
+            "Tokyo", "Sapporo", "Osaka", "London"
+        ]
+        assert batch.sort_by('wind_speed', reverse=True).values('wind_speed') == [7.5, 3.5, 3.5, None]
+
+    @pytest.mark.unit
+    def test_aggregates(self, weather_list):
+        """最小・最大・平均が値の無い行を除いて計算されることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        assert batch.min('temperature') == 12.5
+        assert batch.max('temperature') == 30.0
+        assert batch.mean('temperature') == pytest.approx((25.5 + 30.0 + 12.5 + 18.0) / 4)
+        assert batch.mean('wind_speed') == pytest.approx((3.5 + 7.5 + 3.5) / 3)
+        assert batch.values('visibility') == [10000, 10000, 10000, None]
+        assert WeatherBatch().mean('temperature') is None
+        with pytest.raises(KeyError):
+            batch.mean('city_name')
+
+    @pytest.mark.unit
+    def test_convert_units(self, weather_list):
+        """温度・風速が単位系に合わせて変換されることを確認"""
+        batch = WeatherBatch.from_weather_list(weather_list)
+
+        imperial = batch.convert_units('imperial')
+        kelvin = imperial.convert_units('standard')
+
+        assert imperial.units == 'imperial'
+        assert imperial[0].temperature == pytest.approx(77.9)
+        assert imperial[0].wind_speed == pytest.approx(7.83)
+        assert imperial[1].wind_speed is None
+        assert kelvin[0].temperature == pytest.approx(298.6, abs=0.1)
+        assert kelvin[0].wind_speed == pytest.approx(3.5, abs=0.01)
+        assert batch[0].temperature == 25.5
+        with pytest.raises(ValueError):
+            batch.convert_units('kelvin')
+
+    @pytest.mark.unit
+    def test_from_group_response(self):
+        """group の応答から WeatherData を経由せずに作成できることを確認"""
+        fake = FakeOpenWeatherMap(seed=1)
+        data = {'list': [fake.current_weather(name, 'metric', 'ja') for name in ("Tokyo", "Paris")]}
+        timestamp = datetime(2025, 6, 5, 12, 0)
+
+        batch = WeatherBatch.from_response(data, timestamp=timestamp)
+
+        assert batch.column('city_name') == ["Tokyo", "Paris"]
+        assert batch[1].temperature == round(data['list'][1]['main']['temp'], 1)
+        assert batch[1].timestamp == timestamp
+        assert batch[1].observed_at == observation_time(data['list'][1]['dt'], data['list'][1]['timezone'])
+
+    @pytest.mark.unit
+    @pytest.mark.parametrize("broken", [
+        {'name': "Broken"},
+        {'name': "Broken", 'sys': {'country': "JP"}, 'weather': [],
+         'main': {'temp': 1.0, 'feels_like': 1.0, 'humidity': 50, 'pressure': 1000}},
+        {'name': "Broken", 'sys': {'country': "JP"}, 'weather': [{'description': "晴れ", 'main': "Clear"}],
+         'main': {'temp': "warm", 'feels_like': 1.0, 'humidity': 50, 'pressure': 1000}},
+        {'name': "Broken", 'sys': {'country': "JP"}, 'weather': [{'description': "晴れ", 'main': "Clear"}],
+         'main': {'temp': 1.0, 'feels_like': 1.0, 'humidity': "50%", 'pressure': 1000}},
+        None,
+    ])
+    def test_malformed_item_is_skipped(self, broken):
+        """不完全・型が不正な要素だけを読み飛ばし、残りの要素は追加されることを確認"""
+        fake = FakeOpenWeatherMap(seed=1)
+        data = {'list': [fake.current_weather("Tokyo", 'metric', 'ja'), broken,
+                         fake.current_weather("Paris", 'metric', 'ja')]}
+
+        batch = WeatherBatch()
+        skipped = batch.extend_response(data)
+
+        assert skipped == 1
+        assert batch.column('city_name') == ["Tokyo", "Paris"]
+        assert [len(column) for column in batch._numeric.values()] == [2] * 7
+        with pytest.raises(APIResponseError):
+            batch.append_response(broken)
+        assert len(batch) == 2
+        assert batch[1].city_name == "Paris"
+
+
+class TestWeatherAPIGetWeatherBatch:
+    """get_weather_batch メソッドのテスト"""
+
+    @pytest.mark.unit
+    def test_builds_batch_from_group_requests(self, tmp_path, mock_env_vars, suppress_logging):
+        """ID・既知の都市名は group でまとめて取得され、未知の都市は除外されることを確認"""
+        fake = FakeOpenWeatherMap(seed=1, not_found=["atlantis"])
+        config_file = tmp_path / "config.yaml"
+        config_file.write_text("api:\n  units: \"imperial\"\n")
+        api = WeatherAPI(str(config_file), transport=InProcessTransport(fake))
+
+        batch = api.get_weather_batch([1850144, "London", "Springfield", "atlantis"])
+
+        assert batch.units == 'imperial'
+        assert sorted(batch.column('city_name')) == ["London", "Springfield", "Tokyo"]
+        assert fake.request_count == 3
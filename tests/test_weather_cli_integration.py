@@ -7,10 +7,11 @@ import sys
 from io import StringIO
 from unittest.mock import Mock, patch, MagicMock
 from pathlib import Path
+from dataclasses import replace
 
 from src.weather_cli import WeatherCLI, main, create_parser
-from src.models import WeatherData
-from src.exceptions import CityNotFoundError, APIKeyError, APIConnectionError
+from src.models import STALE_REVALIDATING, STALE_UPSTREAM_ERROR, WeatherData
+from src.exceptions import CityNotFoundError, APIKeyError, APIConnectionError, RateLimitExceededError
 
 
 class TestWeatherCLIInitialization:
@@ -129,6 +130,32 @@ class TestWeatherCLIGetWeatherForCity:
         assert "Tokyo" in output
         assert "25.5℃" in output
     
+    @pytest.mark.integration
+    @pytest.mark.parametrize("reason,expected,unexpected", [
+        (STALE_REVALIDATING, "キャッシュの情報です", "取得できなかった"),
+        (STALE_UPSTREAM_ERROR, "取得できなかった", "キャッシュの情報です"),
+    ])
+    @patch.object(WeatherCLI, 'initialize_client', return_value=True)
+    def test_get_weather_stale_notice(self, mock_init, reason, expected, unexpected, test_config_file,
+                                      mock_env_vars, sample_weather_data, suppress_logging):
+        """古いデータの表示理由に応じた案内を表示することを確認"""
+        cli = WeatherCLI(test_config_file)
+        cli.initialize_client()
+        
+        mock_client = Mock()
+        mock_client.get_current_weather.return_value = replace(
+            sample_weather_data, is_stale=True, stale_reason=reason
+        )
+        cli.weather_client = mock_client
+        
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            result = cli.get_weather_for_city("Tokyo")
+        
+        assert result is True
+        output = mock_stdout.getvalue()
+        assert expected in output
+        assert unexpected not in output
+    
     @pytest.mark.integration
     @patch.object(WeatherCLI, 'initialize_client', return_value=True)
     def test_get_weather_city_not_found(self, mock_init, test_config_file, mock_env_vars, suppress_logging):
@@ -170,6 +197,26 @@ class TestWeatherCLIGetWeatherForCity:
         # 接続エラーメッセージが出力されることを確認
         output = mock_stdout.getvalue()
         assert "接続エラー" in output
+    
+    @pytest.mark.integration
+    @patch.object(WeatherCLI, 'initialize_client', return_value=True)
+    def test_get_weather_rate_limited(self, mock_init, test_config_file, mock_env_vars, suppress_logging):
+        """クライアント側レート制限の場合のテスト"""
+        cli = WeatherCLI(test_config_file)
+        cli.initialize_client()
+        
+        mock_client = Mock()
+        mock_client.get_current_weather.side_effect = RateLimitExceededError(retry_after=12)
+        cli.weather_client = mock_client
+        
+        with patch('sys.stdout', new_callable=StringIO) as mock_stdout:
+            result = cli.get_weather_for_city("Tokyo")
+        
+        assert result is False
+        
+        output = mock_stdout.getvalue()
+        assert "レート制限" in output
+        assert "12秒" in output
 
 
 class TestWeatherCLIBatchMode:
@@ -270,6 +317,20 @@ class TestWeatherCLIArgumentParser:
         assert args.cities == ['Tokyo']
         assert args.detailed is True
     
+    @pytest.mark.integration
+    def test_parser_disk_cache_before_city(self):
+        """--disk-cache の直後の都市名を保存先として解釈しないことを確認"""
+        parser = create_parser()
+        args = parser.parse_args(['--disk-cache', 'Tokyo'])
+        
+        assert args.cities == ['Tokyo']
+        assert args.disk_cache is True
+        assert args.disk_cache_path is None
+        
+        args = parser.parse_args(['--disk-cache-path', '/tmp/weather.db', 'Tokyo'])
+        assert args.cities == ['Tokyo']
+        assert args.disk_cache_path == '/tmp/weather.db'
+    
     @pytest.mark.integration
     def test_parser_verbose_mode(self):
         """詳細ログモードの引数解析テスト"""
@@ -8,8 +8,12 @@ from unittest.mock import Mock, patch
 from flask import url_for
 
 from src.weather_web import WeatherWebApp
-from src.models import WeatherData
-from src.exceptions import CityNotFoundError, APIKeyError, APIConnectionError, APIResponseError
+from src.circuit_breaker import CircuitBreaker
+from src import json_codec
+from src.models import STALE_REVALIDATING, WeatherData
+from src.exceptions import (
+    CityNotFoundError, APIKeyError, APIConnectionError, APIResponseError, RateLimitExceededError
+)
 
 
 class TestWeatherWebAppInitialization:
@@ -256,6 +260,53 @@ class TestWeatherWebAppAPIEndpoint:
         assert data['data']['city_name'] == 'Tokyo'
         assert data['data']['temperature'] == 25.5
     
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_api_weather_reuses_serialized_body(self, client_with_mock_weather_client,
+                                                sample_weather_data, mocker):
+        """同じ WeatherData への2回目以降の応答では JSON エンコードを行わないことを確認"""
+        client, mock_client = client_with_mock_weather_client
+        mock_client.get_current_weather.return_value = sample_weather_data
+        dumps = mocker.patch('src.models.dumps', wraps=json_codec.dumps)
+        
+        first = client.get('/api/weather/Tokyo')
+        second = client.get('/api/weather/Tokyo')
+        
+        assert dumps.call_count == 1
+        assert first.data == second.data
+        assert second.content_type == 'application/json'
+        assert json.loads(second.data) == {'status': 'success', 'data': sample_weather_data.to_dict()}
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_api_weather_stale_marker(self, client_with_mock_weather_client, sample_weather_data):
+        """古いキャッシュから返したデータに印が付くことを確認"""
+        client, mock_client = client_with_mock_weather_client
+        sample_weather_data.is_stale = True
+        mock_client.get_current_weather.return_value = sample_weather_data
+        
+        data = json.loads(client.get('/api/weather/Tokyo').data)
+        page = client.post('/weather', data={'city': 'Tokyo'}).data.decode('utf-8')
+        
+        assert data['data']['is_stale'] is True
+        assert '前回取得したデータを表示しています' in page
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_api_weather_revalidating_notice(self, client_with_mock_weather_client, sample_weather_data):
+        """再検証中のキャッシュは取得失敗の警告ではなく中立的な案内を表示することを確認"""
+        client, mock_client = client_with_mock_weather_client
+        sample_weather_data.is_stale = True
+        sample_weather_data.stale_reason = STALE_REVALIDATING
+        mock_client.get_current_weather.return_value = sample_weather_data
+        
+        data = json.loads(client.get('/api/weather/Tokyo').data)
+        page = client.post('/weather', data={'city': 'Tokyo'}).data.decode('utf-8')
+        
+        assert data['data']['stale_reason'] == STALE_REVALIDATING
+        assert 'キャッシュの情報です' in page
+        assert '取得できなかった' not in page
+    
     @pytest.mark.integration
     @pytest.mark.web
     def test_api_weather_city_not_found(self, client_with_mock_weather_client):
@@ -322,6 +373,22 @@ class TestWeatherWebAppAPIEndpoint:
         assert data['error_type'] == 'api_response_error'
         assert data['status_code'] == 429
     
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_api_weather_rate_limited(self, client_with_mock_weather_client):
+        """クライアント側レート制限の場合のAPIテスト"""
+        client, mock_client = client_with_mock_weather_client
+        mock_client.get_current_weather.side_effect = RateLimitExceededError(retry_after=2.3)
+        
+        response = client.get('/api/weather/Tokyo')
+        
+        assert response.status_code == 429
+        assert response.headers['Retry-After'] == '3'
+        
+        data = json.loads(response.data)
+        assert data['status'] == 'error'
+        assert data['error_type'] == 'rate_limited'
+    
     @pytest.mark.integration
     @pytest.mark.web
     def test_api_weather_special_characters_in_city(self, client_with_mock_weather_client, sample_weather_data):
@@ -409,6 +476,28 @@ class TestWeatherWebAppHealthEndpoint:
         assert data['status'] == 'unhealthy'
         assert data['components']['weather_client'] == 'OK'
         assert data['components']['api_key'] == 'ERROR'
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_health_check_reports_circuit_breaker(self, client_with_health_scenarios):
+        """サーキットブレーカーの状態が報告されることを確認"""
+        client, app = client_with_health_scenarios
+        
+        breaker = CircuitBreaker(minimum_calls=1, open_timeout=60)
+        breaker._record(False, True)  # 1回の失敗で OPEN
+        mock_client = Mock()
+        mock_client.circuit_breaker = breaker
+        app.weather_client = mock_client
+        
+        response = client.get('/health')
+        
+        assert response.status_code == 200
+        
+        data = json.loads(response.data)
+        assert data['status'] == 'degraded'
+        assert data['components']['circuit_breaker'] == 'open'
+        assert data['components']['api_key'] == 'UNKNOWN'
+        mock_client.validate_api_key.assert_not_called()
 
 
 class TestWeatherWebAppErrorHandling:
@@ -517,4 +606,177 @@ class TestWeatherWebAppSecurity:
         response = client.post('/weather', data={'city': very_long_city})
         
         # アプリケーションがクラッシュせず、適切に処理することを確認
-        assert response.status_code == 200
\ No newline at end of file
+        assert response.status_code == 200
+
+class TestWeatherWebAppCacheEndpoints:
+    """キャッシュ管理エンドポイントの統合テスト"""
+    
+    @pytest.fixture
+    def app(self, test_config_file, mock_env_vars, suppress_logging, monkeypatch):
+        """管理トークン付きのアプリケーションを作成"""
+        monkeypatch.setenv('WEATHER_ADMIN_TOKEN', 'secret-token')
+        app = WeatherWebApp(test_config_file)
+        app.flask_app.config['TESTING'] = True
+        app.weather_client = Mock()
+        return app
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_cache_stats(self, app):
+        """統計情報は管理トークンで認証して取得できることを確認"""
+        app.weather_client.get_cache_stats.return_value = {'cache': {'hits': 3}, 'hot_keys': []}
+        
+        response = app.flask_app.test_client().get('/api/cache/stats?limit=5',
+                                                   headers={'Authorization': 'Bearer secret-token'})
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['data']['cache']['hits'] == 3
+        app.weather_client.get_cache_stats.assert_called_once_with(hot_keys=5)
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_cache_stats_requires_token(self, app):
+        """人気キー（座標を含む）を公開しないよう、統計情報もトークンが無い場合は401になることを確認"""
+        client = app.flask_app.test_client()
+        
+        assert client.get('/api/cache/stats').status_code == 401
+        assert client.get('/api/cache/stats', headers={'Authorization': 'Bearer wrong'}).status_code == 401
+        app.weather_client.get_cache_stats.assert_not_called()
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_purge_requires_token(self, app):
+        """トークンが無い・誤っている場合は401になることを確認"""
+        client = app.flask_app.test_client()
+        
+        assert client.post('/api/cache/purge', json={'prefix': ''}).status_code == 401
+        response = client.post('/api/cache/purge', json={'prefix': ''},
+                               headers={'Authorization': 'Bearer wrong'})
+        assert response.status_code == 401
+        app.weather_client.purge_cache.assert_not_called()
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_purge_disabled_without_token(self, test_config_file, mock_env_vars, suppress_logging,
+                                          monkeypatch):
+        """WEATHER_ADMIN_TOKEN が未設定の場合は403になることを確認"""
+        monkeypatch.delenv('WEATHER_ADMIN_TOKEN', raising=False)
+        app = WeatherWebApp(test_config_file)
+        
+        response = app.flask_app.test_client().post('/api/cache/purge', json={'prefix': ''},
+                                                    headers={'Authorization': 'Bearer '})
+        
+        assert response.status_code == 403
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_purge_by_key_prefix_and_city(self, app):
+        """key・prefix・city の指定が削除に渡されることを確認"""
+        client = app.flask_app.test_client()
+        headers = {'Authorization': 'Bearer secret-token'}
+        app.weather_client.purge_cache.return_value = 2
+        app.weather_client.city_key_prefix.return_value = "id:1850144/ja/"
+        
+        response = client.post('/api/cache/purge', json={'key': 'id:1850144/ja/metric'}, headers=headers)
+        assert json.loads(response.data) == {'status': 'success', 'purged': 2}
+        app.weather_client.purge_cache.assert_called_with('id:1850144/ja/metric', prefix=False)
+        
+        client.post('/api/cache/purge', json={'prefix': 'q:'}, headers=headers)
+        app.weather_client.purge_cache.assert_called_with('q:', prefix=True)
+        
+        client.post('/api/cache/purge', json={'city': '東京', 'lang': 'ja'}, headers=headers)
+        app.weather_client.city_key_prefix.assert_called_with('東京', 'ja')
+        app.weather_client.purge_cache.assert_called_with('id:1850144/ja/', prefix=True)
+        
+        assert client.post('/api/cache/purge', json={}, headers=headers).status_code == 400
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_purge_empty_prefix_rejected(self, app):
+        """空の前方一致（全エントリの削除）は400を返すことを確認"""
+        app.weather_client.purge_cache.side_effect = ValueError("空のパターンです")
+        
+        response = app.flask_app.test_client().post(
+            '/api/cache/purge', json={'prefix': ''},
+            headers={'Authorization': 'Bearer secret-token'}
+        )
+        
+        assert response.status_code == 400
+        assert json.loads(response.data)['error_type'] == 'invalid_request'
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_refresh(self, app):
+        """再取得の結果を返すことを確認"""
+        app.weather_client.refresh_cache.return_value = {'id:1850144/ja/metric': 'refreshed'}
+        
+        response = app.flask_app.test_client().post(
+            '/api/cache/refresh', json={'key': 'id:1850144/ja/metric'},
+            headers={'Authorization': 'Bearer secret-token'}
+        )
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['refreshed'] == {'id:1850144/ja/metric': 'refreshed'}
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_refresh_invalid_pattern(self, app):
+        """再取得できないパターンは400を返すことを確認"""
+        app.weather_client.refresh_cache.side_effect = ValueError("空のパターンです")
+        
+        response = app.flask_app.test_client().post(
+            '/api/cache/refresh', json={'prefix': ''},
+            headers={'Authorization': 'Bearer secret-token'}
+        )
+        
+        assert response.status_code == 400
+        assert json.loads(response.data)['error_type'] == 'invalid_request'
+
+
+class TestWeatherWebAppCoordsEndpoint:
+    """座標による天気情報APIの統合テスト"""
+    
+    @pytest.fixture
+    def app(self, test_config_file, mock_env_vars, suppress_logging):
+        app = WeatherWebApp(test_config_file)
+        app.flask_app.config['TESTING'] = True
+        app.weather_client = Mock()
+        return app
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_coords_success(self, app, sample_weather_data):
+        """座標を渡して天気情報を返すことを確認"""
+        app.weather_client.get_current_weather_by_coords.return_value = sample_weather_data
+        
+        response = app.flask_app.test_client().get('/api/weather/coords?lat=35.68&lon=139.69')
+        
+        assert response.status_code == 200
+        assert json.loads(response.data)['data']['city_name'] == sample_weather_data.city_name
+        app.weather_client.get_current_weather_by_coords.assert_called_once_with(35.68, 139.69)
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    def test_coords_invalid(self, app):
+        """座標が無い・範囲外の場合は400になることを確認"""
+        client = app.flask_app.test_client()
+        app.weather_client.get_current_weather_by_coords.side_effect = ValueError("座標が範囲外です")
+        
+        assert client.get('/api/weather/coords?lat=abc&lon=1').status_code == 400
+        assert client.get('/api/weather/coords?lat=95&lon=1').status_code == 400
+    
+    @pytest.mark.integration
+    @pytest.mark.web
+    @pytest.mark.parametrize("error, status, error_type", [
+        (CityNotFoundError("35.68,139.69"), 404, 'city_not_found'),
+        (APIKeyError('Invalid API key'), 401, 'api_key_error'),
+        (APIConnectionError('down'), 503, 'connection_error'),
+    ])
+    def test_coords_errors_match_city_endpoint(self, app, error, status, error_type):
+        """座標の天気情報APIのエラーが都市名のAPIと同じステータス・種別になることを確認"""
+        app.weather_client.get_current_weather_by_coords.side_effect = error
+        
+        response = app.flask_app.test_client().get('/api/weather/coords?lat=35.68&lon=139.69')
+        
+        assert response.status_code == status
+        assert json.loads(response.data)['error_type'] == error_type